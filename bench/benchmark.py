@@ -0,0 +1,312 @@
+"""
+Load test for /new-game, /guess and /suggest against stubbed upstreams.
+
+    python -m bench.benchmark --sessions 200 --concurrency 16
+    python -m bench.benchmark --save-baseline bench/baseline.json
+    python -m bench.benchmark --baseline bench/baseline.json --tolerance 0.25
+
+The app is built with create_app() and served by werkzeug on a local port.
+MusicBrainz and Spotify are replaced by the stub servers in bench/stubs.py,
+so the numbers measure this code, not the real APIs or the network.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import musicbrainzngs
+import requests
+from werkzeug.serving import make_server
+
+#PATH SETUP
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+import spotify
+from answer_pool import AnswerPool
+from app import create_app
+from artist_aliases import ArtistAliases
+from artist_cache import ArtistCache
+from bench.stubs import MusicBrainzStub, SpotifyStub
+from database.database import Database
+from database.in_memory_storage import InMemoryDatabase
+from games import Games, POSSIBLE_ANSWERS
+from rate_limiter import RateLimiter
+from single_flight import SingleFlight
+
+ENDPOINTS = ("/new-game", "/guess", "/suggest")
+PERCENTILES = (50, 95, 99)
+
+# Latency changes smaller than this are noise, whatever the tolerance says
+MIN_LATENCY_DELTA = 0.001
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Recorder:
+    """Collects (endpoint, seconds, status) samples from every worker thread."""
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def timed(self, endpoint, send):
+        start = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.samples.append((endpoint, elapsed, response.status_code))
+        return response
+
+
+def configure_upstreams(spotify_stub, musicbrainz_stub):
+    """Point the Spotify client and musicbrainzngs at the stub servers."""
+    os.environ.setdefault("SPOTIFY_CLIENT_ID", "bench")
+    os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "bench")
+    spotify._default_client = spotify.SpotifyClient(
+        api_url=spotify_stub.api_url,
+        token_url=spotify_stub.token_url,
+        pool_size=64,
+    )
+    musicbrainzngs.set_hostname(musicbrainz_stub.hostname, use_https=False)
+
+
+def build_app(database, use_cache=True, use_answer_pool=True, musicbrainz_rate=0.0):
+    """Wire the services the way app.configure_services() does, minus the env."""
+    musicbrain.set_artist_cache(ArtistCache(database) if use_cache else None)
+    musicbrain.set_artist_aliases(ArtistAliases(database) if use_cache else None)
+    musicbrain.set_single_flight(SingleFlight(database))
+    if musicbrainz_rate > 0:
+        musicbrain.set_musicbrainz_limiter(
+            RateLimiter(rate=musicbrainz_rate, capacity=max(1, int(musicbrainz_rate)))
+        )
+    else:
+        musicbrain.set_musicbrainz_limiter(None)
+        musicbrainzngs.set_rate_limit(False)
+
+    answer_pool = None
+    if use_answer_pool:
+        answer_pool = AnswerPool(database, musicbrain.get_artist_data_for_game)
+        answer_pool.refresh()
+
+    return create_app("bench-secret", Games(database), answer_pool)
+
+
+def play_session(base_url, recorder, rng, guess_names):
+    """
+    One player: start a game, then type and submit guesses until they win
+    or give up. Typing asks /suggest for a couple of prefixes per guess.
+    """
+    with requests.Session() as http:
+        response = recorder.timed("/new-game", lambda: http.get(f"{base_url}/new-game"))
+        if response.status_code != 200:
+            return
+
+        for _ in range(rng.randint(3, 8)):
+            name = rng.choice(guess_names)
+            for length in (2, 4):
+                prefix = name[:length]
+                recorder.timed(
+                    "/suggest",
+                    lambda: http.get(f"{base_url}/suggest", params={"q": prefix}),
+                )
+            response = recorder.timed(
+                "/guess",
+                lambda: http.post(f"{base_url}/guess", json={"guess": name}),
+            )
+            if response.status_code == 200 and response.json().get("status") == "WON":
+                return
+
+
+def run_load(base_url, sessions, concurrency, seed=0, long_tail=200):
+    """
+    Drive `sessions` players through the app, `concurrency` at a time.
+    Guesses mix the curated answers (mostly cache hits) with a long tail
+    of names that are each only seen a few times (mostly misses).
+    """
+    guess_names = list(POSSIBLE_ANSWERS) * 3 + [f"Bench Artist {n}" for n in range(long_tail)]
+    recorder = Recorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(play_session, base_url, recorder, random.Random(seed + n), guess_names)
+            for n in range(sessions)
+        ]
+        for future in futures:
+            future.result()
+    return recorder.samples, time.perf_counter() - start
+
+
+def summarize(samples, elapsed, upstream_calls):
+    """Build the report: latency percentiles per endpoint, RPS and upstream calls."""
+    report = {"requests": len(samples), "seconds": elapsed, "endpoints": {}}
+    report["rps"] = len(samples) / elapsed if elapsed else 0.0
+
+    for endpoint in ("all",) + ENDPOINTS:
+        timings = sorted(
+            seconds for name, seconds, _ in samples if endpoint in ("all", name)
+        )
+        errors = sum(
+            1 for name, _, status in samples if endpoint in ("all", name) and status >= 400
+        )
+        if not timings:
+            continue
+        stats = {"count": len(timings), "errors": errors}
+        for pct in PERCENTILES:
+            stats[f"p{pct}"] = percentile(timings, pct)
+        report["endpoints"][endpoint] = stats
+
+    total_upstream = sum(sum(calls.values()) for calls in upstream_calls.values())
+    report["upstream_calls"] = upstream_calls
+    report["upstream_calls_per_request"] = total_upstream / len(samples) if samples else 0.0
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """
+    Return a list of human-readable regressions of `report` against `baseline`:
+    slower percentiles, lower RPS or more upstream calls per request than
+    the baseline allows with the given relative tolerance.
+    """
+    regressions = []
+    for endpoint, base_stats in baseline.get("endpoints", {}).items():
+        stats = report["endpoints"].get(endpoint)
+        if stats is None:
+            continue
+        for pct in PERCENTILES:
+            key = f"p{pct}"
+            old, new = base_stats[key], stats[key]
+            if new > old * (1 + tolerance) and new - old > MIN_LATENCY_DELTA:
+                regressions.append(
+                    f"{endpoint} {key} {old * 1000:.1f}ms -> {new * 1000:.1f}ms"
+                )
+
+    if report["rps"] < baseline["rps"] * (1 - tolerance):
+        regressions.append(f"rps {baseline['rps']:.1f} -> {report['rps']:.1f}")
+
+    old_calls = baseline["upstream_calls_per_request"]
+    new_calls = report["upstream_calls_per_request"]
+    if new_calls > old_calls * (1 + tolerance):
+        regressions.append(f"upstream calls/request {old_calls:.3f} -> {new_calls:.3f}")
+    return regressions
+
+
+def format_report(report):
+    lines = [
+        f"{report['requests']} requests in {report['seconds']:.2f}s "
+        f"({report['rps']:.1f} req/s)",
+        f"{'endpoint':<10} {'count':>6} {'errors':>6} {'p50':>9} {'p95':>9} {'p99':>9}",
+    ]
+    for endpoint, stats in report["endpoints"].items():
+        lines.append(
+            f"{endpoint:<10} {stats['count']:>6} {stats['errors']:>6} "
+            + " ".join(f"{stats[f'p{pct}'] * 1000:>7.1f}ms" for pct in PERCENTILES)
+        )
+    for upstream, calls in report["upstream_calls"].items():
+        detail = ", ".join(f"{route}={count}" for route, count in sorted(calls.items()))
+        lines.append(f"{upstream}: {detail or 'no calls'}")
+    lines.append(f"upstream calls per request: {report['upstream_calls_per_request']:.3f}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100, help="game sessions to play")
+    parser.add_argument("--concurrency", type=int, default=8, help="sessions played at once")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--redis", metavar="HOST:PORT", help="use a local Redis instead of InMemoryDatabase")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="stub upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="extra random stub latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub calls answered with 503")
+    parser.add_argument("--musicbrainz-rate", type=float, default=0.0,
+                        help="requests/second for the MusicBrainz limiter (0 disables it)")
+    parser.add_argument("--no-cache", action="store_true", help="run without the artist cache")
+    parser.add_argument("--no-answer-pool", action="store_true", help="resolve every answer live")
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    parser.add_argument("--save-baseline", metavar="PATH", help="store the report as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="fail if the run regresses against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative regression against the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    stub_options = {
+        "latency": args.latency_ms / 1000,
+        "jitter": args.jitter_ms / 1000,
+        "error_rate": args.error_rate,
+    }
+    spotify_stub = SpotifyStub(**stub_options).start()
+    musicbrainz_stub = MusicBrainzStub(**stub_options).start()
+    configure_upstreams(spotify_stub, musicbrainz_stub)
+
+    if args.redis:
+        host, port = args.redis.rsplit(":", 1)
+        database = Database(host, int(port))
+    else:
+        database = InMemoryDatabase()
+
+    app = build_app(
+        database,
+        use_cache=not args.no_cache,
+        use_answer_pool=not args.no_answer_pool,
+        musicbrainz_rate=args.musicbrainz_rate,
+    )
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        # Startup work (warming the answer pool) is not part of the measurement
+        spotify_stub.reset()
+        musicbrainz_stub.reset()
+        samples, elapsed = run_load(base_url, args.sessions, args.concurrency, seed=args.seed)
+        upstream_calls = {
+            "spotify": dict(spotify_stub.calls),
+            "musicbrainz": dict(musicbrainz_stub.calls),
+        }
+    finally:
+        server.shutdown()
+        spotify_stub.stop()
+        musicbrainz_stub.stop()
+
+    report = summarize(samples, elapsed, upstream_calls)
+    print(format_report(report))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
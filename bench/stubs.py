@@ -0,0 +1,244 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+# Artists the stubs know about; anything else gets a generated profile
+ARTISTS = {
+    "Taylor Swift": {"gender": "female", "area": "United States", "tag": "pop", "popularity": 92},
+    "Drake": {"gender": "male", "area": "Canada", "tag": "hip hop", "popularity": 95},
+    "Adele": {"gender": "female", "area": "United Kingdom", "tag": "soul", "popularity": 83},
+    "Bad Bunny": {"gender": "male", "area": "Puerto Rico", "tag": "reggaeton", "popularity": 95},
+    "Pitbull": {"gender": "male", "area": "United States", "tag": "dance-pop", "popularity": 85},
+    "Rihanna": {"gender": "female", "area": "Barbados", "tag": "pop", "popularity": 88},
+}
+
+MB_NAMESPACE = "http://musicbrainz.org/ns/mmd-2.0#"
+
+
+def spotify_id(name):
+    """Stub Spotify id for a name; hex keeps it alphanumeric and reversible."""
+    return name.encode("utf-8").hex()
+
+
+def _profile(name):
+    if name in ARTISTS:
+        return ARTISTS[name]
+    # Stable pseudo-profile so repeated lookups agree with each other
+    seed = random.Random(name)
+    return {
+        "gender": seed.choice(["male", "female", None]),
+        "area": seed.choice(["United States", "United Kingdom", "Canada"]),
+        "tag": seed.choice(["pop", "rock", "hip hop", "indie"]),
+        "popularity": seed.randint(20, 90),
+    }
+
+
+class StubServer:
+    """
+    A local HTTP server standing in for one upstream API.
+    Every request sleeps for `latency` seconds (plus up to `jitter`) and
+    fails with a 503 with probability `error_rate`. Calls are counted per
+    route so the benchmark can report upstream calls per app request.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}
+
+    def route(self, method, path, query):
+        """
+        Return (route name, handler) for a request. Calls are counted per
+        route name; handler() returns (status, content type, body) and runs
+        after the simulated latency. Subclasses override.
+        """
+        raise NotImplementedError
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this every
+            # response stalls on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def _serve(self, method):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+                route, handler = stub.route(method, parsed.path, parse_qs(parsed.query))
+                with stub._lock:
+                    stub.calls[route] = stub.calls.get(route, 0) + 1
+
+                delay = stub.latency + random.uniform(0, stub.jitter)
+                if delay:
+                    time.sleep(delay)
+
+                if random.random() < stub.error_rate:
+                    status, content_type, body = 503, "text/plain", b"unavailable"
+                else:
+                    status, content_type, body = handler()
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _json(data):
+    return 200, "application/json", json.dumps(data).encode("utf-8")
+
+
+def _not_found():
+    return 404, "text/plain", b"not found"
+
+
+class SpotifyStub(StubServer):
+    """Serves the token endpoint and /v1/search like the Spotify Web API."""
+
+    token_path = "/api/token"
+    api_path = "/v1"
+
+    @property
+    def token_url(self):
+        return self.url + self.token_path
+
+    @property
+    def api_url(self):
+        return self.url + self.api_path
+
+    def route(self, method, path, query):
+        if method == "POST" and path == self.token_path:
+            return "token", lambda: _json(
+                {"access_token": uuid.uuid4().hex, "token_type": "Bearer", "expires_in": 3600}
+            )
+        if method == "GET" and path == f"{self.api_path}/artists":
+            ids = query.get("ids", [""])[0].split(",")
+            return "artists", lambda: _json({"artists": [self._artist(i) for i in ids]})
+        if method == "GET" and path.startswith(f"{self.api_path}/artists/"):
+            artist = self._artist(path.rsplit("/", 1)[-1])
+            return "artist", lambda: _json(artist) if artist else _not_found()
+        if method == "GET" and path == f"{self.api_path}/search":
+            name = query.get("q", [""])[0]
+            return "search", lambda: _json(
+                {"artists": {"items": [
+                    {"id": spotify_id(name), "name": name, "popularity": _profile(name)["popularity"]}
+                ]}}
+            )
+        return "other", _not_found
+
+    @staticmethod
+    def _artist(artist_id):
+        try:
+            name = bytes.fromhex(artist_id).decode("utf-8")
+        except ValueError:
+            return None
+        return {"id": artist_id, "name": name, "popularity": _profile(name)["popularity"]}
+
+
+class MusicBrainzStub(StubServer):
+    """
+    Serves the artist search and lookup endpoints of the MusicBrainz ws/2
+    XML API, which is what musicbrainzngs parses.
+    The artist id is the uuid5 of its name, so a lookup can find the name again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._names = {}
+
+    @property
+    def hostname(self):
+        host, port = self._server.server_address
+        return f"{host}:{port}"
+
+    def route(self, method, path, query):
+        if path.rstrip("/") == "/ws/2/artist":
+            name = query.get("query", [""])[0]
+            return "search", lambda: self._search(name)
+        if path.startswith("/ws/2/artist/"):
+            includes = query.get("inc", [""])[0].split()
+            return "lookup", lambda: self._lookup(path.rsplit("/", 1)[-1], "url-rels" in includes)
+        return "other", _not_found
+
+    def _search(self, name):
+        mbid = str(uuid.uuid5(uuid.NAMESPACE_URL, name))
+        with self._lock:
+            self._names[mbid] = name
+        body = (
+            f'<metadata xmlns="{MB_NAMESPACE}"><artist-list count="1" offset="0">'
+            f'<artist id="{mbid}" type="Person"><name>{escape(name)}</name></artist>'
+            f"</artist-list></metadata>"
+        )
+        return 200, "application/xml", body.encode("utf-8")
+
+    def _lookup(self, mbid, url_rels=False):
+        with self._lock:
+            name = self._names.get(mbid)
+        if name is None:
+            return _not_found()
+        profile = _profile(name)
+        gender = f"<gender>{profile['gender']}</gender>" if profile["gender"] else ""
+        relations = ""
+        if url_rels:
+            relations = (
+                '<relation-list target-type="url"><relation type="free streaming">'
+                f"<target>https://open.spotify.com/artist/{spotify_id(name)}</target>"
+                "</relation></relation-list>"
+            )
+        body = (
+            f'<metadata xmlns="{MB_NAMESPACE}"><artist id="{mbid}" type="Person">'
+            f"<name>{escape(name)}</name>{gender}"
+            f"<area><name>{escape(profile['area'])}</name></area>"
+            f'<tag-list><tag count="5"><name>{escape(profile["tag"])}</name></tag>'
+            f'<tag count="1"><name>music</name></tag></tag-list>{relations}'
+            f"</artist></metadata>"
+        )
+        return 200, "application/xml", body.encode("utf-8")
@@ -0,0 +1,193 @@
+import json
+import time
+from abc import ABC, abstractmethod
+
+import redis.asyncio
+
+from .codec import CompactCodec
+from .database import ACTIVE_GAMES_KEY, ADD_GUESS_SCRIPT, RECORD_GUESS_SCRIPT, prune_active_games
+from .in_memory_storage import InMemoryDatabase
+
+
+class AsyncBaseDatabase(ABC):
+    """Awaitable counterpart of BaseDatabase for the asyncio serving mode."""
+
+    @abstractmethod
+    async def exists(self, game_id):
+        pass
+
+    @abstractmethod
+    async def create_game(self, game_id, answer):
+        pass
+
+    @abstractmethod
+    async def get_answer(self, game_id):
+        pass
+
+    @abstractmethod
+    async def add_guess(self, game_id, guess):
+        pass
+
+    @abstractmethod
+    async def record_guess(self, game_id, guess, compute_fn):
+        pass
+
+    @abstractmethod
+    async def get_guesses(self, game_id):
+        pass
+
+    @abstractmethod
+    async def stats(self):
+        pass
+
+    @abstractmethod
+    async def get_value(self, key):
+        pass
+
+    @abstractmethod
+    async def set_value(self, key, value, ttl=None):
+        pass
+
+    @abstractmethod
+    async def add_value(self, key, value, ttl=None):
+        pass
+
+    @abstractmethod
+    async def delete_value(self, key):
+        pass
+
+
+class AsyncDatabase(AsyncBaseDatabase):
+    """
+    redis.asyncio implementation. Uses the same keys, scripts and codec as
+    Database, so the sync and async apps can share one Redis.
+    """
+
+    def __init__(self, host, port, game_ttl=None, codec=None):
+        self.game_ttl = game_ttl
+        self.codec = codec or CompactCodec()
+        self.storage = redis.asyncio.Redis(host=host, port=port)
+        self._add_guess_script = self.storage.register_script(ADD_GUESS_SCRIPT)
+        self._record_guess_script = self.storage.register_script(RECORD_GUESS_SCRIPT)
+
+    @staticmethod
+    def _guesses_key(game_id):
+        return f"{game_id}:guesses"
+
+    def _game_keys(self, game_id):
+        return [game_id, self._guesses_key(game_id), ACTIVE_GAMES_KEY]
+
+    def _touch_args(self, guess):
+        ttl_ms = int(self.game_ttl * 1000) if self.game_ttl else 0
+        return [self.codec.encode(guess), ttl_ms, time.time()]
+
+    async def exists(self, game_id):
+        return await self.storage.exists(game_id)
+
+    async def create_game(self, game_id, answer):
+        now = time.time()
+        pipeline = self.storage.pipeline()
+        pipeline.delete(game_id, self._guesses_key(game_id))
+        pipeline.hset(game_id, "answer", self.codec.encode(answer))
+        if self.game_ttl:
+            pipeline.expire(game_id, int(self.game_ttl))
+        pipeline.zadd(ACTIVE_GAMES_KEY, {game_id: now})
+        prune_active_games(pipeline, self.game_ttl, now)
+        await pipeline.execute()
+
+    async def get_answer(self, game_id):
+        answer = await self.storage.hget(game_id, "answer")
+        if answer is not None:
+            return self.codec.decode(answer)
+        return None
+
+    async def add_guess(self, game_id, guess):
+        count = await self._add_guess_script(
+            keys=self._game_keys(game_id),
+            args=self._touch_args(guess),
+        )
+        return count or None
+
+    async def record_guess(self, game_id, guess, compute_fn):
+        result = await self._record_guess_script(
+            keys=self._game_keys(game_id),
+            args=self._touch_args(guess),
+        )
+        if result is None:
+            return None
+        answer, guess_number = result
+        return compute_fn(self.codec.decode(answer), guess_number)
+
+    async def get_guesses(self, game_id):
+        pipeline = self.storage.pipeline()
+        pipeline.hexists(game_id, "answer")
+        pipeline.lrange(self._guesses_key(game_id), 0, -1)
+        exists, guesses = await pipeline.execute()
+        if not exists:
+            return None
+        return [self.codec.decode(guess) for guess in guesses]
+
+    async def stats(self):
+        pipeline = self.storage.pipeline()
+        prune_active_games(pipeline, self.game_ttl, time.time())
+        pipeline.zcard(ACTIVE_GAMES_KEY)
+        pipeline.info("memory")
+        results = await pipeline.execute()
+        return {"games": results[-2], "bytes": results[-1]["used_memory"]}
+
+    async def get_value(self, key):
+        value = await self.storage.get(key)
+        if value is not None:
+            return json.loads(value)
+        return None
+
+    async def set_value(self, key, value, ttl=None):
+        await self.storage.set(key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    async def add_value(self, key, value, ttl=None):
+        return bool(
+            await self.storage.set(key, json.dumps(value), nx=True, px=int(ttl * 1000) if ttl else None)
+        )
+
+    async def delete_value(self, key):
+        await self.storage.delete(key)
+
+
+class AsyncInMemoryDatabase(AsyncBaseDatabase):
+    """Async wrapper around InMemoryDatabase for tests and development."""
+
+    def __init__(self, host=None, port=None, **kwargs):
+        self.sync = InMemoryDatabase(host, port, **kwargs)
+
+    async def exists(self, game_id):
+        return self.sync.exists(game_id)
+
+    async def create_game(self, game_id, answer):
+        self.sync.create_game(game_id, answer)
+
+    async def get_answer(self, game_id):
+        return self.sync.get_answer(game_id)
+
+    async def add_guess(self, game_id, guess):
+        return self.sync.add_guess(game_id, guess)
+
+    async def record_guess(self, game_id, guess, compute_fn):
+        return self.sync.record_guess(game_id, guess, compute_fn)
+
+    async def get_guesses(self, game_id):
+        return self.sync.get_guesses(game_id)
+
+    async def stats(self):
+        return self.sync.stats()
+
+    async def get_value(self, key):
+        return self.sync.get_value(key)
+
+    async def set_value(self, key, value, ttl=None):
+        self.sync.set_value(key, value, ttl)
+
+    async def add_value(self, key, value, ttl=None):
+        return self.sync.add_value(key, value, ttl)
+
+    async def delete_value(self, key):
+        self.sync.delete_value(key)
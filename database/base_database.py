@@ -3,42 +3,66 @@ from abc import ABC, abstractmethod
 class BaseDatabase(ABC):
     
     # Methods that have different implementations
-    @abstractmethod
-    def _get_game(self, game_id):
-        pass
-    
-    @abstractmethod
-    def _set_game(self, game_id, game_dict):
-        pass
-    
     @abstractmethod
     def exists(self, game_id):
         pass
-    
-    # Methods that have the same implementation
+
+    @abstractmethod
     def create_game(self, game_id, answer):
-        game_dict = {
-            "answer": answer,
-            "guesses": []
-        }
-        self._set_game(game_id, game_dict)
+        """Start a game with no guesses, replacing any game stored under game_id."""
+        pass
 
+    @abstractmethod
     def get_answer(self, game_id):
-        game_dict = self._get_game(game_id)
-        if game_dict is not None:
-            return game_dict.get("answer")
-        return None
+        pass
 
+    @abstractmethod
     def add_guess(self, game_id, guess):
-        game_dict = self._get_game(game_id)
-        if game_dict is not None:
-            game_dict["guesses"].append(guess)
-            self._set_game(game_id, game_dict)
-            return True
-        return False
+        """
+        Atomically append a guess. Returns the number of guesses made so far
+        (including this one), or None if the game does not exist.
+        """
+        pass
 
+    @abstractmethod
     def get_guesses(self, game_id):
-        game_dict = self._get_game(game_id)
-        if game_dict is not None:
-            return game_dict.get("guesses", [])
-        return None
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def stats(self):
+        """Return {"games": live game count, "bytes": memory used by the store}."""
+        pass
+
+    @abstractmethod
+    def get_value(self, key):
+        """Return the value stored under key, or None if missing or expired."""
+        pass
+
+    @abstractmethod
+    def set_value(self, key, value, ttl=None):
+        """Store a JSON-serializable value, expiring after ttl seconds if given."""
+        pass
+
+    @abstractmethod
+    def add_value(self, key, value, ttl=None):
+        """Store a value only if key is not set yet. Returns True if it was stored."""
+        pass
+
+    @abstractmethod
+    def delete_value(self, key):
+        pass
+
+    # Methods that have the same implementation
+    def record_guess(self, game_id, guess, compute_fn):
+        """
+        Append guess to the game and return compute_fn(answer, guess_number),
+        or None if the game does not exist. Stores override this to do the
+        existence check, answer fetch, append and count in one round trip.
+        """
+        answer = self.get_answer(game_id)
+        if answer is None:
+            return None
+        guess_number = self.add_guess(game_id, guess)
+        if guess_number is None:
+            return None
+        return compute_fn(answer, guess_number)
\ No newline at end of file
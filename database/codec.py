@@ -0,0 +1,168 @@
+import json
+import struct
+
+# Values stored for a game. Answers and guesses keep only what the game
+# compares and reveals; per-guess comparisons are rebuilt from these.
+PROFILE_FIELDS = ("name", "gender", "area", "tag", "spotify popularity")
+
+# Fields of the answer snapshot in a projected answer record ({"snapshot": ...,
+# "key": [name, gender, tag, area, popularity], "matrix_id": ...}, see games.project_answer)
+SNAPSHOT_FIELDS = ("name", "gender", "area", "genre", "popularity")
+
+
+def is_projected(value):
+    return isinstance(value, dict) and "snapshot" in value and "key" in value
+
+
+def _project(profile):
+    area = profile.get("area")
+    return {
+        "name": profile.get("name"),
+        "gender": profile.get("gender"),
+        "area": {"name": area.get("name")} if area else None,
+        "tag": profile.get("tag"),
+        "spotify popularity": profile.get("spotify popularity"),
+    }
+
+
+class JsonCodec:
+    """Plain JSON encoding, the format games were originally stored in."""
+
+    def encode(self, profile):
+        if is_projected(profile):
+            return json.dumps({
+                "snapshot": profile["snapshot"],
+                "key": profile["key"],
+                "matrix_id": profile.get("matrix_id"),
+            }).encode("utf-8")
+        return json.dumps(_project(profile)).encode("utf-8")
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class CompactCodec:
+    """
+    Versioned struct-packed encoding.
+
+    Layout: version byte, gender enum, popularity (255 = unknown), then
+    name, area and tag as u16-length-prefixed UTF-8 (0xFFFF = None).
+    Genders outside the interned table are stored as an extra string.
+    Data that starts like JSON is decoded with JsonCodec, so keys written
+    before this codec existed stay readable.
+
+    Projected answer records are written as PROJECTED_VERSION: the same
+    header, the snapshot's name, area and genre, then the comparison key's
+    name, gender, tag and area, so nothing is lowercased again on read.
+    A comparison matrix id, if any, follows as a u32; records written
+    without one read back with matrix_id None.
+    """
+
+    VERSION = 1
+    PROJECTED_VERSION = 2
+    HEADER = struct.Struct("<BBB")
+    LENGTH = struct.Struct("<H")
+    MATRIX_ID = struct.Struct("<I")
+    NONE_LENGTH = 0xFFFF
+    UNKNOWN_POPULARITY = 255
+    RAW_GENDER = 255
+    GENDERS = (None, "Male", "Female", "Other", "Not applicable", "Non-binary", "male", "female")
+
+    def __init__(self):
+        self._json = JsonCodec()
+        self._gender_codes = {gender: code for code, gender in enumerate(self.GENDERS)}
+
+    def _pack_string(self, value):
+        if value is None:
+            return self.LENGTH.pack(self.NONE_LENGTH)
+        data = str(value).encode("utf-8")[:self.NONE_LENGTH - 1]
+        return self.LENGTH.pack(len(data)) + data
+
+    def _unpack_string(self, data, offset):
+        (length,) = self.LENGTH.unpack_from(data, offset)
+        offset += self.LENGTH.size
+        if length == self.NONE_LENGTH:
+            return None, offset
+        return data[offset:offset + length].decode("utf-8"), offset + length
+
+    def _pack_popularity(self, popularity):
+        if not isinstance(popularity, int) or not 0 <= popularity < self.UNKNOWN_POPULARITY:
+            return self.UNKNOWN_POPULARITY
+        return popularity
+
+    def _pack_header(self, version, gender, popularity, strings):
+        gender_code = self._gender_codes.get(gender, self.RAW_GENDER)
+        parts = [self.HEADER.pack(version, gender_code, self._pack_popularity(popularity))]
+        parts.extend(self._pack_string(value) for value in strings)
+        if gender_code == self.RAW_GENDER:
+            parts.append(self._pack_string(gender))
+        return parts
+
+    def encode(self, profile):
+        if is_projected(profile):
+            return self._encode_projected(profile)
+        profile = _project(profile)
+        return b"".join(self._pack_header(
+            self.VERSION,
+            profile["gender"],
+            profile["spotify popularity"],
+            (profile["name"], (profile["area"] or {}).get("name"), profile["tag"]),
+        ))
+
+    def _encode_projected(self, record):
+        snapshot = record["snapshot"]
+        name, gender, tag, area, popularity = record["key"]
+        # The key's int popularity stands in for the snapshot's as well
+        parts = self._pack_header(
+            self.PROJECTED_VERSION,
+            snapshot["gender"],
+            popularity,
+            (snapshot["name"], snapshot["area"], snapshot["genre"]),
+        )
+        parts.extend(self._pack_string(value) for value in (name, gender, tag, area))
+        if record.get("matrix_id") is not None:
+            parts.append(self.MATRIX_ID.pack(record["matrix_id"]))
+        return b"".join(parts)
+
+    def decode(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if data[:1] in (b"{", b"n"):
+            return self._json.decode(data)
+
+        version, gender_code, popularity = self.HEADER.unpack_from(data, 0)
+        if version not in (self.VERSION, self.PROJECTED_VERSION):
+            raise ValueError(f"Unsupported game encoding version {version}")
+
+        offset = self.HEADER.size
+        name, offset = self._unpack_string(data, offset)
+        area, offset = self._unpack_string(data, offset)
+        tag, offset = self._unpack_string(data, offset)
+        if gender_code == self.RAW_GENDER:
+            gender, offset = self._unpack_string(data, offset)
+        else:
+            gender = self.GENDERS[gender_code]
+        popularity = None if popularity == self.UNKNOWN_POPULARITY else popularity
+
+        if version == self.PROJECTED_VERSION:
+            key = []
+            for _ in range(4):
+                value, offset = self._unpack_string(data, offset)
+                key.append(value)
+            key.append(popularity)
+            matrix_id = None
+            if len(data) >= offset + self.MATRIX_ID.size:
+                (matrix_id,) = self.MATRIX_ID.unpack_from(data, offset)
+            return {
+                "snapshot": dict(zip(SNAPSHOT_FIELDS, (name, gender, area, tag, popularity))),
+                "key": key,
+                "matrix_id": matrix_id,
+            }
+
+        return {
+            "name": name,
+            "gender": gender,
+            "area": {"name": area} if area is not None else None,
+            "tag": tag,
+            "spotify popularity": popularity,
+        }
@@ -1,26 +1,226 @@
 import redis
 import json
+import time
+from contextlib import nullcontext
+from functools import wraps
 from .base_database import BaseDatabase
+from .codec import CompactCodec
+
+# Sorted set of game ids scored by last activity, used by stats(). Every
+# write drops the members whose game has expired, so it stays bounded
+ACTIVE_GAMES_KEY = "games:active"
+
+# Shared by the guess scripts: KEYS = game hash, guess list, activity index;
+# ARGV[2] = sliding TTL in ms (0 = never expire), ARGV[3] = current time
+TOUCH_GAME = """
+local function touch()
+    redis.call('ZADD', KEYS[3], ARGV[3], KEYS[1])
+    if tonumber(ARGV[2]) > 0 then
+        redis.call('PEXPIRE', KEYS[1], ARGV[2])
+        redis.call('PEXPIRE', KEYS[2], ARGV[2])
+        local expired_before = tonumber(ARGV[3]) - tonumber(ARGV[2]) / 1000
+        redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', '(' .. expired_before)
+    end
+end
+"""
+
+# Appends only if the game hash exists, so a guess can never create an
+# orphan list. Returns the new number of guesses (0 if the game is gone).
+ADD_GUESS_SCRIPT = TOUCH_GAME + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local count = redis.call('RPUSH', KEYS[2], ARGV[1])
+touch()
+return count
+"""
+
+# One round trip for a whole guess: existence check, answer fetch, append
+# and count. Returns nil if the game does not exist.
+RECORD_GUESS_SCRIPT = TOUCH_GAME + """
+local answer = redis.call('HGET', KEYS[1], 'answer')
+if not answer then
+    return nil
+end
+local count = redis.call('RPUSH', KEYS[2], ARGV[1])
+touch()
+return {answer, count}
+"""
+
+def prune_active_games(pipeline, game_ttl, now):
+    """Queue the removal of games whose keys have expired since their last activity."""
+    if game_ttl:
+        pipeline.zremrangebyscore(ACTIVE_GAMES_KEY, "-inf", f"({now - game_ttl}")
+
+
+# Every Redis round trip is timed under this one stage name
+REDIS_STAGE = "redis"
+
+
+def _no_stage(name):
+    return nullcontext()
+
+
+def _redis_call(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.stage(REDIS_STAGE):
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class Database(BaseDatabase):
-    """Redis-based database implementation."""
+    """
+    Redis-based database implementation.
+
+    A game is a hash at game_id holding the answer, plus a list at
+    "<game_id>:guesses" that guesses are appended to, so adding a guess
+    never rewrites what is already stored.
+
+    With game_ttl set, both keys expire that many seconds after the last
+    activity, so abandoned games do not pile up. Answers and guesses are
+    written with codec (CompactCodec by default), which also reads the
+    JSON written by earlier versions.
+
+    stage(name) returns a context manager that times a Redis call
+    (metrics.stage in the app); by default nothing is timed.
+    """
     
-    def __init__(self, host, port) -> None:
+    def __init__(self, host, port, game_ttl=None, codec=None, stage=None) -> None:
+        self.game_ttl = game_ttl
+        self.codec = codec or CompactCodec()
+        self.stage = stage or _no_stage
+        # Raw bytes, since the codec output is binary
         self.storage = redis.Redis(
             host=host,
             port=port,
-            decode_responses=True,
         )
+        self._add_guess_script = self.storage.register_script(ADD_GUESS_SCRIPT)
+        self._record_guess_script = self.storage.register_script(RECORD_GUESS_SCRIPT)
+
+    @staticmethod
+    def _guesses_key(game_id):
+        return f"{game_id}:guesses"
+
+    def _game_keys(self, game_id):
+        return [game_id, self._guesses_key(game_id), ACTIVE_GAMES_KEY]
+
+    def _touch_args(self, guess):
+        ttl_ms = int(self.game_ttl * 1000) if self.game_ttl else 0
+        return [self.codec.encode(guess), ttl_ms, time.time()]
 
-    def _get_game(self, game_id):
+    def _migrate_legacy_game(self, game_id):
+        """Convert a game stored as a single JSON blob into the hash + list layout."""
         game_data = self.storage.get(game_id)
-        if game_data is not None:
-            return json.loads(game_data)  # json -> python object
-        return None
+        if game_data is None:
+            return
+        game_dict = json.loads(game_data)
+        pipeline = self.storage.pipeline()
+        pipeline.delete(game_id, self._guesses_key(game_id))
+        pipeline.hset(game_id, "answer", self.codec.encode(game_dict.get("answer")))
+        for guess in game_dict.get("guesses", []):
+            # Old blobs stored full comparisons; keep just the guessed artist
+            guess = guess.get("guess_artist", guess)
+            pipeline.rpush(self._guesses_key(game_id), self.codec.encode(guess))
+        pipeline.execute()
 
-    def _set_game(self, game_id, game_dict):
-        self.storage.set(game_id, json.dumps(game_dict))
+    def _run(self, game_id, operation):
+        try:
+            return operation()
+        except redis.ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            self._migrate_legacy_game(game_id)
+            return operation()
 
+    @_redis_call
     def exists(self, game_id):
         return self.storage.exists(game_id)
-    
+
+    @_redis_call
+    def create_game(self, game_id, answer):
+        now = time.time()
+        pipeline = self.storage.pipeline()
+        pipeline.delete(game_id, self._guesses_key(game_id))
+        pipeline.hset(game_id, "answer", self.codec.encode(answer))
+        if self.game_ttl:
+            pipeline.expire(game_id, int(self.game_ttl))
+        pipeline.zadd(ACTIVE_GAMES_KEY, {game_id: now})
+        prune_active_games(pipeline, self.game_ttl, now)
+        pipeline.execute()
+
+    @_redis_call
+    def get_answer(self, game_id):
+        answer = self._run(game_id, lambda: self.storage.hget(game_id, "answer"))
+        if answer is not None:
+            return self.codec.decode(answer)
+        return None
+
+    @_redis_call
+    def add_guess(self, game_id, guess):
+        count = self._run(
+            game_id,
+            lambda: self._add_guess_script(
+                keys=self._game_keys(game_id),
+                args=self._touch_args(guess),
+            ),
+        )
+        return count or None
+
+    def record_guess(self, game_id, guess, compute_fn):
+        # compute_fn runs outside the Redis stage
+        with self.stage(REDIS_STAGE):
+            result = self._run(
+                game_id,
+                lambda: self._record_guess_script(
+                    keys=self._game_keys(game_id),
+                    args=self._touch_args(guess),
+                ),
+            )
+        if result is None:
+            return None
+        answer, guess_number = result
+        return compute_fn(self.codec.decode(answer), guess_number)
+
+    @_redis_call
+    def get_guesses(self, game_id):
+        def read():
+            pipeline = self.storage.pipeline()
+            pipeline.hexists(game_id, "answer")
+            pipeline.lrange(self._guesses_key(game_id), 0, -1)
+            return pipeline.execute()
+
+        exists, guesses = self._run(game_id, read)
+        if not exists:
+            return None
+        return [self.codec.decode(guess) for guess in guesses]
+
+    @_redis_call
+    def stats(self):
+        pipeline = self.storage.pipeline()
+        prune_active_games(pipeline, self.game_ttl, time.time())
+        pipeline.zcard(ACTIVE_GAMES_KEY)
+        pipeline.info("memory")
+        results = pipeline.execute()
+        return {"games": results[-2], "bytes": results[-1]["used_memory"]}
+
+    @_redis_call
+    def get_value(self, key):
+        value = self.storage.get(key)
+        if value is not None:
+            return json.loads(value)
+        return None
+
+    @_redis_call
+    def set_value(self, key, value, ttl=None):
+        self.storage.set(key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    @_redis_call
+    def add_value(self, key, value, ttl=None):
+        return bool(
+            self.storage.set(key, json.dumps(value), nx=True, px=int(ttl * 1000) if ttl else None)
+        )
+
+    @_redis_call
+    def delete_value(self, key):
+        self.storage.delete(key)
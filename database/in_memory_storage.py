@@ -1,16 +1,119 @@
+import json
+import threading
+import time
+from collections import OrderedDict
 from .base_database import BaseDatabase
 
 class InMemoryDatabase(BaseDatabase):
-    """In-memory database for tests and development"""
+    """
+    In-memory database for tests and development.
+    Optionally bounded: games expire game_ttl seconds after their last
+    activity, and the least recently used games are evicted past max_games.
+    """
     
-    def __init__(self, host=None, port=None):
-        self.storage = {}
-    
-    def _get_game(self, game_id):
-        return self.storage.get(game_id)
-    
-    def _set_game(self, game_id, game_dict):
-        self.storage[game_id] = game_dict
+    def __init__(self, host=None, port=None, max_games=None, game_ttl=None, clock=time.time):
+        self.max_games = max_games
+        self.game_ttl = game_ttl
+        self.clock = clock
+        # game_id -> {"answer": ..., "guesses": [...], "expires_at": ...},
+        # least recently used first
+        self.storage = OrderedDict()
+        # key -> (json string, expires_at or None), mirrors Redis SET EX
+        self.values = {}
+        # Makes add_guess atomic like the Redis script
+        self._lock = threading.RLock()
+
+    def _live_game(self, game_id):
+        game_dict = self.storage.get(game_id)
+        if game_dict is None:
+            return None
+        if game_dict["expires_at"] is not None and self.clock() >= game_dict["expires_at"]:
+            self.storage.pop(game_id, None)
+            return None
+        return game_dict
+
+    def _touch(self, game_id, game_dict):
+        if self.game_ttl:
+            game_dict["expires_at"] = self.clock() + self.game_ttl
+        self.storage.move_to_end(game_id)
+        if self.max_games is not None:
+            while len(self.storage) > self.max_games:
+                self.storage.popitem(last=False)
     
     def exists(self, game_id):
-        return game_id in self.storage
\ No newline at end of file
+        with self._lock:
+            return self._live_game(game_id) is not None
+
+    def create_game(self, game_id, answer):
+        with self._lock:
+            game_dict = {"answer": answer, "guesses": [], "expires_at": None}
+            self.storage[game_id] = game_dict
+            self._touch(game_id, game_dict)
+
+    def get_answer(self, game_id):
+        with self._lock:
+            game_dict = self._live_game(game_id)
+            if game_dict is not None:
+                return game_dict["answer"]
+            return None
+
+    def add_guess(self, game_id, guess):
+        with self._lock:
+            game_dict = self._live_game(game_id)
+            if game_dict is None:
+                return None
+            game_dict["guesses"].append(guess)
+            self._touch(game_id, game_dict)
+            return len(game_dict["guesses"])
+
+    def record_guess(self, game_id, guess, compute_fn):
+        with self._lock:
+            game_dict = self._live_game(game_id)
+            if game_dict is None:
+                return None
+            game_dict["guesses"].append(guess)
+            self._touch(game_id, game_dict)
+            answer, guess_number = game_dict["answer"], len(game_dict["guesses"])
+        return compute_fn(answer, guess_number)
+
+    def get_guesses(self, game_id):
+        with self._lock:
+            game_dict = self._live_game(game_id)
+            if game_dict is not None:
+                return list(game_dict["guesses"])
+            return None
+
+    def stats(self):
+        with self._lock:
+            for game_id in list(self.storage):
+                self._live_game(game_id)
+            games_bytes = sum(
+                len(json.dumps([game_dict["answer"], game_dict["guesses"]]))
+                for game_dict in self.storage.values()
+            )
+            values_bytes = sum(len(value) for value, _ in self.values.values())
+            return {"games": len(self.storage), "bytes": games_bytes + values_bytes}
+
+    def get_value(self, key):
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and self.clock() >= expires_at:
+            self.values.pop(key, None)
+            return None
+        return json.loads(value)
+
+    def set_value(self, key, value, ttl=None):
+        expires_at = self.clock() + ttl if ttl else None
+        self.values[key] = (json.dumps(value), expires_at)
+
+    def add_value(self, key, value, ttl=None):
+        with self._lock:
+            if self.get_value(key) is not None:
+                return False
+            self.set_value(key, value, ttl)
+            return True
+
+    def delete_value(self, key):
+        self.values.pop(key, None)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import random
+import sys
+import threading
+import time
+
+from games import POSSIBLE_ANSWERS
+
+POOL_KEY = "answer-pool"
+REFRESHED_AT_KEY = "answer-pool:refreshed-at"
+DEFAULT_REFRESH_INTERVAL = 6 * 60 * 60
+
+
+class AnswerPool:
+    """
+    Pre-resolved answer profiles for the curated artist list.
+
+    The whole pool is stored as one value in the shared database, so
+    /new-game costs a single read and a random pick instead of a live
+    MusicBrainz + Spotify lookup. A background thread keeps it fresh.
+    """
+
+    def __init__(self, database, resolve, names=None, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.database = database
+        self.resolve = resolve
+        self.names = list(POSSIBLE_ANSWERS if names is None else names)
+        self.refresh_interval = refresh_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """
+        Resolve every curated name and store the pool.
+        A name that fails to resolve, or only resolves to a degraded
+        profile, keeps its last known good profile.
+        Returns the list of names that failed.
+        """
+        pool = self.database.get_value(POOL_KEY) or {}
+        failed = []
+        for name in self.names:
+            try:
+                profile = self.resolve(name)
+            except Exception as e:
+                print(f"Error refreshing answer '{name}': {e}", file=sys.stderr)
+                failed.append(name)
+                continue
+            # A degraded profile (Spotify down) does not replace a complete one
+            if profile.get("spotify popularity") is None and name in pool:
+                failed.append(name)
+                continue
+            pool[name] = profile
+
+        # Drop artists that were removed from the curated list
+        pool = {name: profile for name, profile in pool.items() if name in self.names}
+        self.database.set_value(POOL_KEY, pool)
+        self.database.set_value(REFRESHED_AT_KEY, time.time())
+        return failed
+
+    def pick(self):
+        """Return a random pre-resolved answer profile, or None if the pool is empty."""
+        return self.pick_from(self.database.get_value(POOL_KEY))
+
+    @staticmethod
+    def pick_from(pool):
+        """Pick from a pool value read by the caller (e.g. through an async database)."""
+        if not pool:
+            return None
+        return random.choice(list(pool.values()))
+
+    def _is_fresh(self):
+        refreshed_at = self.database.get_value(REFRESHED_AT_KEY)
+        return refreshed_at is not None and time.time() - refreshed_at < self.refresh_interval
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Every gunicorn worker runs a warmer; skip if another one just refreshed
+            if not self._is_fresh():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing answer pool: {e}", file=sys.stderr)
+            self._stop.wait(self.refresh_interval)
+
+    def start(self):
+        """Warm the pool in a background thread and keep refreshing it on a schedule."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="answer-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -1,5 +1,5 @@
 import secrets
-from flask import Flask, jsonify, session, render_template, request
+from flask import Flask, g, jsonify, session, render_template, request
 from pathlib import Path
 import os
 import dotenv
@@ -13,10 +13,38 @@ template_dir = str(project_root / "templates")
 static_dir = str(project_root / "static")
 
 from database.database import Database
-from games import Games
-from musicbrain import get_artist_data_for_game
+from games import Games, POSSIBLE_ANSWERS
+from artist_cache import ArtistCache
+from answer_pool import AnswerPool
+from artist_index import ArtistIndex
+from artist_aliases import ArtistAliases
+from suggest import SuggestIndex
+from rate_limiter import RateLimitExceeded, RateLimiter
+from single_flight import SingleFlight
+from circuit_breaker import CircuitBreaker
+from comparison_matrix import ComparisonMatrix
+from daily import DailyPuzzle, seconds_until_tomorrow
+from catalog import CatalogManager, DatabaseCatalogSource, FileCatalogSource, RecentAnswers
+from negative_cache import ArtistNotFoundError, NegativeCache
+from metrics import Metrics, get_metrics, set_metrics, stage
+from spotify import get_client as get_spotify_client
+from spotify_token import SpotifyTokenManager
+from musicbrain import (
+    LOOKUP_TIMEOUT,
+    get_artist_data_for_game,
+    set_artist_aliases,
+    set_artist_cache,
+    set_artist_index,
+    set_circuit_breakers,
+    set_musicbrainz_limiter,
+    set_negative_cache,
+    set_single_flight,
+)
 
 #CONSTANTS
+# The cross-worker lookup lock outlives the slowest lookup (which includes
+# waiting for the MusicBrainz rate limiter), so no second worker starts one
+LOOKUP_LOCK_MARGIN = 5.0
 required_env = [
     "REDIS_HOST",
     "REDIS_PORT",
@@ -25,8 +53,12 @@ required_env = [
     "SPOTIFY_CLIENT_SECRET",
 ]
 
+# Session key holding the RecentAnswers filter
+RECENT_ANSWERS_KEY = "recent"
+
 INVALID_GAME_ERROR = {"error": "ERROR", "message": "Game session invalid"}
 NO_RESULT_ERROR = {"error": "ERROR", "message": "No result returned"}
+NOT_FOUND_ERROR = {"error": "NOT_FOUND", "message": "Could not find that artist"}
 
 
 #SECRET KEY
@@ -57,38 +89,115 @@ def get_game_key():
 
 
 #APP FACTORY
-def create_app(secret_key, games_service):
+def create_app(secret_key, games_service, answer_pool=None, suggest_index=None, catalog=None, daily=None):
     app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
     app.secret_key = secret_key
 
+    if suggest_index is None:
+        suggest_index = SuggestIndex(POSSIBLE_ANSWERS)
+
+    @app.before_request
+    def start_timing():
+        metrics = get_metrics()
+        if metrics is not None:
+            g.metrics_handle = metrics.begin_request()
+
+    @app.after_request
+    def add_server_timing(response):
+        handle = g.pop("metrics_handle", None)
+        if handle is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            response.headers["Server-Timing"] = get_metrics().end_request(handle, endpoint)
+        return response
+
     @app.route("/")
     def home():
         return render_template("index.html")
 
     @app.get("/new-game")
     def new_game():
-        """Start a new game with a random curated artist."""
+        """
+        Start a new game with a random curated artist.
+        With a catalog, ?tier= picks the difficulty and answers this
+        session was given recently are avoided. ?mode=daily starts today's
+        shared puzzle instead.
+        """
         game_id = get_game_key()
+        artist_name = None
+        answer_data = None
+
+        if request.args.get("mode") == "daily":
+            if daily is None:
+                return jsonify({"error": "ERROR", "message": "Daily mode is not enabled"}), 400
+            try:
+                puzzle = daily.get()
+            except Exception as e:
+                print(f"Error loading daily puzzle: {e}", file=sys.stderr)
+                return jsonify({"error": "ERROR", "message": "Could not load the daily puzzle"}), 500
+            games_service.new_game(game_id, puzzle["answer"])
+            return jsonify({"ok": True, "date": puzzle["date"], "number": puzzle["number"]})
+
+        if catalog is not None:
+            recent = RecentAnswers.from_token(session.get(RECENT_ANSWERS_KEY))
+            try:
+                entry = catalog.pick(request.args.get("tier") or None, recent)
+            except KeyError:
+                return jsonify({"error": "ERROR", "message": "Unknown difficulty tier"}), 400
+            recent.add(entry["name"])
+            session[RECENT_ANSWERS_KEY] = recent.token()
+            artist_name = entry["name"]
+            answer_data = entry["profile"]
+        elif answer_pool is not None:
+            # Pre-resolved answers skip the upstream lookup entirely
+            answer_data = answer_pool.pick()
+
+        if answer_data is None:
+            artist_name = artist_name or games_service.select_random_artist()
+
+            try:
+                answer_data = get_artist_data_for_game(artist_name)
+            except Exception as e:
+                print(f"Error fetching artist for new game: {e}", file=sys.stderr)
+                return (
+                    jsonify(
+                        {
+                            "error": "ERROR",
+                            "message": "Could not start a new game (artist lookup failed)",
+                        }
+                    ),
+                    500,
+                )
 
-        artist_name = games_service.select_random_artist()
+        games_service.new_game(game_id, answer_data)
+
+        return jsonify({"ok": True})
 
+    @app.get("/daily")
+    def daily_info():
+        """
+        Today's puzzle date and number. The same for every player and never
+        touches the session, so a CDN can cache it until midnight UTC.
+        """
+        if daily is None:
+            return jsonify({"error": "ERROR", "message": "Daily mode is not enabled"}), 404
         try:
-            answer_data = get_artist_data_for_game(artist_name)
+            puzzle = daily.get()
         except Exception as e:
-            print(f"Error fetching artist for new game: {e}", file=sys.stderr)
+            print(f"Error loading daily puzzle: {e}", file=sys.stderr)
+            # Not cacheable, so a CDN retries instead of serving the error until midnight
             return (
-                jsonify(
-                    {
-                        "error": "ERROR",
-                        "message": "Could not start a new game (artist lookup failed)",
-                    }
-                ),
+                jsonify({"error": "ERROR", "message": "Could not load the daily puzzle"}),
                 500,
+                {"Cache-Control": "no-store"},
             )
-
-        games_service.new_game(game_id, answer_data)
-
-        return jsonify({"ok": True})
+        etag = f'"daily-{puzzle["date"]}"'
+        headers = {
+            "Cache-Control": f"public, max-age={seconds_until_tomorrow()}, stale-if-error=3600",
+            "ETag": etag,
+        }
+        if request.headers.get("If-None-Match") == etag:
+            return "", 304, headers
+        return jsonify({"date": puzzle["date"], "number": puzzle["number"]}), 200, headers
 
     @app.post("/guess")
     def submit_guess():
@@ -113,6 +222,8 @@ def create_app(secret_key, games_service):
 
         try:
             guess_json = get_artist_data_for_game(guess_text)
+        except ArtistNotFoundError:
+            return jsonify(NOT_FOUND_ERROR), 404
         except Exception as e:
             print(f"Error looking up guess artist '{guess_text}': {e}", file=sys.stderr)
             return (
@@ -125,6 +236,9 @@ def create_app(secret_key, games_service):
                 500,
             )
 
+        # Resolved names become suggestions, steering later guesses to exact names
+        suggest_index.add(guess_json.get("name"))
+
         comparison = games_service.guess(game_id, guess_json)
         if comparison is None:
             return jsonify(NO_RESULT_ERROR), 400
@@ -133,6 +247,20 @@ def create_app(secret_key, games_service):
 
         return jsonify(payload), 200
 
+    @app.get("/suggest")
+    def suggest():
+        """Typeahead suggestions for artist names starting with ?q="""
+        query = request.args.get("q", "")
+        return jsonify({"suggestions": suggest_index.suggest(query)})
+
+    @app.get("/metrics")
+    def metrics():
+        """Stage and endpoint latency histograms in the Prometheus text format."""
+        metrics = get_metrics()
+        if metrics is None:
+            return jsonify({"error": "ERROR", "message": "Metrics are disabled"}), 404
+        return metrics.render(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
     return app
 
 
@@ -145,14 +273,163 @@ def check_required_env():
             sys.exit(1)
 
 
-def launch():
+def load_environment():
     dotenv.load_dotenv(dotenv_path=project_root / ".env")
     os.environ["SECRET_KEY"] = ensure_secret_key()
     check_required_env()
 
-    database = Database(os.getenv("REDIS_HOST"), int(os.getenv("REDIS_PORT")))
-    games_service = Games(database)
-    return create_app(os.getenv("SECRET_KEY"), games_service)
+
+def configure_services():
+    """
+    Wire up the shared Redis database and the artist lookup helpers.
+    Returns (database, answer_pool, suggest_index); the answer pool is
+    already warming in the background.
+    """
+    if os.getenv("METRICS_ENABLED", "1") == "1":
+        set_metrics(Metrics())
+    database = Database(
+        os.getenv("REDIS_HOST"),
+        int(os.getenv("REDIS_PORT")),
+        game_ttl=int(os.getenv("GAME_TTL_SECONDS", "86400")),
+        stage=stage,
+    )
+    configure_database_metrics(database)
+    set_artist_cache(ArtistCache(database))
+    set_artist_aliases(ArtistAliases(database))
+    set_single_flight(SingleFlight(database, lock_ttl=LOOKUP_TIMEOUT + LOOKUP_LOCK_MARGIN))
+    configure_spotify_token(database)
+    configure_negative_cache(database)
+    breaker_options = {
+        "failure_threshold": int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+        "reset_timeout": float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+        "slow_call_threshold": float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5")),
+        "ignored": (ArtistNotFoundError, RateLimitExceeded),
+    }
+    set_circuit_breakers(
+        musicbrainz=CircuitBreaker("musicbrainz", **breaker_options),
+        spotify=CircuitBreaker("spotify", **breaker_options),
+    )
+    set_musicbrainz_limiter(
+        RateLimiter(
+            rate=float(os.getenv("MUSICBRAINZ_RATE_LIMIT", "1")),
+            redis_client=database.storage,
+        )
+    )
+    suggest_names = list(POSSIBLE_ANSWERS)
+    if os.getenv("ARTIST_INDEX_PATH"):
+        artist_index = ArtistIndex(os.getenv("ARTIST_INDEX_PATH"))
+        set_artist_index(artist_index)
+        suggest_names.extend(artist_index.names())
+    answer_pool = AnswerPool(database, get_artist_data_for_game)
+    answer_pool.start()
+    return database, answer_pool, SuggestIndex(suggest_names)
+
+
+def configure_database_metrics(database):
+    """Report the live game count and the store's memory use on /metrics."""
+    metrics = get_metrics()
+    if metrics is not None:
+        # Both gauges share one database.stats() call per scrape
+        stats = database.stats
+        metrics.add_gauge(
+            "artist_guesser_active_games",
+            "Games with activity within the game TTL.",
+            stats,
+            key="games",
+        )
+        metrics.add_gauge(
+            "artist_guesser_database_bytes",
+            "Memory used by the shared database, in bytes.",
+            stats,
+            key="bytes",
+        )
+
+
+def configure_spotify_token(database):
+    """Share one proactively refreshed Spotify token between all workers."""
+    spotify_client = get_spotify_client()
+    token_manager = SpotifyTokenManager(spotify_client.fetch_token, database)
+    spotify_client.token_manager = token_manager
+    token_manager.start()
+
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.add_gauge(
+            "artist_guesser_spotify_token_age_seconds",
+            "Seconds since the shared Spotify token was fetched.",
+            lambda: token_manager.stats()["age_seconds"],
+        )
+        metrics.add_gauge(
+            "artist_guesser_spotify_token_expires_in_seconds",
+            "Seconds until the shared Spotify token expires.",
+            lambda: token_manager.stats()["expires_in_seconds"],
+        )
+    return token_manager
+
+
+def configure_negative_cache(database):
+    """Remember queries that matched no artist for NEGATIVE_CACHE_TTL seconds."""
+    negative_cache = NegativeCache(database, ttl=int(os.getenv("NEGATIVE_CACHE_TTL", "600")))
+    set_negative_cache(negative_cache)
+
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.add_gauge(
+            "artist_guesser_negative_cache_avoided_upstream_calls",
+            "Upstream calls skipped because the query was a known miss.",
+            lambda: negative_cache.stats()["avoided_upstream_calls"],
+        )
+    return negative_cache
+
+
+def configure_catalog(database):
+    """
+    The answer catalog from CATALOG_PATH, or from the shared database when
+    CATALOG_FROM_REDIS=1, reloading in the background; None if neither is set.
+    """
+    if os.getenv("CATALOG_PATH"):
+        source = FileCatalogSource(os.getenv("CATALOG_PATH"))
+    elif os.getenv("CATALOG_FROM_REDIS") == "1":
+        source = DatabaseCatalogSource(database)
+    else:
+        return None
+    catalog = CatalogManager(source, reload_interval=float(os.getenv("CATALOG_RELOAD_SECONDS", "30")))
+    catalog.start()
+    return catalog
+
+
+def configure_daily(database, catalog=None):
+    """Today's puzzle, drawn from the catalog if there is one, prepared in the background."""
+    daily = DailyPuzzle(
+        database,
+        get_artist_data_for_game,
+        (lambda: catalog.catalog.names()) if catalog is not None else POSSIBLE_ANSWERS,
+        salt=os.getenv("DAILY_SALT") or os.getenv("SECRET_KEY"),
+    )
+    daily.start()
+    return daily
+
+
+def configure_comparison_matrix():
+    """The precomputed ComparisonMatrix at COMPARISON_MATRIX_PATH, or None if it is not set."""
+    if not os.getenv("COMPARISON_MATRIX_PATH"):
+        return None
+    return ComparisonMatrix(os.getenv("COMPARISON_MATRIX_PATH"))
+
+
+def launch():
+    load_environment()
+    database, answer_pool, suggest_index = configure_services()
+    games_service = Games(database, comparison_matrix=configure_comparison_matrix())
+    catalog = configure_catalog(database)
+    return create_app(
+        os.getenv("SECRET_KEY"),
+        games_service,
+        answer_pool,
+        suggest_index,
+        catalog,
+        configure_daily(database, catalog),
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+import threading
+
+from normalize import normalize_query
+
+KEY_PREFIX = "alias:"
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_MEMORY_SIZE = 4096
+
+# Spellings players commonly type that normalization alone cannot fix
+BUILTIN_ALIASES = {
+    "The Weekend": "The Weeknd",
+}
+
+
+class ArtistAliases:
+    """
+    Maps query variants to one canonical artist, {"name", "mbid", "spotify_id"}.
+
+    Entries come from BUILTIN_ALIASES and from every MusicBrainz and
+    Spotify search (learn()), and are stored in the shared database by normalized query,
+    so once any worker has resolved "beyonce knowles" every worker looks
+    up, caches and searches it as "Beyoncé". Resolved entries are kept in
+    memory as well, since they practically never change.
+
+    Once both ids are known the lookup fetches the artist by id from
+    MusicBrainz and Spotify instead of searching either.
+    """
+
+    def __init__(self, database, ttl=DEFAULT_TTL, builtin=BUILTIN_ALIASES, memory_size=DEFAULT_MEMORY_SIZE):
+        self.database = database
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._builtin = {normalize_query(variant): name for variant, name in builtin.items()}
+        self._memory = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "learned": 0}
+
+    def _key(self, query):
+        return KEY_PREFIX + normalize_query(query)
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def resolve(self, query):
+        """The canonical {"name", "mbid", "spotify_id"} for query, or None if it is not a known variant."""
+        key = normalize_query(query)
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self.database.get_value(KEY_PREFIX + key)
+            if entry is None and key in self._builtin:
+                name = self._builtin[key]
+                # The canonical name's own entry knows the MBID once it was searched
+                entry = self.database.get_value(self._key(name)) or {"name": name, "mbid": None, "spotify_id": None}
+            if entry is None:
+                self._count("misses")
+                return None
+            # Only complete entries are kept, so a missing id is still looked for
+            if entry.get("mbid") is not None and entry.get("spotify_id") is not None:
+                with self._lock:
+                    if len(self._memory) >= self.memory_size:
+                        self._memory.clear()
+                    self._memory[key] = entry
+        self._count("hits")
+        return entry
+
+    def canonical_name(self, query):
+        """The name to look query up by: its canonical name if known, else query itself."""
+        entry = self.resolve(query)
+        return (entry or {}).get("name") or query
+
+    def _merge(self, variant, fields):
+        # Read-modify-write: when the MusicBrainz and Spotify halves of one
+        # lookup race, one id can be lost and is simply learned again next time
+        key = KEY_PREFIX + variant
+        entry = dict(self.database.get_value(key) or {"name": None, "mbid": None, "spotify_id": None})
+        entry.update(fields)
+        self.database.set_value(key, entry, ttl=self.ttl)
+        with self._lock:
+            self._memory.pop(variant, None)
+
+    def learn(self, query, name, mbid):
+        """Record that query (and name itself) resolved to the MusicBrainz artist name/mbid."""
+        for variant in {normalize_query(query), normalize_query(name)}:
+            self._merge(variant, {"name": name, "mbid": mbid})
+        self._count("learned")
+
+    def learn_spotify_id(self, query, spotify_id):
+        """Record the Spotify artist id that query resolved to."""
+        self._merge(normalize_query(query), {"spotify_id": spotify_id})
+        self._count("learned")
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
@@ -0,0 +1,176 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from normalize import normalize_query
+
+KEY_PREFIX = "artist:"
+
+# Spotify popularity drifts daily, MusicBrainz metadata (gender, area, tag)
+# almost never changes, so each field gets its own freshness window.
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_FIELD_TTLS = {
+    "spotify popularity": 6 * 60 * 60,
+}
+DEFAULT_LRU_SIZE = 1024
+
+
+class ArtistCache:
+    """
+    Two-tier cache for artist profiles built by get_artist_data_for_game.
+
+    Profiles are keyed by the normalized query and stored in the shared
+    database (Redis in production, so every gunicorn worker sees them),
+    with a small in-process LRU in front to skip the network hop for
+    the most popular names. An LRU entry with stale fields is re-read
+    from the shared database, where another worker may have refreshed it.
+    """
+
+    def __init__(
+        self,
+        database,
+        field_ttls=None,
+        default_ttl=DEFAULT_TTL,
+        lru_size=DEFAULT_LRU_SIZE,
+        clock=time.time,
+    ):
+        self.database = database
+        self.field_ttls = dict(DEFAULT_FIELD_TTLS if field_ttls is None else field_ttls)
+        self.default_ttl = default_ttl
+        self.lru_size = lru_size
+        self.clock = clock
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"lru_hits": 0, "hits": 0, "stale": 0, "misses": 0}
+
+    def _key(self, query):
+        return KEY_PREFIX + normalize_query(query)
+
+    def ttl_for(self, field):
+        return self.field_ttls.get(field, self.default_ttl)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _load_lru(self, key):
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru.move_to_end(key)
+            return entry
+
+    def _stale_fields(self, entry):
+        now = self.clock()
+        return {
+            field
+            for field, fetched_at in entry["fetched_at"].items()
+            if now - fetched_at >= self.ttl_for(field)
+        }
+
+    def _from_shared(self, key, lru_entry, shared_entry):
+        # A stale LRU entry is only a fallback: another worker may already
+        # have stored a fresher one in the shared database
+        if shared_entry is None:
+            return (lru_entry, "lru") if lru_entry is not None else (None, None)
+        self._remember(key, shared_entry)
+        return shared_entry, "shared"
+
+    def _load(self, key):
+        """Returns (entry, tier) where tier is "lru", "shared" or None on a miss."""
+        entry = self._load_lru(key)
+        if entry is not None and not self._stale_fields(entry):
+            return entry, "lru"
+        return self._from_shared(key, entry, self.database.get_value(key))
+
+    def _result(self, entry, tier):
+        if entry is None:
+            self.counters["misses"] += 1
+            return None, set()
+
+        stale = self._stale_fields(entry)
+        if stale:
+            self.counters["stale"] += 1
+        else:
+            self.counters["lru_hits" if tier == "lru" else "hits"] += 1
+        return copy.deepcopy(entry["profile"]), stale
+
+    def _build_entry(self, profile, fields, previous, stale=None):
+        """Returns (entry, ttl) for storing profile on top of a previous entry."""
+        now = self.clock()
+        fetched_at = {}
+        if fields is not None and previous is not None:
+            fetched_at.update(previous["fetched_at"])
+        for field in profile:
+            if fields is None or field in fields or field not in fetched_at:
+                fetched_at[field] = now
+        for field in stale or ():
+            fetched_at[field] = 0
+
+        entry = {"profile": copy.deepcopy(profile), "fetched_at": fetched_at}
+        ttl = max([self.ttl_for(field) for field in fetched_at] or [self.default_ttl])
+        return entry, ttl
+
+    def get(self, query):
+        """
+        Look up a cached profile.
+        Returns (profile, stale_fields): profile is None on a miss, and
+        stale_fields is the set of fields whose TTL has run out.
+        """
+        return self._result(*self._load(self._key(query)))
+
+    def put(self, query, profile, fields=None, stale=None):
+        """
+        Store a profile. When fields is given only those fields are marked
+        as freshly fetched, the others keep their previous timestamps.
+        Fields in stale are stored as already expired (e.g. a placeholder
+        value served while an upstream was down).
+        """
+        key = self._key(query)
+        previous = self._load(key)[0] if fields is not None else None
+        entry, ttl = self._build_entry(profile, fields, previous, stale)
+        self.database.set_value(key, entry, ttl=ttl)
+        self._remember(key, entry)
+
+    def invalidate(self, query):
+        key = self._key(query)
+        with self._lock:
+            self._lru.pop(key, None)
+        self.database.delete_value(key)
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["lru_size"] = len(self._lru)
+        lookups = stats["lru_hits"] + stats["hits"] + stats["stale"] + stats["misses"]
+        stats["hit_rate"] = (stats["lru_hits"] + stats["hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+class AsyncArtistCache(ArtistCache):
+    """ArtistCache over an AsyncBaseDatabase, for the asyncio serving mode."""
+
+    async def _load_async(self, key):
+        entry = self._load_lru(key)
+        if entry is not None and not self._stale_fields(entry):
+            return entry, "lru"
+        return self._from_shared(key, entry, await self.database.get_value(key))
+
+    async def get(self, query):
+        return self._result(*await self._load_async(self._key(query)))
+
+    async def put(self, query, profile, fields=None, stale=None):
+        key = self._key(query)
+        previous = (await self._load_async(key))[0] if fields is not None else None
+        entry, ttl = self._build_entry(profile, fields, previous, stale)
+        await self.database.set_value(key, entry, ttl=ttl)
+        self._remember(key, entry)
+
+    async def invalidate(self, query):
+        key = self._key(query)
+        with self._lock:
+            self._lru.pop(key, None)
+        await self.database.delete_value(key)
@@ -0,0 +1,161 @@
+import json
+import mmap
+import struct
+import sys
+
+from normalize import normalize_query
+
+# File layout (little endian):
+#   header:  magic, version, entry count
+#   table:   one (key offset, record offset) pair per entry, sorted by key
+#   data:    keys as u16 length + utf-8, records as u32 length + JSON
+MAGIC = b"AIDX"
+# Keys depend on normalize_query(); bump whenever it changes (2: accent,
+# punctuation and article folding, 3: symbol-only names keep their text)
+VERSION = 3
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<II")
+KEY_LENGTH = struct.Struct("<H")
+RECORD_LENGTH = struct.Struct("<I")
+
+
+def _to_record(artist):
+    """Convert one seed line into the stored record (game profile + ids)."""
+    area = artist.get("area")
+    return {
+        "mbid": artist.get("mbid"),
+        "spotify_id": artist.get("spotify_id"),
+        "profile": {
+            "name": artist["name"],
+            "type": artist.get("type"),
+            "gender": artist.get("gender"),
+            "life-span": artist.get("life-span"),
+            "area": {"name": area} if isinstance(area, str) else area,
+            "spotify popularity": artist.get("popularity"),
+            "tag": artist.get("tag"),
+        },
+    }
+
+
+def load_seed(seed_path):
+    """
+    Yield artists from a JSON lines seed file. Each line looks like:
+    {"name": "Pitbull", "aliases": ["Mr. 305"], "mbid": "...", "gender": "male",
+     "area": "United States", "tag": "dance-pop", "popularity": 85}
+    """
+    with open(seed_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def build_index(artists, index_path):
+    """
+    Write an index file for the given artists. Every artist is reachable by
+    its normalized name and aliases; when two artists share a key the more
+    popular one wins. Returns the number of keys written.
+    """
+    artists = sorted(artists, key=lambda a: a.get("popularity") or 0, reverse=True)
+
+    records = []
+    keys = {}
+    for artist in artists:
+        record_index = len(records)
+        records.append(json.dumps(_to_record(artist), separators=(",", ":")).encode("utf-8"))
+        for name in [artist["name"], *artist.get("aliases", [])]:
+            keys.setdefault(normalize_query(name), record_index)
+
+    sorted_keys = sorted((key.encode("utf-8"), record) for key, record in keys.items())
+
+    data = bytearray()
+    record_offsets = []
+    data_start = HEADER.size + ENTRY.size * len(sorted_keys)
+    for record in records:
+        record_offsets.append(data_start + len(data))
+        data += RECORD_LENGTH.pack(len(record)) + record
+
+    table = bytearray()
+    for key, record_index in sorted_keys:
+        table += ENTRY.pack(data_start + len(data), record_offsets[record_index])
+        data += KEY_LENGTH.pack(len(key)) + key
+
+    with open(index_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sorted_keys)))
+        f.write(table)
+        f.write(data)
+    return len(sorted_keys)
+
+
+class ArtistIndex:
+    """
+    Read-only, memory-mapped artist index used to resolve guesses without
+    any network I/O. Opening is O(1); lookups binary search the sorted key
+    table directly in the mapped file, so only touched pages are loaded.
+    """
+
+    def __init__(self, index_path):
+        self._file = open(index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{index_path} is not a version {VERSION} artist index")
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(self._map, HEADER.size + position * ENTRY.size)
+
+    def _key_at(self, offset):
+        (length,) = KEY_LENGTH.unpack_from(self._map, offset)
+        start = offset + KEY_LENGTH.size
+        return self._map[start:start + length]
+
+    def _record_at(self, offset):
+        (length,) = RECORD_LENGTH.unpack_from(self._map, offset)
+        start = offset + RECORD_LENGTH.size
+        return json.loads(self._map[start:start + length])
+
+    def lookup_record(self, query):
+        """Return the stored record ({"mbid", "spotify_id", "profile"}) or None."""
+        key = normalize_query(query).encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, record_offset = self._entry(middle)
+            candidate = self._key_at(key_offset)
+            if candidate == key:
+                return self._record_at(record_offset)
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def lookup(self, query):
+        """Return the game profile for a name or alias, or None on a miss."""
+        record = self.lookup_record(query)
+        return record["profile"] if record is not None else None
+
+    def names(self):
+        """Yield the canonical name of every indexed artist once."""
+        seen = set()
+        for position in range(self._count):
+            _, record_offset = self._entry(position)
+            if record_offset not in seen:
+                seen.add(record_offset)
+                yield self._record_at(record_offset)["profile"]["name"]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python src/artist_index.py <seed.jsonl> <output.idx>", file=sys.stderr)
+        sys.exit(1)
+    count = build_index(load_seed(sys.argv[1]), sys.argv[2])
+    print(f"Wrote {count} keys to {sys.argv[2]}")
@@ -0,0 +1,181 @@
+import os
+import secrets
+import sys
+from pathlib import Path
+
+from quart import Quart, jsonify, session, render_template, request
+
+#PATH SETUP
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from app import (
+    INVALID_GAME_ERROR,
+    NOT_FOUND_ERROR,
+    NO_RESULT_ERROR,
+    configure_comparison_matrix,
+    configure_services,
+    load_environment,
+    static_dir,
+    template_dir,
+)
+from answer_pool import POOL_KEY, AnswerPool
+from artist_cache import AsyncArtistCache
+from async_lookup import (
+    ASYNC_POOL_SIZE,
+    AsyncArtistLookup,
+    AsyncMusicBrainzClient,
+    AsyncSpotifyClient,
+)
+from database.async_database import AsyncDatabase
+from games import AsyncGames, POSSIBLE_ANSWERS
+from musicbrain import get_artist_index
+from negative_cache import ArtistNotFoundError, AsyncNegativeCache
+from rate_limiter import RateLimiter
+from suggest import SuggestIndex
+
+
+def get_game_key():
+    if "sid" not in session:
+        session["sid"] = secrets.token_hex(16)
+    return f"game:{session['sid']}"
+
+
+#APP FACTORY
+def create_async_app(secret_key, games_service, artist_lookup, suggest_index=None):
+    """
+    ASGI version of app.create_app. Views are coroutines, so one process
+    can hold hundreds of guesses waiting on MusicBrainz/Spotify/Redis.
+    games_service is an AsyncGames and artist_lookup an AsyncArtistLookup.
+    """
+    app = Quart(__name__, template_folder=template_dir, static_folder=static_dir)
+    app.secret_key = secret_key
+
+    if suggest_index is None:
+        suggest_index = SuggestIndex(POSSIBLE_ANSWERS)
+
+    @app.after_serving
+    async def close_clients():
+        await artist_lookup.aclose()
+
+    @app.route("/")
+    async def home():
+        return await render_template("index.html")
+
+    @app.get("/new-game")
+    async def new_game():
+        """Start a new game with a random curated artist."""
+        game_id = get_game_key()
+
+        answer_data = AnswerPool.pick_from(await games_service.database.get_value(POOL_KEY))
+
+        if answer_data is None:
+            artist_name = games_service.select_random_artist()
+
+            try:
+                answer_data = await artist_lookup.get_artist_data_for_game(artist_name)
+            except Exception as e:
+                print(f"Error fetching artist for new game: {e}", file=sys.stderr)
+                return (
+                    jsonify(
+                        {
+                            "error": "ERROR",
+                            "message": "Could not start a new game (artist lookup failed)",
+                        }
+                    ),
+                    500,
+                )
+
+        await games_service.new_game(game_id, answer_data)
+
+        return jsonify({"ok": True})
+
+    @app.post("/guess")
+    async def submit_guess():
+        game_id = get_game_key()
+
+        if not await games_service.exists(game_id):
+            return jsonify(INVALID_GAME_ERROR), 400
+
+        data = await request.get_json(silent=True) or {}
+        guess_text = str(data.get("guess", "")).strip()
+
+        if not guess_text:
+            return (
+                jsonify(
+                    {
+                        "error": "ERROR",
+                        "message": "Guess must be a non-empty artist name",
+                    }
+                ),
+                400,
+            )
+
+        try:
+            guess_json = await artist_lookup.get_artist_data_for_game(guess_text)
+        except ArtistNotFoundError:
+            return jsonify(NOT_FOUND_ERROR), 404
+        except Exception as e:
+            print(f"Error looking up guess artist '{guess_text}': {e}", file=sys.stderr)
+            return (
+                jsonify(
+                    {
+                        "error": "ERROR",
+                        "message": "Could not find that artist",
+                    }
+                ),
+                500,
+            )
+
+        suggest_index.add(guess_json.get("name"))
+
+        comparison = await games_service.guess(game_id, guess_json)
+        if comparison is None:
+            return jsonify(NO_RESULT_ERROR), 400
+
+        payload = games_service.build_guess_response(comparison)
+
+        return jsonify(payload), 200
+
+    @app.get("/suggest")
+    async def suggest():
+        """Typeahead suggestions for artist names starting with ?q="""
+        query = request.args.get("q", "")
+        return jsonify({"suggestions": suggest_index.suggest(query)})
+
+    return app
+
+
+#LAUNCH
+def launch():
+    """
+    Build the ASGI app, e.g. `uvicorn --factory src.asgi:launch`.
+    The answer pool warmer keeps running on the sync stack in a thread.
+    """
+    load_environment()
+    sync_database, _, suggest_index = configure_services()
+
+    database = AsyncDatabase(
+        os.getenv("REDIS_HOST"),
+        int(os.getenv("REDIS_PORT")),
+        game_ttl=int(os.getenv("GAME_TTL_SECONDS", "86400")),
+    )
+    pool_size = int(os.getenv("SPOTIFY_POOL_SIZE", ASYNC_POOL_SIZE))
+    limiter = RateLimiter(
+        rate=float(os.getenv("MUSICBRAINZ_RATE_LIMIT", "1")),
+        redis_client=sync_database.storage,
+    )
+    artist_lookup = AsyncArtistLookup(
+        AsyncSpotifyClient(database=database, pool_size=pool_size),
+        AsyncMusicBrainzClient(limiter=limiter),
+        cache=AsyncArtistCache(database),
+        index=get_artist_index(),
+        negative_cache=AsyncNegativeCache(database, ttl=int(os.getenv("NEGATIVE_CACHE_TTL", "600"))),
+    )
+    return create_async_app(
+        os.getenv("SECRET_KEY"),
+        AsyncGames(database, comparison_matrix=configure_comparison_matrix()),
+        artist_lookup,
+        suggest_index,
+    )
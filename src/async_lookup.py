@@ -0,0 +1,250 @@
+import asyncio
+import base64
+import copy
+import os
+import time
+
+import httpx
+
+from musicbrain import LOOKUP_TIMEOUT, POPULARITY_FIELD, build_artist_profile
+from negative_cache import ArtistNotFoundError
+from normalize import normalize_query
+from spotify import (
+    API_URL,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TOKEN_LIFETIME,
+    MAX_RETRY_AFTER,
+    RETRY_STATUSES,
+    TOKEN_URL,
+)
+from spotify_token import MIN_REMAINING, TOKEN_KEY
+
+MUSICBRAINZ_URL = "https://musicbrainz.org/ws/2"
+
+# One event loop serves many concurrent guesses, so it needs a bigger pool
+ASYNC_POOL_SIZE = 100
+
+
+def _retry_delay(response, attempt, backoff_factor):
+    """Seconds to wait before the next attempt, or None if Retry-After is above MAX_RETRY_AFTER."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after) if float(retry_after) <= MAX_RETRY_AFTER else None
+    return backoff_factor * (2 ** attempt)
+
+
+class _AsyncHttpClient:
+    """Pooled keep-alive httpx client with retry/backoff on 429/5xx."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_retries=3, backoff_factor=0.5, timeout=10, headers=None):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+            headers=headers,
+        )
+
+    async def request(self, method, url, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            delay = _retry_delay(response, attempt, self.backoff_factor)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        return response
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AsyncSpotifyClient(_AsyncHttpClient):
+    """
+    asyncio counterpart of spotify.SpotifyClient. With a database given,
+    the access token is the one SpotifyTokenManager keeps fresh in it
+    (started by app.configure_services()); the token endpoint is only
+    called inline when no valid shared token is there.
+    """
+
+    def __init__(self, database=None, **kwargs):
+        super().__init__(**kwargs)
+        self.database = database
+        self._token = None
+        self._token_expiry = 0
+        self._token_lock = asyncio.Lock()
+
+    async def _load_shared(self):
+        token = await self.database.get_value(TOKEN_KEY)
+        if token is None or token["expires_at"] - time.time() <= MIN_REMAINING:
+            return None
+        return token
+
+    async def _fetch_token(self):
+        client_id = os.getenv("SPOTIFY_CLIENT_ID")
+        client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+        if not client_id or not client_secret:
+            raise RuntimeError("SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET must be set")
+
+        auth_header = base64.b64encode(
+            f"{client_id}:{client_secret}".encode("utf-8")
+        ).decode("utf-8")
+        response = await self.request(
+            "POST",
+            TOKEN_URL,
+            headers={"Authorization": f"Basic {auth_header}"},
+            data={"grant_type": "client_credentials"},
+        )
+        token_data = response.json()
+        now = time.time()
+        expires_in = int(token_data.get("expires_in", DEFAULT_TOKEN_LIFETIME))
+        token = {
+            "access_token": token_data["access_token"],
+            "fetched_at": now,
+            "expires_at": now + expires_in,
+        }
+        if self.database is not None:
+            await self.database.set_value(TOKEN_KEY, token, ttl=expires_in)
+        return token
+
+    async def request_access_token(self):
+        if self._token and time.time() < self._token_expiry:
+            return self._token
+
+        async with self._token_lock:
+            if self._token and time.time() < self._token_expiry:
+                return self._token
+
+            token = await self._load_shared() if self.database is not None else None
+            if token is None:
+                token = await self._fetch_token()
+            self._token = token["access_token"]
+            # Same rule as SpotifyTokenManager: never use a token with less than MIN_REMAINING left
+            self._token_expiry = token["expires_at"] - MIN_REMAINING
+            return self._token
+
+    async def get_artist_popularity(self, query):
+        token = await self.request_access_token()
+        response = await self.request(
+            "GET",
+            f"{API_URL}/search",
+            params={"q": query, "type": "artist", "limit": 1},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        items = response.json()["artists"]["items"]
+        if not items:
+            raise ArtistNotFoundError(f"No Spotify artist matches '{query}'")
+        return items[0]["popularity"]
+
+
+class AsyncMusicBrainzClient(_AsyncHttpClient):
+    """
+    Calls the MusicBrainz JSON web service directly (musicbrainzngs is
+    blocking) and returns artists in the musicbrainzngs shape, so the
+    profile is built by the same code as the sync path.
+    """
+
+    def __init__(self, limiter=None, **kwargs):
+        email = os.getenv("USER_EMAIL") or "example@example.com"
+        super().__init__(headers={"User-Agent": f"ArtistGuesser/1.0 ( {email} )"}, **kwargs)
+        self.limiter = limiter
+
+    async def _get(self, path, params):
+        if self.limiter is not None:
+            await self.limiter.acquire_async()
+        response = await self.request("GET", f"{MUSICBRAINZ_URL}/{path}", params={**params, "fmt": "json"})
+        return response.json()
+
+    async def get_full_artist_by_query(self, query):
+        result = await self._get("artist/", {"query": query, "limit": 1})
+        if not result.get("artists"):
+            raise ArtistNotFoundError(f"No MusicBrainz artist matches '{query}'")
+        artist_id = result["artists"][0]["id"]
+        artist = await self._get(f"artist/{artist_id}", {"inc": "tags"})
+        artist["tag-list"] = [
+            {"name": tag["name"], "count": str(tag.get("count", 0))}
+            for tag in artist.pop("tags", [])
+        ]
+        return {"artist": artist}
+
+
+class AsyncArtistLookup:
+    """
+    asyncio version of musicbrain.get_artist_data_for_game: local index,
+    then AsyncArtistCache and AsyncNegativeCache, then both upstreams
+    concurrently under one deadline. Concurrent misses for the same artist
+    share one task.
+    """
+
+    def __init__(self, spotify, musicbrainz, cache=None, index=None, timeout=LOOKUP_TIMEOUT, negative_cache=None):
+        self.spotify = spotify
+        self.musicbrainz = musicbrainz
+        self.cache = cache
+        self.index = index
+        self.timeout = timeout
+        self.negative_cache = negative_cache
+        self._in_flight = {}
+
+    async def get_artist_data_for_game(self, query):
+        if self.index is not None:
+            indexed = self.index.lookup(query)
+            if indexed is not None:
+                return indexed
+
+        cached, stale_fields = None, set()
+        if self.cache is not None:
+            cached, stale_fields = await self.cache.get(query)
+            if cached is not None and not stale_fields:
+                return cached
+
+        # Only consulted on a cache miss, so cached guesses cost no extra round trip
+        if cached is None and self.negative_cache is not None and await self.negative_cache.contains(query):
+            raise ArtistNotFoundError(f"No artist matches '{query}' (cached)")
+
+        key = normalize_query(query)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(query, cached, stale_fields))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: one cancelled waiter must not cancel the fetch the others share
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _refresh(self, query, cached, stale_fields):
+        if cached is not None and stale_fields == {POPULARITY_FIELD}:
+            cached[POPULARITY_FIELD] = await asyncio.wait_for(
+                self.spotify.get_artist_popularity(query), self.timeout
+            )
+            await self.cache.put(query, cached, fields=stale_fields)
+            return cached
+
+        try:
+            result = await self._fetch(query)
+        except ArtistNotFoundError:
+            # Remembered once by the shared task, not by every waiter
+            if self.negative_cache is not None:
+                await self.negative_cache.remember(query)
+            raise
+        if self.cache is not None:
+            await self.cache.put(query, result)
+        return result
+
+    async def _fetch(self, query):
+        musicbrainz_task = asyncio.ensure_future(self.musicbrainz.get_full_artist_by_query(query))
+        popularity_task = asyncio.ensure_future(self.spotify.get_artist_popularity(query))
+        try:
+            full_artist, popularity = await asyncio.wait_for(
+                asyncio.gather(musicbrainz_task, popularity_task), self.timeout
+            )
+        except BaseException:
+            # Cancel whichever half is still running
+            musicbrainz_task.cancel()
+            popularity_task.cancel()
+            raise
+        return build_artist_profile(full_artist, popularity)
+
+    async def aclose(self):
+        await self.spotify.aclose()
+        await self.musicbrainz.aclose()
@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import dotenv
+
+#PATH SETUP
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from artist_cache import ArtistCache
+from database.database import Database
+from musicbrain import (
+    POPULARITY_FIELD,
+    build_artist_profile,
+    get_full_artist,
+    set_musicbrainz_limiter,
+)
+from normalize import normalize_query
+from rate_limiter import RateLimiter
+from spotify import MAX_ARTIST_IDS, get_client
+
+SPOTIFY_ARTIST_URL = re.compile(r"open\.spotify\.com/artist/([A-Za-z0-9]+)")
+
+
+def spotify_id_from_relations(full_artist):
+    """The Spotify artist id from a MusicBrainz artist's url-rels, or None."""
+    for relation in full_artist["artist"].get("url-relation-list", []):
+        match = SPOTIFY_ARTIST_URL.search(relation.get("target", ""))
+        if match:
+            return match.group(1)
+    return None
+
+
+def load_checkpoint(output_path):
+    """Normalized queries already written to output_path by an earlier run."""
+    done = set()
+    if not Path(output_path).exists():
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                done.add(normalize_query(json.loads(line)["query"]))
+    return done
+
+
+def _to_seed_line(query, mbid, spotify_id, profile):
+    """A record in the seed format read by artist_index.load_seed."""
+    return {
+        "query": query,
+        "name": profile["name"],
+        "mbid": mbid,
+        "spotify_id": spotify_id,
+        "type": profile.get("type"),
+        "gender": profile.get("gender"),
+        "life-span": profile.get("life-span"),
+        "area": profile.get("area"),
+        "tag": profile.get("tag"),
+        "popularity": profile.get(POPULARITY_FIELD),
+    }
+
+
+class BatchResolver:
+    """
+    Resolves a list of artist names into game profiles in bulk.
+
+    Names are processed in chunks of MAX_ARTIST_IDS. The MusicBrainz
+    lookups of a chunk run in parallel (paced by the installed MusicBrainz
+    rate limiter) and also fetch url-rels, which give most artists their
+    Spotify id, so the whole chunk's popularity comes from a single
+    "Get Several Artists" call. Artists without a Spotify link fall back
+    to a search. Each finished chunk is appended to the output file, which
+    doubles as the checkpoint a later run resumes from.
+    """
+
+    def __init__(self, spotify_client=None, cache=None, workers=4, chunk_size=MAX_ARTIST_IDS):
+        self.spotify = spotify_client or get_client()
+        self.cache = cache
+        self.workers = workers
+        self.chunk_size = min(chunk_size, MAX_ARTIST_IDS)
+        self.counters = {"resolved": 0, "skipped": 0, "failed": 0, "spotify_batches": 0, "spotify_searches": 0}
+
+    def _musicbrainz(self, name):
+        try:
+            return get_full_artist(name, includes=("tags", "url-rels")), None
+        except Exception as e:
+            return None, e
+
+    def _search_popularity(self, name):
+        try:
+            return self.spotify.get_artist_popularity(name)
+        except Exception as e:
+            print(f"No Spotify popularity for '{name}': {e}", file=sys.stderr)
+            return None
+
+    def resolve_chunk(self, names, executor):
+        """Returns (seed lines, failed names) for up to chunk_size names."""
+        lookups = list(executor.map(self._musicbrainz, names))
+
+        found = []
+        failed = []
+        for name, (full_artist, error) in zip(names, lookups):
+            if error is not None:
+                print(f"Could not resolve '{name}': {error}", file=sys.stderr)
+                failed.append(name)
+            else:
+                found.append((name, full_artist, spotify_id_from_relations(full_artist)))
+
+        popularity = {}
+        ids = [spotify_id for _, _, spotify_id in found if spotify_id]
+        if ids:
+            self.counters["spotify_batches"] += 1
+            try:
+                for artist in self.spotify.get_artists(ids):
+                    if artist is not None:
+                        popularity[artist["id"]] = artist["popularity"]
+            except Exception as e:
+                print(f"Spotify batch lookup failed: {e}", file=sys.stderr)
+
+        unlinked = [name for name, _, spotify_id in found if spotify_id not in popularity]
+        self.counters["spotify_searches"] += len(unlinked)
+        searched = dict(zip(unlinked, executor.map(self._search_popularity, unlinked)))
+
+        lines = []
+        for name, full_artist, spotify_id in found:
+            mbid = full_artist["artist"].get("id")
+            artist_popularity = popularity.get(spotify_id, searched.get(name))
+            profile = build_artist_profile(full_artist, artist_popularity)
+            lines.append(_to_seed_line(name, mbid, spotify_id, profile))
+            if self.cache is not None:
+                unknown = {POPULARITY_FIELD} if artist_popularity is None else None
+                self.cache.put(name, profile, stale=unknown)
+        return lines, failed
+
+    def resolve(self, names, output_path):
+        """
+        Resolve every name not already in output_path, appending seed lines
+        to it chunk by chunk. Returns the names that failed.
+        """
+        done = load_checkpoint(output_path)
+        pending = []
+        seen = set(done)
+        for name in names:
+            key = normalize_query(name)
+            if key in seen:
+                self.counters["skipped"] += 1
+                continue
+            seen.add(key)
+            pending.append(name)
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor, \
+                open(output_path, "a", encoding="utf-8") as output:
+            for start in range(0, len(pending), self.chunk_size):
+                lines, chunk_failed = self.resolve_chunk(pending[start:start + self.chunk_size], executor)
+                for line in lines:
+                    output.write(json.dumps(line) + "\n")
+                # The chunk is only checkpointed once it is on disk
+                output.flush()
+                os.fsync(output.fileno())
+                self.counters["resolved"] += len(lines)
+                self.counters["failed"] += len(chunk_failed)
+                failed.extend(chunk_failed)
+                print(f"{self.counters['resolved']} resolved, {len(failed)} failed", file=sys.stderr)
+        return failed
+
+
+def read_names(names_path):
+    with open(names_path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Resolve a list of artist names (one per line) into a seed file for artist_index.py."
+    )
+    parser.add_argument("names", help="text file with one artist name per line")
+    parser.add_argument("output", help="JSON lines output; rerunning resumes from it")
+    parser.add_argument("--workers", type=int, default=4, help="parallel MusicBrainz lookups")
+    parser.add_argument("--musicbrainz-rate", type=float, default=1.0,
+                        help="MusicBrainz requests per second (default 1, the public API limit)")
+    parser.add_argument("--redis", metavar="HOST:PORT", help="also store every profile in the shared artist cache")
+    args = parser.parse_args(argv)
+
+    dotenv.load_dotenv(dotenv_path=project_root / ".env")
+    set_musicbrainz_limiter(RateLimiter(rate=args.musicbrainz_rate, max_wait=float("inf")))
+
+    cache = None
+    if args.redis:
+        host, port = args.redis.rsplit(":", 1)
+        cache = ArtistCache(Database(host, int(port)))
+
+    resolver = BatchResolver(cache=cache, workers=args.workers)
+    failed = resolver.resolve(read_names(args.names), args.output)
+    print(json.dumps(resolver.counters))
+    if failed:
+        print("Failed: " + ", ".join(failed), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
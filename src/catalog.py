@@ -0,0 +1,289 @@
+import base64
+import hashlib
+import os
+import random
+import sys
+import threading
+from pathlib import Path
+
+import dotenv
+
+#PATH SETUP
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from artist_index import _to_record, load_seed
+from database.database import Database
+from normalize import normalize_query
+
+CATALOG_KEY = "catalog"
+CATALOG_VERSION_KEY = "catalog:version"
+DEFAULT_RELOAD_INTERVAL = 30
+
+# Entries without an explicit tier get one from their Spotify popularity
+TIER_THRESHOLDS = (("easy", 75), ("medium", 50), ("hard", 0))
+
+# Seed fields that make an entry a complete answer profile (no lookup needed)
+PROFILE_FIELDS = ("gender", "area", "tag", "popularity")
+
+# Resamples before giving up on avoiding a recently played answer
+MAX_PICK_ATTEMPTS = 8
+
+
+class AliasTable:
+    """
+    Walker/Vose alias method: O(n) to build, O(1) per weighted sample
+    (one uniform index plus one biased coin flip).
+    """
+
+    def __init__(self, weights):
+        count = len(weights)
+        if count == 0:
+            raise ValueError("AliasTable needs at least one weight")
+        total = float(sum(weights))
+        scaled = [weight * count / total for weight in weights]
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Leftovers are 1.0 up to rounding error
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def __len__(self):
+        return len(self.probability)
+
+    def sample(self, rng=random):
+        i = rng.randrange(len(self.probability))
+        return i if rng.random() < self.probability[i] else self.alias[i]
+
+
+class RecentAnswers:
+    """
+    Bloom filter of the answers a session has recently been given, small
+    enough to live in the session cookie. False positives only mean an
+    answer is skipped once more than needed. After `capacity` answers the
+    filter starts over, which keeps the false positive rate bounded.
+    """
+
+    def __init__(self, bits=2048, hashes=3, capacity=200, data=None, count=0):
+        self.bits = bits
+        self.hashes = hashes
+        self.capacity = capacity
+        self.data = bytearray(data) if data is not None else bytearray(bits // 8)
+        self.count = count
+
+    def _positions(self, name):
+        digest = hashlib.blake2b(normalize_query(name).encode("utf-8"), digest_size=8).digest()
+        h1 = int.from_bytes(digest[:4], "little")
+        h2 = int.from_bytes(digest[4:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, name):
+        return all(self.data[p // 8] & (1 << (p % 8)) for p in self._positions(name))
+
+    def add(self, name):
+        if self.count >= self.capacity:
+            self.data = bytearray(self.bits // 8)
+            self.count = 0
+        for p in self._positions(name):
+            self.data[p // 8] |= 1 << (p % 8)
+        self.count += 1
+
+    def token(self):
+        """Serialize to a short string for the session."""
+        return f"{self.count}:" + base64.b64encode(bytes(self.data)).decode("ascii")
+
+    @classmethod
+    def from_token(cls, token, **kwargs):
+        if not token:
+            return cls(**kwargs)
+        try:
+            count, data = token.split(":", 1)
+            recent = cls(data=base64.b64decode(data), count=int(count), **kwargs)
+        except ValueError:
+            return cls(**kwargs)
+        if len(recent.data) * 8 != recent.bits:
+            return cls(**kwargs)
+        return recent
+
+
+def _tier_for(entry):
+    if entry.get("tier"):
+        return entry["tier"]
+    popularity = entry.get("popularity") or 0
+    for tier, threshold in TIER_THRESHOLDS:
+        if popularity >= threshold:
+            return tier
+    return TIER_THRESHOLDS[-1][0]
+
+
+def _weight_for(entry):
+    if entry.get("weight") is not None:
+        return float(entry["weight"])
+    # More popular artists come up more often, but everyone has a chance
+    return float(max(entry.get("popularity") or 0, 1))
+
+
+class Catalog:
+    """
+    An immutable set of possible answers with difficulty tiers and weights.
+
+    Each entry is a seed line (see artist_index.load_seed) that may also
+    carry "tier", "weight" and "exclude". Entries with the full profile
+    fields are answered without any lookup. One alias table is built per
+    tier plus one over everything, so a pick is O(1) whatever the size.
+    """
+
+    def __init__(self, entries, excluded=()):
+        excluded = {normalize_query(name) for name in excluded}
+        self.entries = []
+        seen = set()
+        for entry in entries:
+            key = normalize_query(entry["name"])
+            if entry.get("exclude") or key in excluded or key in seen:
+                continue
+            seen.add(key)
+            self.entries.append({
+                "name": entry["name"],
+                "tier": _tier_for(entry),
+                "weight": _weight_for(entry),
+                "profile": (
+                    _to_record(entry)["profile"]
+                    if all(field in entry for field in PROFILE_FIELDS)
+                    else None
+                ),
+            })
+        if not self.entries:
+            raise ValueError("Catalog has no answers")
+
+        self._tables = {None: (AliasTable([e["weight"] for e in self.entries]), self.entries)}
+        for tier in {e["tier"] for e in self.entries}:
+            members = [e for e in self.entries if e["tier"] == tier]
+            self._tables[tier] = (AliasTable([e["weight"] for e in members]), members)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def tiers(self):
+        return sorted(tier for tier in self._tables if tier is not None)
+
+    def names(self):
+        return [entry["name"] for entry in self.entries]
+
+    def pick(self, tier=None, recent=None, rng=random):
+        """
+        Weighted random entry, optionally from one tier, avoiding names in
+        recent when possible. Raises KeyError for an unknown tier.
+        """
+        table, members = self._tables[tier]
+        entry = members[table.sample(rng)]
+        for _ in range(MAX_PICK_ATTEMPTS - 1):
+            if recent is None or entry["name"] not in recent:
+                break
+            entry = members[table.sample(rng)]
+        return entry
+
+
+class FileCatalogSource:
+    """Catalog entries from a JSON lines file; its mtime is the version."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def version(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        return list(load_seed(self.path))
+
+
+class DatabaseCatalogSource:
+    """Catalog entries published to the shared database with publish_catalog()."""
+
+    def __init__(self, database):
+        self.database = database
+
+    def version(self):
+        return self.database.get_value(CATALOG_VERSION_KEY)
+
+    def load(self):
+        return self.database.get_value(CATALOG_KEY) or []
+
+
+def publish_catalog(database, entries):
+    """Store entries for every worker; running workers pick them up on their next check."""
+    version = (database.get_value(CATALOG_VERSION_KEY) or 0) + 1
+    database.set_value(CATALOG_KEY, list(entries))
+    database.set_value(CATALOG_VERSION_KEY, version)
+    return version
+
+
+class CatalogManager:
+    """
+    Holds the current Catalog and swaps in a new one when its source
+    changes, so workers pick up a new catalog without a restart. A bad
+    new catalog is reported and the old one stays in place.
+    """
+
+    def __init__(self, source, reload_interval=DEFAULT_RELOAD_INTERVAL):
+        self.source = source
+        self.reload_interval = reload_interval
+        self._version = self.source.version()
+        self.catalog = Catalog(self.source.load())
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Reload if the source changed. Returns True if a new catalog was installed."""
+        try:
+            version = self.source.version()
+            if version == self._version:
+                return False
+            catalog = Catalog(self.source.load())
+        except Exception as e:
+            print(f"Error reloading catalog: {e}", file=sys.stderr)
+            return False
+        # Readers hold on to whichever Catalog they already fetched
+        self.catalog = catalog
+        self._version = version
+        return True
+
+    def pick(self, tier=None, recent=None):
+        return self.catalog.pick(tier, recent)
+
+    def _run(self):
+        while not self._stop.wait(self.reload_interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="catalog-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python src/catalog.py <catalog.jsonl>", file=sys.stderr)
+        sys.exit(1)
+
+    dotenv.load_dotenv(dotenv_path=project_root / ".env")
+    entries = list(load_seed(sys.argv[1]))
+    catalog = Catalog(entries)
+    version = publish_catalog(Database(os.getenv("REDIS_HOST"), int(os.getenv("REDIS_PORT"))), entries)
+    print(f"Published {len(catalog)} answers ({', '.join(catalog.tiers())}) as version {version}")
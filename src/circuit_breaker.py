@@ -0,0 +1,101 @@
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+
+    After failure_threshold consecutive failures the breaker opens and
+    calls fail fast with CircuitOpenError instead of waiting out another
+    timeout. After reset_timeout seconds one trial call is let through:
+    success closes the breaker, failure opens it again. A call that
+    succeeds but takes longer than slow_call_threshold counts as a failure,
+    so an upstream that is slow rather than down still trips it.
+    Exceptions listed in `ignored` (e.g. "no such artist") mean the
+    upstream answered, so they count as successes and are re-raised.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, slow_call_threshold=None,
+                 ignored=(), clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self.ignored = tuple(ignored)
+        self.clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _before_call(self):
+        with self._lock:
+            if self._state == OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                    self.counters["rejected"] += 1
+                    raise CircuitOpenError(f"{self.name} circuit is open")
+                # Cool-down is over: this caller is the half-open trial
+                self._trial_in_flight = True
+            self.counters["calls"] += 1
+
+    def _on_success(self):
+        with self._lock:
+            if self._state == OPEN and not self._trial_in_flight:
+                # A call that started before the breaker opened proves nothing
+                return
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def _on_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.counters["failures"] += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._state != OPEN or self._trial_in_flight:
+                    self.counters["opened"] += 1
+                self._state = OPEN
+                self._opened_at = self.clock()
+            self._trial_in_flight = False
+
+    def call(self, function, *args, **kwargs):
+        """Run function through the breaker. Raises CircuitOpenError while it is open."""
+        self._before_call()
+        start = self.clock()
+        try:
+            result = function(*args, **kwargs)
+        except self.ignored:
+            self._on_success()
+            raise
+        except Exception:
+            self._on_failure()
+            raise
+
+        if self.slow_call_threshold is not None and self.clock() - start > self.slow_call_threshold:
+            self._on_failure()
+        else:
+            self._on_success()
+        return result
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["state"] = self.state
+        return stats
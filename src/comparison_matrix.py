@@ -0,0 +1,199 @@
+import itertools
+import math
+import mmap
+import struct
+import sys
+from collections import Counter
+
+from artist_index import _to_record, load_seed
+from catalog import PROFILE_FIELDS
+from games import COMPARED_FIELDS, artist_key, compare_keys
+
+# File layout (little endian):
+#   header:  magic, version, artist count n
+#   matrix:  n * n cells, row = answer id, column = guess id
+#   keys:    per artist id (sorted by name), the first KEY_FIELDS entries
+#            of its artist_key() as u16 length + utf-8 (0xFFFF = None)
+MAGIC = b"CMTX"
+VERSION = 2
+HEADER = struct.Struct("<4sHI")
+LENGTH = struct.Struct("<H")
+NONE_LENGTH = 0xFFFF
+# name, gender, tag and area: everything in artist_key() but the popularity,
+# which changes after the build and is always compared live
+KEY_FIELDS = 4
+
+# Each cell is one byte, two bits per COMPARED_FIELDS entry (first field in
+# the low bits); a field's code is its position in these tuples
+EXACT_OUTCOMES = ("unknown", "match", "no_match")
+NUMERIC_OUTCOMES = ("unknown", "match", "higher", "lower")
+FIELD_OUTCOMES = (EXACT_OUTCOMES, EXACT_OUTCOMES, EXACT_OUTCOMES, NUMERIC_OUTCOMES)
+BITS_PER_FIELD = 2
+
+
+def encode_fields(fields):
+    cell = 0
+    for position, (field, outcomes) in enumerate(zip(COMPARED_FIELDS, FIELD_OUTCOMES)):
+        cell |= outcomes.index(fields[field]) << (position * BITS_PER_FIELD)
+    return cell
+
+
+# Every valid cell decoded once, so a lookup is one byte read plus a copy
+_DECODED = {
+    encode_fields(fields): fields
+    for fields in (
+        dict(zip(COMPARED_FIELDS, outcomes)) for outcomes in itertools.product(*FIELD_OUTCOMES)
+    )
+}
+
+
+def _pack_string(value):
+    if value is None:
+        return LENGTH.pack(NONE_LENGTH)
+    encoded = value.encode("utf-8")
+    return LENGTH.pack(len(encoded)) + encoded
+
+
+def build_matrix(artists, matrix_path):
+    """
+    Write the comparison matrix for every non-excluded artist with a full
+    profile (the seed/catalog line format). The file holds n * n bytes, so
+    it is meant for the answer catalog, not the whole artist index.
+    Returns (artists written, lines skipped).
+    """
+    keys = {}
+    skipped = 0
+    for artist in artists:
+        if artist.get("exclude") or not all(field in artist for field in PROFILE_FIELDS):
+            skipped += 1
+            continue
+        key = artist_key(_to_record(artist)["profile"])
+        keys.setdefault(key[0], key)
+
+    ordered = [keys[name] for name in sorted(keys)]
+    with open(matrix_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(ordered)))
+        for answer_key in ordered:
+            f.write(bytes(encode_fields(compare_keys(answer_key, guess_key)) for guess_key in ordered))
+        for key in ordered:
+            f.write(b"".join(_pack_string(value) for value in key[:KEY_FIELDS]))
+    return len(ordered), skipped
+
+
+class ComparisonMatrix:
+    """
+    Read-only, memory-mapped table of precomputed guess comparisons between
+    catalog artists, built offline with build_matrix().
+
+    Each artist's comparison key is loaded at startup, so ids are resolved
+    with a dict lookup. A pair is only answered from the table when both
+    profiles still match what it was built from; the popularity outcome
+    in a cell is the one at build time and is meant for analytics only.
+    """
+
+    def __init__(self, matrix_path):
+        self._file = open(matrix_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{matrix_path} is not a version {VERSION} comparison matrix")
+        self._cells = HEADER.size
+        self._keys = self._read_keys(self._cells + self._count * self._count)
+        self._ids = {key[0]: artist_id for artist_id, key in enumerate(self._keys)}
+
+    def _read_keys(self, offset):
+        keys = []
+        for _ in range(self._count):
+            key = []
+            for _ in range(KEY_FIELDS):
+                (length,) = LENGTH.unpack_from(self._map, offset)
+                offset += LENGTH.size
+                if length == NONE_LENGTH:
+                    key.append(None)
+                else:
+                    key.append(self._map[offset:offset + length].decode("utf-8"))
+                    offset += length
+            keys.append(tuple(key))
+        return keys
+
+    def __len__(self):
+        return self._count
+
+    def _cell(self, answer_id, guess_id):
+        return self._map[self._cells + answer_id * self._count + guess_id]
+
+    def id_of(self, name):
+        """The artist id for a lowercased name (artist_key()[0]), or None."""
+        return self._ids.get(name)
+
+    def id_for_key(self, key):
+        """The artist id for an artist_key(), or None unless the table was built from the same profile."""
+        artist_id = self._ids.get(key[0])
+        if artist_id is None or self._keys[artist_id] != tuple(key[:KEY_FIELDS]):
+            return None
+        return artist_id
+
+    def lookup(self, answer_id, answer_key, guess_key):
+        """
+        The compare_keys() result for an answer stored with its id (see
+        games.project_answer) and a guess, or None if the pair is not in
+        the table. Its popularity outcome is the one at build time.
+        """
+        if answer_id is None or not 0 <= answer_id < self._count:
+            return None
+        # A rebuilt table may have given the id to another artist
+        if self._keys[answer_id] != tuple(answer_key[:KEY_FIELDS]):
+            return None
+        guess_id = self.id_for_key(guess_key)
+        if guess_id is None:
+            return None
+        return dict(_DECODED[self._cell(answer_id, guess_id)])
+
+    def names(self):
+        return [key[0] for key in self._keys]
+
+    def information(self, guess_id):
+        """
+        Expected information (bits) the feedback to this guess gives about
+        a uniformly random answer: the entropy of its column, with the
+        winning answer as its own outcome.
+        """
+        start = self._cells + guess_id
+        column = self._map[start:start + self._count * self._count:self._count]
+        outcomes = Counter(column)
+        # The correct answer is told apart from look-alikes by is_correct
+        outcomes[column[guess_id]] -= 1
+        outcomes["correct"] = 1
+        total = self._count
+        return -sum(n / total * math.log2(n / total) for n in outcomes.values() if n)
+
+    def most_informative(self, limit=10):
+        """The limit guesses with the highest information(), as (name, bits)."""
+        ranked = sorted(
+            ((self.information(guess_id), guess_id) for guess_id in range(self._count)),
+            reverse=True,
+        )
+        return [(self._keys[guess_id][0], bits) for bits, guess_id in ranked[:limit]]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "build":
+        count, skipped = build_matrix(load_seed(sys.argv[2]), sys.argv[3])
+        print(f"Wrote {count} x {count} comparisons to {sys.argv[3]} ({skipped} lines without a full profile skipped)")
+    elif len(sys.argv) == 3 and sys.argv[1] == "analyze":
+        matrix = ComparisonMatrix(sys.argv[2])
+        for name, bits in matrix.most_informative():
+            print(f"{bits:6.3f} bits  {name}")
+        matrix.close()
+    else:
+        print(
+            "Usage: python src/comparison_matrix.py build <catalog.jsonl> <output.cmx>\n"
+            "       python src/comparison_matrix.py analyze <matrix.cmx>",
+            file=sys.stderr,
+        )
+        sys.exit(1)
@@ -0,0 +1,121 @@
+import datetime
+import hashlib
+import sys
+import threading
+
+DAILY_KEY_PREFIX = "daily:"
+
+# Puzzle number 1 is this day
+EPOCH = datetime.date(2025, 1, 1)
+
+# Blobs outlive their day a little, for players who started before midnight
+DAILY_TTL = 3 * 24 * 60 * 60
+DEFAULT_PREPARE_INTERVAL = 60 * 60
+
+
+def utc_today():
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+def seconds_until_tomorrow(now=None):
+    """Seconds left in the current UTC day, used for cache lifetimes."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    tomorrow = datetime.datetime.combine(
+        now.date() + datetime.timedelta(days=1), datetime.time(), tzinfo=datetime.timezone.utc
+    )
+    return max(1, int((tomorrow - now).total_seconds()))
+
+
+class DailyPuzzle:
+    """
+    One shared answer per UTC day.
+
+    The day's artist is picked deterministically from the date (and a
+    secret salt, so it cannot be worked out from the source), resolved
+    ahead of time and stored as an immutable blob under daily:<date>.
+    The first worker to store it wins, so every worker serves the same
+    answer even if the name list changes during the day. Workers keep the
+    blobs in memory, so starting a daily game costs no lookup at all.
+    """
+
+    def __init__(self, database, resolve, names, salt="", prepare_interval=DEFAULT_PREPARE_INTERVAL, today=utc_today):
+        self.database = database
+        self.resolve = resolve
+        # A callable lets the names follow a hot-reloaded catalog
+        self.names = names if callable(names) else (lambda: list(names))
+        self.salt = salt
+        self.prepare_interval = prepare_interval
+        self.today = today
+        # Written by the daily-puzzle thread and by requests
+        self._blobs = {}
+        self._blobs_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def number(day):
+        return (day - EPOCH).days + 1
+
+    def choose(self, day):
+        """The artist name for a day; the same on every worker."""
+        names = sorted(self.names())
+        digest = hashlib.sha256(f"{self.salt}:{day.isoformat()}".encode("utf-8")).digest()
+        return names[int.from_bytes(digest[:8], "big") % len(names)]
+
+    def _key(self, day):
+        return DAILY_KEY_PREFIX + day.isoformat()
+
+    def prepare(self, day):
+        """Resolve and store the blob for a day unless it already exists. Returns the stored blob."""
+        key = self._key(day)
+        blob = self.database.get_value(key)
+        if blob is None:
+            blob = {
+                "date": day.isoformat(),
+                "number": self.number(day),
+                "answer": self.resolve(self.choose(day)),
+            }
+            # Another worker may have stored the day first; theirs wins
+            self.database.add_value(key, blob, ttl=DAILY_TTL)
+            blob = self.database.get_value(key) or blob
+        cutoff = self.today() - datetime.timedelta(days=1)
+        with self._blobs_lock:
+            self._blobs[day] = blob
+            # Only a few days are ever needed
+            for old in [d for d in self._blobs if d < cutoff]:
+                del self._blobs[old]
+        return blob
+
+    def get(self, day=None):
+        """The blob for a day (today by default), from memory when possible."""
+        day = day or self.today()
+        with self._blobs_lock:
+            blob = self._blobs.get(day)
+        if blob is None:
+            blob = self.prepare(day)
+        return blob
+
+    def refresh(self):
+        """Prepare today and tomorrow, so midnight never waits on a lookup."""
+        today = self.today()
+        for day in (today, today + datetime.timedelta(days=1)):
+            try:
+                self.prepare(day)
+            except Exception as e:
+                print(f"Error preparing daily puzzle for {day}: {e}", file=sys.stderr)
+
+    def _run(self):
+        self.refresh()
+        while not self._stop.wait(self.prepare_interval):
+            self.refresh()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="daily-puzzle", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
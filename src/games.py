@@ -1,5 +1,7 @@
 import random
 
+from metrics import timed
+
 MAX_GUESSES = 7
 
 POSSIBLE_ANSWERS = [
@@ -12,91 +14,147 @@ POSSIBLE_ANSWERS = [
     "Bad Bunny",
     "Post Malone",
     "Lana Del Rey",
-    "The Weekend",
+    "The Weeknd",
 ]
 
 
+# Response field names of the compared fields, in artist_key() order after the name
+COMPARED_FIELDS = ("gender", "genre", "area", "popularity")
+
+
+def _lower(value):
+    return None if value is None else str(value).lower()
+
+
+def _popularity(value):
+    try:
+        return None if value is None else int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def artist_key(artist_json):
+    """
+    Comparison-ready projection of an artist profile:
+    [name, gender, tag, area] lowercased, then popularity as an int
+    (None wherever the value is unknown).
+    """
+    return [
+        str(artist_json.get("name") or "").lower(),
+        _lower(artist_json.get("gender")),
+        _lower(artist_json.get("tag")),
+        _lower((artist_json.get("area") or {}).get("name")),
+        _popularity(artist_json.get("spotify popularity")),
+    ]
+
+
+def project_answer(answer_json, comparison_matrix=None):
+    """
+    The compact record stored for a game's answer: the snapshot shown to
+    the player, its artist_key() and its id in comparison_matrix (None if
+    it is not in it), all computed once at new_game.
+    """
+    key = artist_key(answer_json)
+    return {
+        "snapshot": {
+            "name": answer_json.get("name"),
+            "gender": answer_json.get("gender"),
+            "area": (answer_json.get("area") or {}).get("name"),
+            "genre": answer_json.get("tag"),
+            "popularity": answer_json.get("spotify popularity"),
+        },
+        "key": key,
+        "matrix_id": comparison_matrix.id_for_key(key) if comparison_matrix is not None else None,
+    }
+
+
+def _exact(answer_value, guess_value):
+    if answer_value is None or guess_value is None:
+        return "unknown"
+    return "match" if answer_value == guess_value else "no_match"
+
+
+def _numeric(answer_value, guess_value):
+    if answer_value is None or guess_value is None:
+        return "unknown"
+    if guess_value == answer_value:
+        return "match"
+    return "higher" if guess_value > answer_value else "lower"
+
+
+# One comparator per COMPARED_FIELDS entry, applied to artist_key() values
+_COMPARATORS = (_exact, _exact, _exact, _numeric)
+
+
+def compare_keys(answer_key, guess_key):
+    """Field-wise comparison of two artist_key() projections, by COMPARED_FIELDS name."""
+    return {
+        field: compare(answer_value, guess_value)
+        for field, compare, answer_value, guess_value in zip(
+            COMPARED_FIELDS, _COMPARATORS, answer_key[1:], guess_key[1:]
+        )
+    }
+
+
 class Games:
-    def __init__(self, database):
+    def __init__(self, database, comparison_matrix=None):
         self.database = database
+        # Optional ComparisonMatrix answering known (answer, guess) pairs
+        self.comparison_matrix = comparison_matrix
 
     def exists(self, game_id):
         return self.database.exists(game_id)
 
     def new_game(self, game_id, answer_json):
-        self.database.create_game(game_id, answer_json)
-
-    #COMPARISON HELPERS
-
-    def _compare_exact(self, answer_value, guess_value):
-        if answer_value is None or guess_value is None:
-            return "unknown"
-
-        return (
-            "match"
-            if str(answer_value).lower() == str(guess_value).lower()
-            else "no_match"
-        )
-
-    def _compare_numeric(self, answer_value, guess_value):
-        if answer_value is None or guess_value is None:
-            return "unknown"
-
-        try:
-            a = int(answer_value)
-            g = int(guess_value)
-        except (ValueError, TypeError):
-            return "unknown"
-
-        if g == a:
-            return "match"
-        return "higher" if g > a else "lower"
+        self.database.create_game(game_id, project_answer(answer_json, self.comparison_matrix))
 
     # ---------- MAIN GUESS LOGIC ----------
 
     def guess(self, game_id, guess_json):
-        answer_json = self.database.get_answer(game_id)
-        if answer_json is None:
-            return None
+        """
+        Record a guess and compare it with the answer.
+        The store appends the guess and returns the answer in one round trip,
+        then the comparison is built from it. Returns None if the game is gone.
+        """
+        return self.database.record_guess(
+            game_id,
+            guess_json,
+            lambda answer_json, guess_number: self.compare(
+                answer_json, guess_json, guess_number
+            ),
+        )
+
+    @timed("games_compare")
+    def compare(self, answer, guess_json, guess_number):
+        """
+        Compare a guess with a stored answer record (see project_answer).
+        Games stored before answers were projected hold the full profile,
+        which is projected here instead. Pairs in the comparison matrix
+        are read from it rather than compared, except for the popularity,
+        which changes after the matrix is built.
+        """
+        if "key" not in answer:
+            answer = project_answer(answer)
+        answer_key = answer["key"]
+        guess_key = artist_key(guess_json)
+
+        fields = None
+        if self.comparison_matrix is not None:
+            fields = self.comparison_matrix.lookup(answer.get("matrix_id"), answer_key, guess_key)
+        if fields is None:
+            fields = compare_keys(answer_key, guess_key)
+        else:
+            fields["popularity"] = _numeric(answer_key[4], guess_key[4])
 
         comparison = {
-            "is_correct": (
-                str(guess_json.get("name", "")).lower()
-                == str(answer_json.get("name", "")).lower()
-            ),
-            "fields": {
-                "gender": self._compare_exact(
-                    answer_json.get("gender"), guess_json.get("gender")
-                ),
-                "genre": self._compare_exact(
-                    answer_json.get("tag"), guess_json.get("tag")
-                ),
-                "area": self._compare_exact(
-                    (answer_json.get("area") or {}).get("name"),
-                    (guess_json.get("area") or {}).get("name"),
-                ),
-                "popularity": self._compare_numeric(
-                    answer_json.get("spotify popularity"),
-                    guess_json.get("spotify popularity"),
-                ),
-            },
-            "answer_snapshot": {
-                "name": answer_json.get("name"),
-                "gender": answer_json.get("gender"),
-                "area": (answer_json.get("area") or {}).get("name"),
-                "genre": answer_json.get("tag"),
-                "popularity": answer_json.get("spotify popularity"),
-            },
+            "is_correct": guess_key[0] == answer_key[0],
+            "fields": fields,
+            "answer_snapshot": answer["snapshot"],
             "guess_artist": guess_json,
+            # Attach guess_number for UI (1..7)
+            "guess_number": guess_number,
         }
 
-        # Save this guess
-        self.database.add_guess(game_id, comparison)
-
-        # Attach guess_number for UI (1..7)
-        guesses = self.database.get_guesses(game_id) or []
-        comparison["guess_number"] = len(guesses)
-
         return comparison
 
     def higher_lower(self, guess, target):
@@ -156,3 +214,22 @@ class Games:
             }
 
         return payload
+
+
+class AsyncGames(Games):
+    """Games over an AsyncBaseDatabase; the comparison logic is shared with Games."""
+
+    async def exists(self, game_id):
+        return await self.database.exists(game_id)
+
+    async def new_game(self, game_id, answer_json):
+        await self.database.create_game(game_id, project_answer(answer_json, self.comparison_matrix))
+
+    async def guess(self, game_id, guess_json):
+        return await self.database.record_guess(
+            game_id,
+            guess_json,
+            lambda answer_json, guess_number: self.compare(
+                answer_json, guess_json, guess_number
+            ),
+        )
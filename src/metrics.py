@@ -0,0 +1,210 @@
+import bisect
+import contextvars
+import functools
+import sys
+import threading
+import time
+
+# Upper bounds (seconds) of the histogram buckets, from a Redis call to a slow lookup
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_METRIC = "artist_guesser_stage_seconds"
+REQUEST_METRIC = "artist_guesser_request_seconds"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class _RequestTimings:
+    """Per-stage totals for the request being served, for Server-Timing."""
+
+    def __init__(self):
+        self.totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+
+
+# Set while a request is being served; lookup threads inherit it through
+# contextvars.copy_context() (see musicbrain._fetch_artist_data)
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+class _Stage:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Metrics:
+    """
+    Latency histograms per stage (musicbrainz_search, redis, ...) and per
+    endpoint, plus gauges read at scrape time, rendered in the Prometheus
+    text format.
+    Stages timed while a request is open are also summed per request so
+    the app can send them back as a Server-Timing header.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.stages = {}
+        self.requests = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def add_gauge(self, name, help_text, function, key=None):
+        """
+        Report function() (or function()[key]) as a gauge on every scrape.
+        Gauges sharing a function call it once per scrape. None, or an
+        exception from function, is reported as NaN.
+        """
+        with self._lock:
+            self.gauges[name] = (help_text, function, key)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add(stage, seconds)
+
+    def begin_request(self):
+        """Start collecting stage totals for the current request; returns a reset token."""
+        return _request_timings.set(_RequestTimings()), time.perf_counter()
+
+    def end_request(self, handle, endpoint):
+        """
+        Record the request duration under `endpoint` and return the
+        Server-Timing header value for the stages it went through.
+        """
+        token, start = handle
+        elapsed = time.perf_counter() - start
+        timings = _request_timings.get()
+        _request_timings.reset(token)
+
+        with self._lock:
+            histogram = self.requests.get(endpoint)
+            if histogram is None:
+                histogram = self.requests[endpoint] = Histogram(self.buckets)
+            histogram.observe(elapsed)
+
+        entries = [
+            f"{stage};dur={seconds * 1000:.2f}"
+            for stage, seconds in sorted(timings.totals.items())
+        ]
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        return ", ".join(entries)
+
+    def render(self):
+        """Prometheus text exposition of every histogram and gauge."""
+        lines = [
+            f"# HELP {STAGE_METRIC} Time spent in each stage of request handling.",
+            f"# TYPE {STAGE_METRIC} histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.stages.items()):
+                lines.extend(histogram.render(STAGE_METRIC, f'stage="{stage}"'))
+            lines.append(f"# HELP {REQUEST_METRIC} Time spent serving each endpoint.")
+            lines.append(f"# TYPE {REQUEST_METRIC} histogram")
+            for endpoint, histogram in sorted(self.requests.items()):
+                lines.extend(histogram.render(REQUEST_METRIC, f'endpoint="{endpoint}"'))
+            gauges = sorted(self.gauges.items())
+        results = {}
+        for name, (help_text, function, key) in gauges:
+            if function not in results:
+                try:
+                    results[function] = function()
+                except Exception as e:
+                    print(f"Error reading gauge {name}: {e}", file=sys.stderr)
+                    results[function] = None
+            value = results[function]
+            if key is not None and value is not None:
+                value = value.get(key)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {'NaN' if value is None else value}")
+        return "\n".join(lines) + "\n"
+
+
+# Installed by app.configure_services(); None keeps every hook a no-op
+_metrics = None
+
+
+def set_metrics(metrics):
+    """Install the Metrics collected by every stage (None disables collection)."""
+    global _metrics
+    _metrics = metrics
+
+
+def get_metrics():
+    return _metrics
+
+
+def stage(name):
+    """Context manager timing one stage; a shared no-op when metrics are disabled."""
+    if _metrics is None:
+        return _NULL_STAGE
+    return _metrics.stage(name)
+
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _metrics is None:
+                return function(*args, **kwargs)
+            with _metrics.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
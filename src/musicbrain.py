@@ -1,6 +1,140 @@
+import contextvars
 import musicbrainzngs
 import os
+import sys
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from circuit_breaker import CircuitOpenError
+from metrics import stage
+from negative_cache import ArtistNotFoundError
+from normalize import normalize_query
+from single_flight import SingleFlight
+from spotify import get_artist as get_spotify_artist
 from spotify import get_artist_popularity
+from spotify import search_artist as search_spotify_artist
+
+POPULARITY_FIELD = "spotify popularity"
+
+# Shared deadline (seconds) for the MusicBrainz and Spotify halves of one lookup
+LOOKUP_TIMEOUT = float(os.getenv("ARTIST_LOOKUP_TIMEOUT", "15"))
+
+_lookup_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ARTIST_LOOKUP_WORKERS", "16")),
+    thread_name_prefix="artist-lookup",
+)
+
+# Optional ArtistCache shared by every lookup, installed by app.launch()
+_artist_cache = None
+
+# Optional local ArtistIndex consulted before any network call
+_artist_index = None
+
+# Optional RateLimiter every musicbrainzngs call goes through
+_musicbrainz_limiter = None
+
+# Optional CircuitBreakers that fail fast while an upstream is down
+_musicbrainz_breaker = None
+_spotify_breaker = None
+
+# Optional ArtistAliases mapping query variants to one canonical artist
+_artist_aliases = None
+
+# Optional NegativeCache of queries that matched no artist
+_negative_cache = None
+
+# Coalesces concurrent lookups of the same artist (in-process until launch()
+# installs one backed by the shared database)
+_single_flight = SingleFlight()
+
+
+def set_artist_cache(cache):
+    """Install the ArtistCache used by get_artist_data_for_game (None disables caching)."""
+    global _artist_cache
+    _artist_cache = cache
+
+
+def set_artist_index(index):
+    """Install the local ArtistIndex used to resolve queries offline (None disables it)."""
+    global _artist_index
+    _artist_index = index
+
+
+def set_artist_aliases(aliases):
+    """Install the ArtistAliases used to canonicalize queries (None disables it)."""
+    global _artist_aliases
+    _artist_aliases = aliases
+
+
+def set_negative_cache(cache):
+    """Install the NegativeCache that short-circuits unknown artists (None disables it)."""
+    global _negative_cache
+    _negative_cache = cache
+
+
+def get_artist_index():
+    return _artist_index
+
+
+def set_musicbrainz_limiter(limiter):
+    """
+    Install the RateLimiter shared by all MusicBrainz calls (None disables it).
+    musicbrainzngs' own per-process limit is turned off while one is installed,
+    since the shared limiter already paces calls across every worker.
+    """
+    global _musicbrainz_limiter
+    _musicbrainz_limiter = limiter
+    musicbrainzngs.set_rate_limit(limiter is None)
+
+
+def set_circuit_breakers(musicbrainz=None, spotify=None):
+    """Install the CircuitBreakers guarding each upstream (None disables one)."""
+    global _musicbrainz_breaker, _spotify_breaker
+    _musicbrainz_breaker = musicbrainz
+    _spotify_breaker = spotify
+
+
+def _guarded(breaker, function, *args, **kwargs):
+    if breaker is None:
+        return function(*args, **kwargs)
+    return breaker.call(function, *args, **kwargs)
+
+
+def _get_popularity(query):
+    """
+    Spotify popularity, fetched by artist id when the alias table knows it
+    (one GET instead of a search); otherwise searched, learning the id.
+    """
+    if _artist_aliases is None:
+        return get_artist_popularity(query)
+    entry = _artist_aliases.resolve(query)
+    if entry is not None and entry.get("spotify_id"):
+        return get_spotify_artist(entry["spotify_id"])["popularity"]
+    artist = search_spotify_artist(query)
+    _artist_aliases.learn_spotify_id(query, artist["id"])
+    return artist["popularity"]
+
+
+def _popularity_or_unknown(query):
+    """Spotify popularity, or None (unknown) while the Spotify breaker is open."""
+    try:
+        return _guarded(_spotify_breaker, _get_popularity, query)
+    except CircuitOpenError:
+        return None
+
+
+def set_single_flight(single_flight):
+    """Install the SingleFlight used to deduplicate concurrent lookups."""
+    global _single_flight
+    _single_flight = single_flight
+
+
+def _musicbrainz_call(stage_name, function, *args, **kwargs):
+    # Only the HTTP call goes through the breaker: time queued in our own
+    # limiter must not count as a slow or failed MusicBrainz call
+    if _musicbrainz_limiter is not None:
+        with stage("musicbrainz_rate_limit"):
+            _musicbrainz_limiter.acquire()
+    with stage(stage_name):
+        return _guarded(_musicbrainz_breaker, function, *args, **kwargs)
 
 
 def _initialize_musicbrainz():
@@ -19,13 +153,133 @@ def get_artist_data_for_game(query):
     - area
     - tag (genre)
     - spotify popularity
+
+    Queries found in the local artist index are answered without network I/O.
+    When an artist cache is installed, fresh profiles are served from it and
+    a profile whose only stale field is popularity just re-asks Spotify.
+    Concurrent misses for the same artist share a single upstream fetch.
+
+    During an upstream outage a stale cached profile is served as is.
+    Without one, an open Spotify breaker yields a degraded profile whose
+    popularity is None, which the game compares as "unknown".
+
+    Queries are keyed by normalize_query(), and a variant the alias table
+    knows is looked up, cached and searched under its canonical name.
+
+    Raises ArtistNotFoundError when no artist matches. With a negative
+    cache installed, the miss is remembered and repeats of the query are
+    rejected without any upstream call.
     """
-    full_artist = _get_full_artist_by_query(query)
+    if _artist_index is not None:
+        indexed = _artist_index.lookup(query)
+        if indexed is not None:
+            return indexed
+
+    if _artist_aliases is not None:
+        query = _artist_aliases.canonical_name(query)
+
+    return _lookup_artist_data(query)
+
+
+def _lookup_artist_data(query):
+    key = normalize_query(query)
+    cached, stale_fields = None, set()
+    if _artist_cache is not None:
+        cached, stale_fields = _artist_cache.get(query)
+        if cached is not None and not stale_fields:
+            return cached
+
+    # Only consulted on a cache miss, so cached guesses cost no extra round trip
+    if cached is None and _negative_cache is not None and _negative_cache.contains(query):
+        raise ArtistNotFoundError(f"No artist matches '{query}' (cached)")
+
+    try:
+        if _artist_cache is None:
+            return _single_flight.do(key, lambda: _fetch_artist_data(query))
+        return _single_flight.do(
+            key,
+            lambda: _refresh_artist_data(query, cached, stale_fields),
+            recheck=lambda: _get_fresh_cached(query),
+        )
+    except ArtistNotFoundError:
+        if _negative_cache is not None:
+            _negative_cache.remember(query)
+        raise
+
+
+def _get_fresh_cached(query):
+    cached, stale_fields = _artist_cache.get(query)
+    return cached if cached is not None and not stale_fields else None
+
+
+def _refresh_artist_data(query, cached, stale_fields):
+    try:
+        if cached is not None and stale_fields == {POPULARITY_FIELD}:
+            cached[POPULARITY_FIELD] = _guarded(_spotify_breaker, _get_popularity, query)
+            _artist_cache.put(query, cached, fields=stale_fields)
+            return cached
+
+        result = _fetch_artist_data(query)
+    except Exception as e:
+        if cached is None:
+            raise
+        print(f"Serving stale profile for '{query}': {e}", file=sys.stderr)
+        return cached
+
+    # A degraded profile keeps any popularity we already had and is cached
+    # with popularity already stale, so the next lookup only re-asks Spotify
+    unknown = None
+    if result[POPULARITY_FIELD] is None:
+        unknown = {POPULARITY_FIELD}
+        if cached is not None:
+            result[POPULARITY_FIELD] = cached.get(POPULARITY_FIELD)
+    _artist_cache.put(query, result, stale=unknown)
+    # Also cache it under the canonical name the next variant will map to
+    name = result.get("name")
+    if name and normalize_query(name) != normalize_query(query):
+        _artist_cache.put(name, result, stale=unknown)
+    return result
+
+
+def _fetch_artist_data(query, timeout=None):
+    """
+    Fetch MusicBrainz data and Spotify popularity concurrently.
+    Spotify is searched with the raw query, so it does not have to wait
+    for the MusicBrainz search + get-by-id chain.
+    """
+    timeout = LOOKUP_TIMEOUT if timeout is None else timeout
+    # Each half runs in a copy of this context so its stage timings are
+    # still added to the current request's Server-Timing header
+    musicbrainz_future = _lookup_executor.submit(
+        contextvars.copy_context().run, _get_full_artist_by_query, query
+    )
+    popularity_future = _lookup_executor.submit(
+        contextvars.copy_context().run, _popularity_or_unknown, query
+    )
+
+    done, pending = wait(
+        [musicbrainz_future, popularity_future],
+        timeout=timeout,
+        return_when=FIRST_EXCEPTION,
+    )
+    if pending:
+        # Drops work that has not started yet; a call already in flight
+        # finishes in the background and its result is discarded
+        for future in pending:
+            future.cancel()
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        raise TimeoutError(f"Artist lookup for '{query}' timed out after {timeout}s")
+
+    return build_artist_profile(musicbrainz_future.result(), popularity_future.result())
+
+
+def build_artist_profile(full_artist, popularity):
+    """Combine a MusicBrainz artist (musicbrainzngs shape) and a Spotify popularity."""
     full_artist = _filter_to_highest_tag(full_artist)
     artist = full_artist["artist"]
 
-    popularity = get_artist_popularity(query)
-
     filtered_result = {
         "name": artist.get("name"),
         "type": artist.get("type"),
@@ -36,7 +290,7 @@ def get_artist_data_for_game(query):
             if artist.get("area")
             else None
         ),
-        "spotify popularity": popularity,
+        POPULARITY_FIELD: popularity,
         "tag": artist["tag-list"][0]["name"]
         if artist.get("tag-list")
         else None,
@@ -46,10 +300,32 @@ def get_artist_data_for_game(query):
 
 
 def _get_full_artist_by_query(query):
+    return get_full_artist(query)
+
+
+def get_full_artist(query, includes=("tags",)):
+    """
+    The MusicBrainz artist for query, with the given get_artist_by_id
+    includes. When the alias table already knows its MBID the search is
+    skipped and the artist is fetched by id. Raises ArtistNotFoundError
+    if no artist matches.
+    """
     _initialize_musicbrainz()
-    result = musicbrainzngs.search_artists(query=query, limit=1)
-    artist = result["artist-list"][0]
-    full_artist = musicbrainzngs.get_artist_by_id(artist["id"], includes=["tags"])
+    entry = _artist_aliases.resolve(query) if _artist_aliases is not None else None
+    mbid = entry.get("mbid") if entry is not None else None
+    if mbid is None:
+        result = _musicbrainz_call(
+            "musicbrainz_search", musicbrainzngs.search_artists, query=query, limit=1
+        )
+        if not result["artist-list"]:
+            raise ArtistNotFoundError(f"No MusicBrainz artist matches '{query}'")
+        artist = result["artist-list"][0]
+        mbid = artist["id"]
+        if _artist_aliases is not None:
+            _artist_aliases.learn(query, artist.get("name") or query, mbid)
+    full_artist = _musicbrainz_call(
+        "musicbrainz_get_by_id", musicbrainzngs.get_artist_by_id, mbid, includes=list(includes)
+    )
     return full_artist
 
 
@@ -0,0 +1,69 @@
+import threading
+
+from normalize import normalize_query
+
+KEY_PREFIX = "miss:"
+DEFAULT_TTL = 10 * 60
+
+# A lookup that ends in "not found" costs a MusicBrainz search and a
+# Spotify search (the get-by-id is never reached)
+UPSTREAM_CALLS_PER_MISS = 2
+
+
+class ArtistNotFoundError(IndexError):
+    """
+    The upstream APIs answered, but no artist matches the query.
+    Subclasses IndexError, which is what the lookups used to raise.
+    """
+
+
+class NegativeCache:
+    """
+    Remembers queries that resolved to no artist, keyed by normalized
+    query in the shared database with a short TTL, so repeated typos are
+    answered without any upstream call. The TTL is short because a new
+    artist can appear on MusicBrainz or Spotify at any time.
+    """
+
+    def __init__(self, database, ttl=DEFAULT_TTL):
+        self.database = database
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "stores": 0}
+
+    def _key(self, query):
+        return KEY_PREFIX + normalize_query(query)
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def contains(self, query):
+        if self.database.get_value(self._key(query)) is None:
+            return False
+        self._count("hits")
+        return True
+
+    def remember(self, query):
+        self.database.set_value(self._key(query), True, ttl=self.ttl)
+        self._count("stores")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["avoided_upstream_calls"] = stats["hits"] * UPSTREAM_CALLS_PER_MISS
+        return stats
+
+
+class AsyncNegativeCache(NegativeCache):
+    """NegativeCache over an AsyncBaseDatabase, for the asyncio serving mode."""
+
+    async def contains(self, query):
+        if await self.database.get_value(self._key(query)) is None:
+            return False
+        self._count("hits")
+        return True
+
+    async def remember(self, query):
+        await self.database.set_value(self._key(query), True, ttl=self.ttl)
+        self._count("stores")
@@ -0,0 +1,41 @@
+import re
+import unicodedata
+
+# Leading words dropped from lookup keys, so "The Weeknd" and "Weeknd" match.
+# Only "the": "a"/"an" would merge names like "a-ha" into "ha"
+ARTICLES = ("the",)
+
+# Dropped outright, so "Guns N' Roses" and "B.o.B" keep their words together
+_JOINING_PUNCTUATION = re.compile(r"['’.]")
+# Any other run of non-word characters separates words
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def fold_text(text):
+    """
+    Fold text for matching: accents are removed, case is folded, "&" reads
+    as "and" and punctuation and repeated whitespace collapse to one space,
+    so "Beyoncé", "BEYONCE" and " beyonce!" fold alike.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    folded = stripped.casefold().replace("&", " and ")
+    folded = _JOINING_PUNCTUATION.sub("", folded)
+    return " ".join(_SEPARATORS.sub(" ", folded).split())
+
+
+def normalize_query(query):
+    """
+    Normalize a free-text artist query into a lookup key.
+    On top of fold_text() a leading article is dropped, so "the weeknd",
+    "The Weeknd ", "THE WEEKND" and "Weeknd" share a key. Names made only
+    of symbols ("!!!", "+/-") fold to nothing, so they are keyed by their
+    casefolded text instead of all sharing the empty key.
+    """
+    key = fold_text(query)
+    if not key:
+        return " ".join(str(query).casefold().split())
+    first, _, rest = key.partition(" ")
+    if first in ARTICLES and rest:
+        return rest
+    return key
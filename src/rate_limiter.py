@@ -0,0 +1,166 @@
+import asyncio
+import sys
+import threading
+import time
+
+from redis.exceptions import RedisError
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would have to queue longer than the limiter allows."""
+
+
+class LocalTokenBucket:
+    """In-process token bucket, also used when Redis is unreachable."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait):
+        """
+        Reserve the next token. Returns how long the caller must wait before
+        using it, or None (reserving nothing) if that would exceed max_wait.
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            # Tokens may go negative: that debt is the queue of waiting callers
+            self.tokens -= 1
+            return wait
+
+
+# Same algorithm as LocalTokenBucket, run atomically inside Redis so every
+# gunicorn worker (and every host) draws from one bucket.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local wait = math.max(0, (1 - tokens) / rate)
+if wait > max_wait then
+    return '-1'
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity / rate + max_wait) * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """Token bucket shared across processes through a Lua script in Redis."""
+
+    def __init__(self, redis_client, key, rate, capacity):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def reserve(self, max_wait):
+        wait = float(self._script(keys=[self.key], args=[self.rate, self.capacity, max_wait]))
+        return None if wait < 0 else wait
+
+
+class RateLimiter:
+    """
+    Blocking rate limiter for an upstream API.
+
+    Callers queue until their token is due, for at most max_wait seconds,
+    so throughput degrades into latency instead of upstream errors. The
+    bucket lives in Redis when a client is given and falls back to a local
+    bucket if Redis fails.
+    """
+
+    def __init__(self, rate=1.0, capacity=1, max_wait=10.0, redis_client=None, key="ratelimit:musicbrainz"):
+        self.max_wait = max_wait
+        self.local = LocalTokenBucket(rate, capacity)
+        self.remote = RedisTokenBucket(redis_client, key, rate, capacity) if redis_client is not None else None
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.counters = {
+            "acquired": 0,
+            "rejected": 0,
+            "fallbacks": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _reserve(self):
+        if self.remote is not None:
+            try:
+                return self.remote.reserve(self.max_wait)
+            except RedisError as e:
+                print(f"Rate limiter falling back to local bucket: {e}", file=sys.stderr)
+                with self._lock:
+                    self.counters["fallbacks"] += 1
+        return self.local.reserve(self.max_wait)
+
+    def _check(self, wait):
+        if wait is None:
+            with self._lock:
+                self.counters["rejected"] += 1
+            raise RateLimitExceeded(f"Rate limit queue is longer than {self.max_wait}s")
+
+    def _enter_queue(self, wait):
+        if wait <= 0:
+            return
+        with self._lock:
+            self.queue_depth += 1
+            self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], self.queue_depth)
+
+    def _leave_queue(self, wait):
+        with self._lock:
+            if wait > 0:
+                self.queue_depth -= 1
+            self.counters["acquired"] += 1
+            self.counters["total_wait_seconds"] += wait
+            self.counters["max_wait_seconds"] = max(self.counters["max_wait_seconds"], wait)
+
+    def acquire(self):
+        """Block until a request may be sent. Raises RateLimitExceeded if the queue is too long."""
+        wait = self._reserve()
+        self._check(wait)
+        self._enter_queue(wait)
+        try:
+            time.sleep(wait)
+        finally:
+            self._leave_queue(wait)
+
+    async def acquire_async(self):
+        """Awaitable acquire() for the asyncio serving mode."""
+        if self.remote is not None:
+            wait = await asyncio.to_thread(self._reserve)
+        else:
+            wait = self._reserve()
+        self._check(wait)
+        self._enter_queue(wait)
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            self._leave_queue(wait)
+
+    def call(self, function, *args, **kwargs):
+        self.acquire()
+        return function(*args, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["queue_depth"] = self.queue_depth
+        acquired = stats["acquired"]
+        stats["mean_wait_seconds"] = stats["total_wait_seconds"] / acquired if acquired else 0.0
+        return stats
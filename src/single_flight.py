@@ -0,0 +1,100 @@
+import copy
+import secrets
+import threading
+import time
+
+LOCK_PREFIX = "lock:"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    Inside a process, callers that arrive while a call for their key is in
+    flight wait for it and share its result. When a database is given, a
+    short lock there extends this across processes: one worker runs the
+    call while the others poll recheck() (e.g. the artist cache) for the
+    result it stores, falling back to their own call if the lock expires.
+    """
+
+    def __init__(self, database=None, lock_ttl=5.0, poll_interval=0.05):
+        self.database = database
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "shared": 0, "remote_shared": 0}
+
+    def do(self, key, function, recheck=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.counters["calls"] += 1
+            else:
+                self.counters["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = self._run(key, function, recheck)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run(self, key, function, recheck):
+        if self.database is None or recheck is None:
+            return function()
+
+        lock_key = LOCK_PREFIX + key
+        token = secrets.token_hex(8)
+        deadline = time.monotonic() + self.lock_ttl
+        waited = False
+        while not self.database.add_value(lock_key, token, ttl=self.lock_ttl):
+            # Another process is fetching this key; wait for its result
+            waited = True
+            result = recheck()
+            if result is not None:
+                self.counters["remote_shared"] += 1
+                return result
+            if time.monotonic() >= deadline:
+                # The holder is stuck or gone, fetch it ourselves
+                return function()
+            time.sleep(self.poll_interval)
+
+        try:
+            if waited:
+                # The holder may have stored its result and released the
+                # lock between our last recheck and taking the lock
+                result = recheck()
+                if result is not None:
+                    self.counters["remote_shared"] += 1
+                    return result
+            return function()
+        finally:
+            if self.database.get_value(lock_key) == token:
+                self.database.delete_value(lock_key)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["in_flight"] = len(self._calls)
+        return stats
@@ -1,57 +1,215 @@
 import base64
 import os
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
 
-_cached_token = None
-_cached_token_expiry = 0
+from metrics import stage
+from negative_cache import ArtistNotFoundError
 
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+API_URL = "https://api.spotify.com/v1"
 
-def _request_access_token():
+# 429 honours the Retry-After header, 5xx back off exponentially
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_POOL_SIZE = 10
+# Longest Retry-After worth sleeping through. A longer one fails the call at
+# once: the lookup would time out anyway, and the sleeping thread would keep
+# a lookup pool slot for the whole wait
+MAX_RETRY_AFTER = 5
+
+# Most ids the "Get Several Artists" endpoint accepts per call
+MAX_ARTIST_IDS = 50
+
+# Used when a token response has no expires_in; tokens are renewed this
+# many seconds before they actually expire
+DEFAULT_TOKEN_LIFETIME = 3600
+TOKEN_EXPIRY_MARGIN = 100
+
+
+class _CappedRetry(Retry):
+    """Retry that gives up instead of honouring a Retry-After above MAX_RETRY_AFTER."""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None and self.respect_retry_after_header:
+            retry_after = self.get_retry_after(response)
+            if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                raise MaxRetryError(
+                    _pool, url, ResponseError(f"Retry-After of {retry_after:g}s is above {MAX_RETRY_AFTER}s")
+                )
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class SpotifyClient:
     """
-    Request a Spotify access token, with simple in-process caching
-    so we don't hit the token endpoint for every search.
+    Spotify Web API client that owns a pooled keep-alive requests.Session,
+    so searches reuse open TCP+TLS connections instead of handshaking with
+    api.spotify.com on every call. One instance is shared by all threads:
+    the connection pool is thread-safe and the token is guarded by a lock.
     """
-    global _cached_token, _cached_token_expiry
 
-    if _cached_token and time.time() < _cached_token_expiry:
-        return _cached_token
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_retries=3, backoff_factor=0.5, timeout=10,
+                 api_url=API_URL, token_url=TOKEN_URL):
+        self.timeout = timeout
+        self.api_url = api_url
+        self.token_url = token_url
+        self.session = requests.Session()
+        retry = _CappedRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # One pool per host (accounts + api), each holding up to pool_size connections
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        # Plain http is only used against local stub servers (see bench/)
+        self.session.mount("http://", adapter)
+
+        self._token = None
+        self._token_expiry = 0
+        self._token_lock = threading.Lock()
+        # Optional SpotifyTokenManager sharing the token across workers
+        self.token_manager = None
+
+    def fetch_token(self):
+        """
+        POST to the token endpoint (Client Credentials flow) and return the
+        token response: {"access_token", "token_type", "expires_in"}.
+        """
+        client_id = os.getenv("SPOTIFY_CLIENT_ID")
+        client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+        if not client_id or not client_secret:
+            raise RuntimeError("SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET must be set")
+
+        auth_header = base64.b64encode(
+            f"{client_id}:{client_secret}".encode("utf-8")
+        ).decode("utf-8")
+
+        with stage("spotify_token"):
+            response = self.session.post(
+                self.token_url,
+                headers={
+                    "Authorization": f"Basic {auth_header}",
+                    "Content-Type": "application/x-www-form-urlencoded",
+                },
+                data={"grant_type": "client_credentials"},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        return response.json()
+
+    def request_access_token(self):
+        """
+        Return a valid access token. With a token manager installed the
+        token is shared through Redis and refreshed in the background;
+        otherwise it is cached in-process until shortly before it expires.
+        """
+        if self.token_manager is not None:
+            return self.token_manager.get_token()
+
+        if self._token and time.time() < self._token_expiry:
+            return self._token
+
+        with self._token_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._token and time.time() < self._token_expiry:
+                return self._token
 
-    client_id = os.getenv("SPOTIFY_CLIENT_ID")
-    client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
+            token_data = self.fetch_token()
+            self._token = token_data["access_token"]
+            # Renew a little before Spotify's own expiry
+            expires_in = int(token_data.get("expires_in", DEFAULT_TOKEN_LIFETIME))
+            self._token_expiry = time.time() + expires_in - TOKEN_EXPIRY_MARGIN
 
-    auth_header = base64.b64encode(
-        f"{client_id}:{client_secret}".encode("utf-8")
-    ).decode("utf-8")
+            return self._token
 
-    response = requests.post(
-        "https://accounts.spotify.com/api/token",
-        headers={
-            "Authorization": f"Basic {auth_header}",
-            "Content-Type": "application/x-www-form-urlencoded",
-        },
-        data={"grant_type": "client_credentials"},
-        timeout=10,
-    )
-    response.raise_for_status()
-    token_data = response.json()
+    def get_artist_popularity(self, query):
+        return self.search_artist(query)["popularity"]
 
-    _cached_token = token_data["access_token"]
-    # Spotify tokens are usually ~3600 seconds; we renew a bit earlier
-    _cached_token_expiry = time.time() + 3500
+    def search_artist(self, query):
+        """The best matching artist object for query; raises ArtistNotFoundError if none."""
+        token = self.request_access_token()
 
-    return _cached_token
+        with stage("spotify_search"):
+            response = self.session.get(
+                f"{self.api_url}/search",
+                params={"q": query, "type": "artist", "limit": 1},
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        data = response.json()
+        items = data["artists"]["items"]
+        if not items:
+            raise ArtistNotFoundError(f"No Spotify artist matches '{query}'")
+        return items[0]
+
+    def get_artist(self, artist_id):
+        """One artist object by Spotify id, without a search."""
+        token = self.request_access_token()
+
+        with stage("spotify_artist"):
+            response = self.session.get(
+                f"{self.api_url}/artists/{artist_id}",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        return response.json()
+
+    def get_artists(self, artist_ids):
+        """
+        Fetch up to MAX_ARTIST_IDS artists in one call.
+        Returns the artist objects in the same order; unknown ids are None.
+        """
+        if len(artist_ids) > MAX_ARTIST_IDS:
+            raise ValueError(f"At most {MAX_ARTIST_IDS} artist ids per call")
+        token = self.request_access_token()
+
+        with stage("spotify_artists"):
+            response = self.session.get(
+                f"{self.api_url}/artists",
+                params={"ids": ",".join(artist_ids)},
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        return response.json()["artists"]
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide SpotifyClient, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = SpotifyClient(
+                    pool_size=int(os.getenv("SPOTIFY_POOL_SIZE", DEFAULT_POOL_SIZE))
+                )
+    return _default_client
+
+
+def _request_access_token():
+    return get_client().request_access_token()
 
 
 def get_artist_popularity(query):
-    token = _request_access_token()
-
-    response = requests.get(
-        f"https://api.spotify.com/v1/search?q={query}&type=artist&limit=1",
-        headers={"Authorization": f"Bearer {token}"},
-        timeout=10,
-    )
-    response.raise_for_status()
-    data = response.json()
-    artist = data["artists"]["items"][0]
-    return artist["popularity"]
+    return get_client().get_artist_popularity(query)
+
+
+def search_artist(query):
+    return get_client().search_artist(query)
+
+
+def get_artist(artist_id):
+    return get_client().get_artist(artist_id)
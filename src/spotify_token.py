@@ -0,0 +1,130 @@
+import sys
+import threading
+import time
+
+from single_flight import SingleFlight
+
+TOKEN_KEY = "spotify:token"
+
+# The background thread renews the token once less than this is left
+DEFAULT_REFRESH_MARGIN = 5 * 60
+DEFAULT_CHECK_INTERVAL = 30
+
+# A request never uses a token with less than this left
+MIN_REMAINING = 30
+
+
+class SpotifyTokenManager:
+    """
+    One Spotify access token shared by every worker through the database.
+
+    A background thread renews the token refresh_margin seconds before it
+    expires, using the real expires_in from Spotify. Renewals go through a
+    SingleFlight over the database, so only one thread in one worker calls
+    the token endpoint while the others pick its token up from Redis.
+    Requests only refresh inline if the background thread fell behind.
+    """
+
+    def __init__(self, fetch, database, refresh_margin=DEFAULT_REFRESH_MARGIN,
+                 check_interval=DEFAULT_CHECK_INTERVAL, clock=time.time):
+        self.fetch = fetch
+        self.database = database
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.clock = clock
+        self.single_flight = SingleFlight(database, lock_ttl=10.0)
+        self._token = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.counters = {"refreshes": 0, "inline_refreshes": 0, "shared_loads": 0, "errors": 0}
+
+    def _valid(self, token, margin):
+        return token is not None and token["expires_at"] - self.clock() > margin
+
+    def _load_shared(self, margin):
+        """The token in the database if it has more than margin seconds left, else None."""
+        token = self.database.get_value(TOKEN_KEY)
+        if not self._valid(token, margin):
+            return None
+        if self._token is None or token["access_token"] != self._token["access_token"]:
+            self.counters["shared_loads"] += 1
+        self._token = token
+        return token
+
+    def _fetch_and_store(self, margin):
+        # Another worker may have stored a new token since we last looked
+        token = self._load_shared(margin)
+        if token is not None:
+            return token
+
+        token_data = self.fetch()
+        now = self.clock()
+        expires_in = int(token_data.get("expires_in", 3600))
+        token = {
+            "access_token": token_data["access_token"],
+            "fetched_at": now,
+            "expires_at": now + expires_in,
+        }
+        self.database.set_value(TOKEN_KEY, token, ttl=expires_in)
+        self._token = token
+        self.counters["refreshes"] += 1
+        return token
+
+    def _refresh(self, margin):
+        token = self.single_flight.do(
+            TOKEN_KEY,
+            lambda: self._fetch_and_store(margin),
+            recheck=lambda: self._load_shared(margin),
+        )
+        self._token = token
+        return token
+
+    def get_token(self):
+        """A valid access token, almost always without any network call."""
+        token = self._token
+        if self._valid(token, MIN_REMAINING):
+            return token["access_token"]
+
+        token = self._load_shared(MIN_REMAINING)
+        if token is None:
+            self.counters["inline_refreshes"] += 1
+            token = self._refresh(MIN_REMAINING)
+        return token["access_token"]
+
+    def refresh_if_needed(self):
+        """Renew the token if it expires within refresh_margin. Returns True if it was renewed."""
+        if self._valid(self._token, self.refresh_margin):
+            return False
+        if self._load_shared(self.refresh_margin) is not None:
+            return False
+        try:
+            self._refresh(self.refresh_margin)
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Error refreshing Spotify token: {e}", file=sys.stderr)
+            return False
+        return True
+
+    def stats(self):
+        stats = dict(self.counters)
+        token = self._token
+        now = self.clock()
+        stats["age_seconds"] = now - token["fetched_at"] if token else None
+        stats["expires_in_seconds"] = token["expires_at"] - now if token else None
+        return stats
+
+    def _run(self):
+        self.refresh_if_needed()
+        while not self._stop.wait(self.check_interval):
+            self.refresh_if_needed()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="spotify-token", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,55 @@
+import bisect
+import threading
+
+from normalize import fold_text
+
+DEFAULT_LIMIT = 8
+
+
+class SuggestIndex:
+    """
+    Prefix index of known artist names for typeahead suggestions.
+    Names are kept as a sorted array of normalized keys, so a prefix query
+    is one binary search plus a short scan.
+    """
+
+    def __init__(self, names=()):
+        self._names = {}
+        for name in names:
+            key = fold_text(name)
+            if key:
+                self._names.setdefault(key, name)
+        self._keys = sorted(self._names)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, name):
+        """Add a name (e.g. a successfully resolved guess) to the index."""
+        key = fold_text(name or "")
+        if not key or key in self._names:
+            return
+        with self._lock:
+            if key in self._names:
+                return
+            # Copy-on-write so concurrent readers always see a sorted list
+            keys = list(self._keys)
+            bisect.insort(keys, key)
+            self._names[key] = name
+            self._keys = keys
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        """Return up to limit display names starting with prefix."""
+        key = fold_text(prefix or "")
+        if not key:
+            return []
+
+        keys = self._keys
+        start = bisect.bisect_left(keys, key)
+        suggestions = []
+        for candidate in keys[start:start + limit]:
+            if not candidate.startswith(key):
+                break
+            suggestions.append(self._names[candidate])
+        return suggestions
@@ -1,4 +1,7 @@
-let startButton, game, textbox;
+let startButton, dailyButton, game, textbox;
+
+const SUGGEST_DELAY_MS = 150;
+let suggestTimer, suggestController;
 
 //HELPERS FOR BUTTON LOADING
 function showLoading(button, text = "Loading...") {
@@ -19,6 +22,7 @@ window.onload = () => {
     console.log("Loaded page & connecting buttons...");
     connectStart();
     connectTextbox();
+    connectSuggestions();
     connectGuessButton();
 };
 
@@ -26,16 +30,29 @@ window.onload = () => {
 function connectStart() {
     game = document.getElementById("game");
     startButton = document.getElementById("start");
-    startButton.onclick = startGame;
+    startButton.onclick = () => startGame(startButton, "/new-game");
+    connectDaily();
+}
+
+// The daily button only shows up when the server has a daily puzzle
+async function connectDaily() {
+    dailyButton = document.getElementById("daily");
+    const response = await fetch("/daily");
+    if (!response.ok) return;
+
+    const puzzle = await response.json();
+    dailyButton.innerText = `Daily puzzle #${puzzle.number}`;
+    dailyButton.classList.remove("hidden");
+    dailyButton.onclick = () => startGame(dailyButton, "/new-game?mode=daily");
 }
 
-async function startGame() {
+async function startGame(button, url) {
     console.log("Starting new game...");
 
-    showLoading(startButton, "Loading...");
+    showLoading(button, "Loading...");
 
-    const response = await fetch("/new-game");
-    hideLoading(startButton);
+    const response = await fetch(url);
+    hideLoading(button);
 
     if (!response.ok) {
         alert("Error starting a new game.");
@@ -43,6 +60,7 @@ async function startGame() {
     }
 
     startButton.classList.add("hidden");
+    dailyButton.classList.add("hidden");
     const preGameMessage = document.getElementById("pre-game-message");
     if (preGameMessage) {
         preGameMessage.classList.add("hidden");
@@ -80,6 +98,46 @@ function connectTextbox() {
     });
 }
 
+// TYPEAHEAD SUGGESTIONS
+function connectSuggestions() {
+    textbox.addEventListener("input", () => {
+        // Debounce so we only ask once the user pauses typing
+        clearTimeout(suggestTimer);
+        suggestTimer = setTimeout(fetchSuggestions, SUGGEST_DELAY_MS);
+    });
+}
+
+async function fetchSuggestions() {
+    const query = textbox.value.trim();
+    const list = document.getElementById("suggestions");
+    if (!query) {
+        list.innerHTML = "";
+        return;
+    }
+
+    // Drop the previous request so late answers can't overwrite newer ones
+    if (suggestController) suggestController.abort();
+    suggestController = new AbortController();
+
+    let data;
+    try {
+        const response = await fetch(`/suggest?q=${encodeURIComponent(query)}`, {
+            signal: suggestController.signal,
+        });
+        if (!response.ok) return;
+        data = await response.json();
+    } catch (e) {
+        return;
+    }
+
+    list.innerHTML = "";
+    for (const name of data.suggestions) {
+        const option = document.createElement("option");
+        option.value = name;
+        list.appendChild(option);
+    }
+}
+
 async function textboxSubmit() {
     const submission = textbox.value.trim();
     if (!submission) return;
@@ -168,7 +226,7 @@ function renderGuessCard(comparison, guessNumber, maxGuesses) {
         <div class="guess-field-row">
             <span class="field-label">Popularity</span>
             <span class="field-badge ${fields.popularity}">
-                ${artist["spotify popularity"]}
+                ${artist["spotify popularity"] ?? "Unknown"}
             </span>
         </div>
     `;
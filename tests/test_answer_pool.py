@@ -0,0 +1,77 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from answer_pool import AnswerPool
+from app import create_app
+from database.in_memory_storage import InMemoryDatabase
+from games import Games
+
+
+def fake_profile(name):
+    return {
+        "name": name,
+        "gender": "male",
+        "area": {"name": "United States"},
+        "tag": "pop",
+        "spotify popularity": 80
+    }
+
+
+@pytest.fixture
+def in_memory_db():
+    """Provides an in-memory database for testing."""
+    return InMemoryDatabase()
+
+
+# test that refresh resolves and stores every curated name
+def test_refresh_stores_profiles(in_memory_db):
+    """Test that refresh resolves every name and pick returns one of them."""
+    resolve = MagicMock(side_effect=fake_profile)
+    pool = AnswerPool(in_memory_db, resolve, names=["Drake", "Adele"])
+
+    failed = pool.refresh()
+
+    assert failed == []
+    assert resolve.call_count == 2
+    assert pool.pick()["name"] in ("Drake", "Adele")
+
+
+# test that an empty pool picks nothing
+def test_pick_empty_pool(in_memory_db):
+    """Test that pick returns None before the pool has been warmed."""
+    pool = AnswerPool(in_memory_db, fake_profile, names=["Drake"])
+    assert pool.pick() is None
+
+
+# test that a failed refresh keeps the last known good profile
+def test_refresh_failure_keeps_last_good(in_memory_db):
+    """Test that a failing lookup does not remove the previously stored profile."""
+    pool = AnswerPool(in_memory_db, fake_profile, names=["Drake"])
+    pool.refresh()
+
+    pool.resolve = MagicMock(side_effect=Exception("API Error"))
+    failed = pool.refresh()
+
+    assert failed == ["Drake"]
+    assert pool.pick()["name"] == "Drake"
+
+
+# test that /new-game uses the pool instead of a live lookup
+@patch("app.get_artist_data_for_game")
+def test_new_game_uses_answer_pool(mock_get_artist_data, in_memory_db):
+    """Test that /new-game does not call upstream APIs when the pool is warm."""
+    pool = AnswerPool(in_memory_db, fake_profile, names=["Drake"])
+    pool.refresh()
+    games_service = Games(in_memory_db)
+    client = create_app("test_secret_key", games_service, pool).test_client()
+
+    response = client.get("/new-game")
+
+    assert response.status_code == 200
+    mock_get_artist_data.assert_not_called()
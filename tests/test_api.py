@@ -28,13 +28,12 @@ def test_request_access_token_no_credentials():
 
 # test a successful token request
 @patch.dict("os.environ", {"SPOTIFY_CLIENT_ID": "test_id", "SPOTIFY_CLIENT_SECRET": "test_secret"})
-@patch("spotify.requests.post")
+@patch("spotify.requests.Session.post")
 def test_request_access_token_success(mock_post):
     """Test that _request_access_token successfully gets a token."""
     # Reset cache before test
     import spotify
-    spotify._cached_token = None
-    spotify._cached_token_expiry = 0
+    spotify._default_client = None
     
     # Mock the token response
     mock_response = MagicMock()
@@ -50,13 +49,12 @@ def test_request_access_token_success(mock_post):
 
 # test that the token is cached and reused
 @patch.dict("os.environ", {"SPOTIFY_CLIENT_ID": "test_id", "SPOTIFY_CLIENT_SECRET": "test_secret"})
-@patch("spotify.requests.post")
+@patch("spotify.requests.Session.post")
 def test_request_access_token_caching(mock_post):
     """Test that _request_access_token caches tokens and reuses them."""
     # Reset cache before test
     import spotify
-    spotify._cached_token = None
-    spotify._cached_token_expiry = 0
+    spotify._default_client = None
     
     # Mock the token response
     mock_response = MagicMock()
@@ -76,13 +74,12 @@ def test_request_access_token_caching(mock_post):
 
 # test that a new token is requested when the cached one expires
 @patch.dict("os.environ", {"SPOTIFY_CLIENT_ID": "test_id", "SPOTIFY_CLIENT_SECRET": "test_secret"})
-@patch("spotify.requests.post")
+@patch("spotify.requests.Session.post")
 def test_request_access_token_expires(mock_post):
     """Test that _request_access_token requests new token when cached one expires."""
     # Reset cache before test
     import spotify
-    spotify._cached_token = None
-    spotify._cached_token_expiry = 0
+    spotify._default_client = None
     
     # Mock the token response
     mock_response = MagicMock()
@@ -95,7 +92,7 @@ def test_request_access_token_expires(mock_post):
     assert mock_post.call_count == 1
     
     # Simulate token expiry by manipulating the cache
-    spotify._cached_token_expiry = time.time() - 100  # Expired
+    spotify.get_client()._token_expiry = time.time() - 100  # Expired
     
     # Second call - should request new token
     token2 = _request_access_token()
@@ -103,8 +100,8 @@ def test_request_access_token_expires(mock_post):
     assert mock_post.call_count == 2
 
 # test that get_artist_popularity returns the popularity score
-@patch("spotify._request_access_token")
-@patch("spotify.requests.get")
+@patch("spotify.SpotifyClient.request_access_token")
+@patch("spotify.requests.Session.get")
 def test_get_artist_popularity_success(mock_get, mock_token):
     """Test that get_artist_popularity returns popularity score."""
     # Mock token
@@ -128,8 +125,8 @@ def test_get_artist_popularity_success(mock_get, mock_token):
 
 
 # test that get_artist_popularity raises an exception on API error
-@patch("spotify._request_access_token")
-@patch("spotify.requests.get")
+@patch("spotify.SpotifyClient.request_access_token")
+@patch("spotify.requests.Session.get")
 def test_get_artist_popularity_api_error(mock_get, mock_token):
     """Test that get_artist_popularity raises exception on API error."""
     mock_token.return_value = "test_token"
@@ -143,6 +140,68 @@ def test_get_artist_popularity_api_error(mock_get, mock_token):
         get_artist_popularity("Pitbull")
 
 
+# test that the client mounts a pooled adapter with retry/backoff
+def test_spotify_client_session_pool_and_retry():
+    """Test that SpotifyClient configures pool size and retries on 429/5xx."""
+    from spotify import SpotifyClient
+    client = SpotifyClient(pool_size=4, max_retries=2)
+
+    adapter = client.session.get_adapter("https://api.spotify.com/v1/search")
+
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+    assert 429 in adapter.max_retries.status_forcelist
+    assert adapter.max_retries.respect_retry_after_header
+
+
+# test that a long Retry-After fails the call instead of sleeping through it
+def test_spotify_client_long_retry_after_not_retried():
+    """Test that Retry-After above MAX_RETRY_AFTER stops retrying, a short one is honoured."""
+    from urllib3 import HTTPResponse
+    from urllib3.exceptions import MaxRetryError
+    from spotify import MAX_RETRY_AFTER, SpotifyClient
+    retry = SpotifyClient().session.get_adapter("https://api.spotify.com/v1/search").max_retries
+
+    short = HTTPResponse(status=429, headers={"Retry-After": str(MAX_RETRY_AFTER)})
+    retried = retry.increment("GET", "/v1/search", response=short)
+    assert retried.total == retry.total - 1
+    assert type(retried) is type(retry)
+
+    long = HTTPResponse(status=429, headers={"Retry-After": str(MAX_RETRY_AFTER + 55)})
+    with pytest.raises(MaxRetryError):
+        retried.increment("GET", "/v1/search", response=long)
+
+
+# test that concurrent threads share a single token request
+@patch.dict("os.environ", {"SPOTIFY_CLIENT_ID": "test_id", "SPOTIFY_CLIENT_SECRET": "test_secret"})
+@patch("spotify.requests.Session.post")
+def test_spotify_client_token_thread_safe(mock_post):
+    """Test that only one token request is made when threads race for it."""
+    import threading
+    from spotify import SpotifyClient
+
+    def slow_token(*args, **kwargs):
+        time.sleep(0.05)
+        response = MagicMock()
+        response.json.return_value = {"access_token": "shared_token", "expires_in": 3600}
+        return response
+
+    mock_post.side_effect = slow_token
+    client = SpotifyClient()
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(client.request_access_token()))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ["shared_token"] * 5
+    assert mock_post.call_count == 1
+
+
 # ========== MUSICBRAINZ API TESTS ==========
 
 # test that _initialize_musicbrainz sets user agent correctly
@@ -375,3 +434,54 @@ def test_get_artist_highest_tag_no_tags(mock_filter, mock_get_artist):
     
     assert result is None
 
+
+
+# test that the MusicBrainz and Spotify lookups run at the same time
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrain._get_full_artist_by_query")
+def test_get_artist_data_for_game_runs_lookups_in_parallel(mock_get_artist, mock_popularity):
+    """Test that total latency is close to the slowest upstream, not the sum."""
+    def slow_artist(query):
+        time.sleep(0.2)
+        return {"artist": {"name": "Pitbull", "tag-list": [{"name": "pop", "count": "5"}]}}
+
+    def slow_popularity(query):
+        time.sleep(0.2)
+        return 85
+
+    mock_get_artist.side_effect = slow_artist
+    mock_popularity.side_effect = slow_popularity
+
+    start = time.monotonic()
+    result = get_artist_data_for_game("Pitbull")
+    elapsed = time.monotonic() - start
+
+    assert result["spotify popularity"] == 85
+    assert elapsed < 0.35
+
+
+# test that a failing upstream fails the lookup without waiting for the other
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrain._get_full_artist_by_query")
+def test_get_artist_data_for_game_fails_fast(mock_get_artist, mock_popularity):
+    """Test that an upstream error is raised without waiting for the slower call."""
+    mock_get_artist.side_effect = IndexError("no artist")
+    mock_popularity.side_effect = lambda query: time.sleep(0.5) or 85
+
+    start = time.monotonic()
+    with pytest.raises(IndexError):
+        get_artist_data_for_game("Nobody")
+    assert time.monotonic() - start < 0.4
+
+
+# test that a lookup past the shared deadline raises TimeoutError
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrain._get_full_artist_by_query")
+def test_fetch_artist_data_timeout(mock_get_artist, mock_popularity):
+    """Test that _fetch_artist_data gives up once the shared deadline passes."""
+    from musicbrain import _fetch_artist_data
+    mock_get_artist.side_effect = lambda query: time.sleep(0.5)
+    mock_popularity.return_value = 85
+
+    with pytest.raises(TimeoutError):
+        _fetch_artist_data("Pitbull", timeout=0.1)
@@ -0,0 +1,116 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+from artist_aliases import ArtistAliases
+from artist_cache import ArtistCache
+from database.in_memory_storage import InMemoryDatabase
+from normalize import fold_text, normalize_query
+
+
+WEEKND_SEARCH = {"artist-list": [{"id": "weeknd-mbid", "name": "The Weeknd"}]}
+WEEKND_ARTIST = {
+    "artist": {
+        "id": "weeknd-mbid",
+        "name": "The Weeknd",
+        "gender": "male",
+        "area": {"name": "Canada"},
+        "tag-list": [{"name": "r&b", "count": "5"}],
+    }
+}
+
+WEEKND_SPOTIFY = {"id": "weeknd-spotify-id", "name": "The Weeknd", "popularity": 93}
+
+
+@pytest.fixture
+def aliases():
+    """Installs an alias table and an artist cache into musicbrain for a test."""
+    database = InMemoryDatabase()
+    artist_aliases = ArtistAliases(database)
+    musicbrain.set_artist_aliases(artist_aliases)
+    musicbrain.set_artist_cache(ArtistCache(database))
+    yield artist_aliases
+    musicbrain.set_artist_aliases(None)
+    musicbrain.set_artist_cache(None)
+
+
+# test that spelling variants share one key
+def test_normalize_query_variants():
+    """Test accent, case, punctuation and article folding."""
+    keys = {normalize_query(q) for q in ["the weeknd", "The Weeknd ", "THE WEEKND", "Weeknd"]}
+    assert keys == {"weeknd"}
+    assert normalize_query("Beyoncé") == normalize_query("BEYONCE") == "beyonce"
+    assert normalize_query("Guns N' Roses") == "guns n roses"
+    assert normalize_query("Simon & Garfunkel") == "simon and garfunkel"
+    assert normalize_query("AC/DC") == "ac dc"
+    assert normalize_query("The The") == "the"
+
+
+# test that symbol-only names do not share the empty key
+def test_normalize_query_symbol_only_names():
+    """Test that "!!!" and "+/-" get their own keys instead of ""."""
+    assert normalize_query("!!!") != normalize_query("+/-")
+    assert normalize_query("!!!") == normalize_query(" !!! ") == "!!!"
+    assert normalize_query("???") not in ("", normalize_query("!!!"))
+
+
+# test that suggestions keep the article
+def test_fold_text_keeps_articles():
+    """Test that fold_text folds like normalize_query without dropping articles."""
+    assert fold_text("  The  Weeknd!") == "the weeknd"
+
+
+# test the built-in misspellings
+def test_builtin_alias(aliases):
+    """Test that "The Weekend" resolves to "The Weeknd"."""
+    assert aliases.canonical_name("the weekend") == "The Weeknd"
+    assert aliases.canonical_name("Pitbull") == "Pitbull"
+
+
+# test that a search teaches the alias table
+@patch("musicbrain.search_spotify_artist")
+@patch("musicbrainzngs.get_artist_by_id")
+@patch("musicbrainzngs.search_artists")
+def test_learned_alias_hits_cache(mock_search, mock_get_by_id, mock_spotify_search, aliases):
+    """Test that a variant resolved once is served from the canonical cache entry."""
+    mock_search.return_value = WEEKND_SEARCH
+    mock_get_by_id.side_effect = lambda *args, **kwargs: {"artist": dict(WEEKND_ARTIST["artist"])}
+    mock_spotify_search.return_value = WEEKND_SPOTIFY
+
+    first = musicbrain.get_artist_data_for_game("Abel Tesfaye The Weeknd")
+    assert aliases.resolve("abel tesfaye the weeknd") == {
+        "name": "The Weeknd", "mbid": "weeknd-mbid", "spotify_id": "weeknd-spotify-id",
+    }
+
+    for variant in ["Abel Tesfaye The Weeknd", "THE WEEKND", "the weekend"]:
+        assert musicbrain.get_artist_data_for_game(variant) == first
+
+    assert mock_search.call_count == 1
+    assert mock_spotify_search.call_count == 1
+
+
+# test that known ids skip both searches
+@patch("musicbrain.get_spotify_artist")
+@patch("musicbrain.search_spotify_artist")
+@patch("musicbrainzngs.get_artist_by_id")
+@patch("musicbrainzngs.search_artists")
+def test_known_ids_skip_searches(mock_search, mock_get_by_id, mock_spotify_search, mock_spotify_artist, aliases):
+    """Test that an artist with known MBID and Spotify id is fetched by id only."""
+    aliases.learn("The Weeknd", "The Weeknd", "weeknd-mbid")
+    aliases.learn_spotify_id("The Weeknd", "weeknd-spotify-id")
+    mock_get_by_id.return_value = {"artist": dict(WEEKND_ARTIST["artist"])}
+    mock_spotify_artist.return_value = WEEKND_SPOTIFY
+
+    result = musicbrain.get_artist_data_for_game("the weeknd")
+
+    assert result["spotify popularity"] == 93
+    mock_search.assert_not_called()
+    mock_spotify_search.assert_not_called()
+    mock_get_by_id.assert_called_once_with("weeknd-mbid", includes=["tags"])
+    mock_spotify_artist.assert_called_once_with("weeknd-spotify-id")
@@ -0,0 +1,192 @@
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+from artist_cache import ArtistCache
+from database.in_memory_storage import InMemoryDatabase
+from single_flight import SingleFlight
+
+
+PITBULL = {
+    "name": "Pitbull",
+    "gender": "male",
+    "area": {"name": "United States"},
+    "tag": "dance-pop",
+    "spotify popularity": 85
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    """Provides an artist cache backed by the in-memory database."""
+    return ArtistCache(
+        InMemoryDatabase(),
+        field_ttls={"spotify popularity": 60},
+        default_ttl=3600,
+        lru_size=2,
+        clock=clock,
+    )
+
+
+@pytest.fixture
+def installed_cache(cache):
+    """Installs the cache into musicbrain for the duration of a test."""
+    musicbrain.set_artist_cache(cache)
+    yield cache
+    musicbrain.set_artist_cache(None)
+
+
+# test that a stored profile is returned for differently formatted queries
+def test_cache_hit_uses_normalized_query(cache):
+    """Test that queries differing only by case and spacing share an entry."""
+    cache.put("Pitbull", PITBULL)
+
+    profile, stale = cache.get("  PITBULL ")
+
+    assert profile == PITBULL
+    assert stale == set()
+    assert cache.stats()["lru_hits"] == 1
+
+
+# test that a miss is counted
+def test_cache_miss(cache):
+    """Test that unknown queries return None and count as a miss."""
+    profile, stale = cache.get("Nobody")
+
+    assert profile is None
+    assert cache.stats()["misses"] == 1
+
+
+# test that popularity goes stale before the rest of the profile
+def test_cache_per_field_ttl(cache, clock):
+    """Test that only fields past their own TTL are reported as stale."""
+    cache.put("Pitbull", PITBULL)
+    clock.now += 120
+
+    profile, stale = cache.get("Pitbull")
+
+    assert profile == PITBULL
+    assert stale == {"spotify popularity"}
+
+
+# test that entries evicted from the LRU are still found in the shared store
+def test_cache_lru_eviction_falls_back_to_database(cache):
+    """Test that the shared database tier serves entries evicted from the LRU."""
+    cache.put("Pitbull", PITBULL)
+    cache.put("Drake", dict(PITBULL, name="Drake"))
+    cache.put("Adele", dict(PITBULL, name="Adele"))
+
+    profile, _ = cache.get("Pitbull")
+
+    assert profile["name"] == "Pitbull"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["lru_size"] == 2
+
+
+# test that a stale LRU entry is replaced by a fresher shared one
+def test_stale_lru_entry_rereads_database(clock):
+    """Test that a worker sees the entry another worker refreshed in the shared store."""
+    database = InMemoryDatabase()
+    worker_a = ArtistCache(database, field_ttls={"spotify popularity": 60}, clock=clock)
+    worker_b = ArtistCache(database, field_ttls={"spotify popularity": 60}, clock=clock)
+    worker_a.put("Pitbull", PITBULL)
+    worker_b.get("Pitbull")
+    clock.now += 120
+
+    worker_a.put("Pitbull", dict(PITBULL, **{"spotify popularity": 90}), fields={"spotify popularity"})
+    profile, stale = worker_b.get("Pitbull")
+
+    assert profile["spotify popularity"] == 90
+    assert stale == set()
+    assert worker_b.get("Pitbull")[0]["spotify popularity"] == 90
+
+
+# test that a follower worker picks up the leader's refresh
+def test_two_workers_share_refresh(clock):
+    """Test that a second worker waits for the first one's refresh instead of fetching again."""
+    database = InMemoryDatabase()
+    fetches = []
+
+    def lookup(worker, cache, flight):
+        def fresh():
+            profile, stale = cache.get("Pitbull")
+            return profile if profile is not None and not stale else None
+
+        def refresh():
+            fetches.append(worker)
+            time.sleep(0.2)
+            profile = dict(PITBULL, **{"spotify popularity": 90})
+            cache.put("Pitbull", profile)
+            return profile
+
+        return fresh() or flight.do("pitbull", refresh, recheck=fresh)
+
+    workers = []
+    for name in ("A", "B"):
+        cache = ArtistCache(database, field_ttls={"spotify popularity": 60}, clock=clock)
+        cache.put("Pitbull", PITBULL)
+        workers.append((name, cache, SingleFlight(database, poll_interval=0.01)))
+    clock.now += 120
+
+    leader = threading.Thread(target=lookup, args=workers[0])
+    leader.start()
+    time.sleep(0.05)
+    start = time.monotonic()
+    result = lookup(*workers[1])
+    elapsed = time.monotonic() - start
+    leader.join()
+
+    assert result["spotify popularity"] == 90
+    assert fetches == ["A"]
+    assert elapsed < 0.4
+
+
+# test that get_artist_data_for_game only fetches once for repeated queries
+@patch("musicbrain._fetch_artist_data")
+def test_get_artist_data_for_game_uses_cache(mock_fetch, installed_cache):
+    """Test that repeated lookups are served from the cache."""
+    mock_fetch.return_value = dict(PITBULL)
+
+    first = musicbrain.get_artist_data_for_game("Pitbull")
+    second = musicbrain.get_artist_data_for_game("pitbull")
+
+    assert first == second == PITBULL
+    mock_fetch.assert_called_once_with("Pitbull")
+
+
+# test that a stale popularity only triggers a Spotify lookup
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrain._fetch_artist_data")
+def test_get_artist_data_for_game_refreshes_popularity_only(mock_fetch, mock_popularity, installed_cache, clock):
+    """Test that an expired popularity is refreshed without MusicBrainz calls."""
+    mock_fetch.return_value = dict(PITBULL)
+    mock_popularity.return_value = 90
+    musicbrain.get_artist_data_for_game("Pitbull")
+    clock.now += 120
+
+    result = musicbrain.get_artist_data_for_game("Pitbull")
+
+    assert result["spotify popularity"] == 90
+    assert mock_fetch.call_count == 1
+    mock_popularity.assert_called_once_with("Pitbull")
@@ -0,0 +1,81 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+from artist_index import ArtistIndex, build_index
+
+
+SEED = [
+    {"name": "Pitbull", "aliases": ["Mr. 305"], "mbid": "pitbull-id", "gender": "male",
+     "area": "United States", "tag": "dance-pop", "popularity": 85},
+    {"name": "Adele", "mbid": "adele-id", "gender": "female",
+     "area": "United Kingdom", "tag": "soul", "popularity": 80},
+    {"name": "Drake", "mbid": "drake-id", "gender": "male",
+     "area": "Canada", "tag": "hip hop", "popularity": 90},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Provides an artist index built from the seed artists."""
+    path = tmp_path / "artists.idx"
+    build_index(SEED, path)
+    artist_index = ArtistIndex(path)
+    yield artist_index
+    artist_index.close()
+
+
+# test that artists are found by normalized name
+def test_index_lookup_by_name(index):
+    """Test that lookups ignore case and spacing and return game profiles."""
+    profile = index.lookup("  ADELE ")
+
+    assert profile["name"] == "Adele"
+    assert profile["area"] == {"name": "United Kingdom"}
+    assert profile["spotify popularity"] == 80
+
+
+# test that aliases resolve to the same artist
+def test_index_lookup_by_alias(index):
+    """Test that an alias resolves to the canonical artist record."""
+    record = index.lookup_record("mr. 305")
+
+    assert record["mbid"] == "pitbull-id"
+    assert record["profile"]["name"] == "Pitbull"
+
+
+# test that unknown names miss
+def test_index_lookup_miss(index):
+    """Test that an unknown name returns None."""
+    assert index.lookup("Nobody") is None
+    assert len(index) == 4
+    assert sorted(index.names()) == ["Adele", "Drake", "Pitbull"]
+
+
+# test that a file that is not an index is rejected
+def test_index_rejects_bad_file(tmp_path):
+    """Test that ArtistIndex refuses files without the index header."""
+    path = tmp_path / "bad.idx"
+    path.write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        ArtistIndex(path)
+
+
+# test that get_artist_data_for_game skips the network on an index hit
+@patch("musicbrain._fetch_artist_data")
+def test_get_artist_data_for_game_uses_index(mock_fetch, index):
+    """Test that indexed artists resolve without upstream calls."""
+    musicbrain.set_artist_index(index)
+    try:
+        result = musicbrain.get_artist_data_for_game("drake")
+    finally:
+        musicbrain.set_artist_index(None)
+
+    assert result["name"] == "Drake"
+    mock_fetch.assert_not_called()
@@ -0,0 +1,276 @@
+import asyncio
+import pytest
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from artist_cache import AsyncArtistCache
+from asgi import create_async_app
+from async_lookup import AsyncArtistLookup, AsyncMusicBrainzClient, AsyncSpotifyClient
+from database.async_database import AsyncInMemoryDatabase
+from games import AsyncGames
+from negative_cache import ArtistNotFoundError, AsyncNegativeCache
+
+
+PITBULL = {
+    "name": "Pitbull",
+    "gender": "male",
+    "area": {"name": "United States"},
+    "tag": "dance-pop",
+    "spotify popularity": 85
+}
+
+TAYLOR = {
+    "name": "Taylor Swift",
+    "gender": "female",
+    "area": {"name": "United States"},
+    "tag": "pop",
+    "spotify popularity": 92
+}
+
+
+class FakeLookup:
+    def __init__(self, profiles):
+        self.profiles = profiles
+
+    async def get_artist_data_for_game(self, query):
+        await asyncio.sleep(0)
+        if query not in self.profiles:
+            raise ArtistNotFoundError(query)
+        return dict(self.profiles[query])
+
+    async def aclose(self):
+        pass
+
+
+class SlowSpotify:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_artist_popularity(self, query):
+        self.calls += 1
+        await asyncio.sleep(0.1)
+        return 85
+
+
+class SlowMusicBrainz:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_full_artist_by_query(self, query):
+        self.calls += 1
+        await asyncio.sleep(0.1)
+        return {"artist": {"name": query, "tag-list": [{"name": "pop", "count": "3"}]}}
+
+
+class MissingMusicBrainz:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_full_artist_by_query(self, query):
+        self.calls += 1
+        raise ArtistNotFoundError(query)
+
+
+@pytest.fixture
+def client():
+    """Provides a Quart test client over the async in-memory database."""
+    games_service = AsyncGames(AsyncInMemoryDatabase())
+    lookup = FakeLookup({"Pitbull": PITBULL, "Taylor Swift": TAYLOR})
+    app = create_async_app("test_secret_key", games_service, lookup)
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+# test a full game over the async app
+def test_async_new_game_and_guess(client, monkeypatch):
+    """Test that /new-game and /guess work through the async views."""
+    monkeypatch.setattr(AsyncGames, "select_random_artist", lambda self: "Pitbull")
+
+    async def play():
+        response = await client.get("/new-game")
+        assert response.status_code == 200
+        response = await client.post("/guess", json={"guess": "Taylor Swift"})
+        assert response.status_code == 200
+        return await response.get_json()
+
+    data = asyncio.run(play())
+
+    assert data["status"] == "ONGOING"
+    assert data["guess_number"] == 1
+    assert data["comparison"]["fields"]["popularity"] == "higher"
+
+
+# test that a guess without a game is rejected
+def test_async_guess_no_game_exists(client):
+    """Test that /guess returns 400 when no game exists."""
+    async def guess():
+        response = await client.post("/guess", json={"guess": "Taylor Swift"})
+        return response.status_code, await response.get_json()
+
+    status, data = asyncio.run(guess())
+
+    assert status == 400
+    assert data["message"] == "Game session invalid"
+
+
+# test the 404 response for an unknown artist
+def test_async_guess_unknown_artist_returns_404(client, monkeypatch):
+    """Test that the async /guess answers 404 NOT_FOUND when no artist matches."""
+    monkeypatch.setattr(AsyncGames, "select_random_artist", lambda self: "Pitbull")
+
+    async def guess():
+        await client.get("/new-game")
+        response = await client.post("/guess", json={"guess": "Taylr Swift"})
+        return response.status_code, await response.get_json()
+
+    status, data = asyncio.run(guess())
+
+    assert status == 404
+    assert data == {"error": "NOT_FOUND", "message": "Could not find that artist"}
+
+
+# test that a known miss never reaches the upstream APIs
+def test_async_lookup_negative_cache():
+    """Test that the second lookup of an unknown artist makes no upstream call."""
+    spotify, musicbrainz = SlowSpotify(), MissingMusicBrainz()
+    negative_cache = AsyncNegativeCache(AsyncInMemoryDatabase())
+    lookup = AsyncArtistLookup(spotify, musicbrainz, negative_cache=negative_cache)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(ArtistNotFoundError):
+                await lookup.get_artist_data_for_game("Taylr Swift")
+
+    asyncio.run(run())
+
+    assert musicbrainz.calls == 1
+    assert negative_cache.stats() == {"hits": 2, "stores": 1, "avoided_upstream_calls": 4}
+
+
+# test that cached artists skip the negative cache
+def test_async_cache_hit_skips_negative_cache():
+    """Test that a guess answered by the artist cache makes no negative cache lookup."""
+    negative_cache = AsyncMock()
+    cache = AsyncArtistCache(AsyncInMemoryDatabase())
+    lookup = AsyncArtistLookup(SlowSpotify(), MissingMusicBrainz(), cache=cache, negative_cache=negative_cache)
+
+    async def run():
+        await cache.put("Pitbull", PITBULL)
+        return await lookup.get_artist_data_for_game("Pitbull")
+
+    assert asyncio.run(run()) == PITBULL
+    negative_cache.contains.assert_not_called()
+
+
+# test that the async lookup runs both upstreams at once and coalesces
+def test_async_lookup_parallel_and_coalesced():
+    """Test that concurrent identical lookups share one fetch of both upstreams."""
+    spotify, musicbrainz = SlowSpotify(), SlowMusicBrainz()
+    lookup = AsyncArtistLookup(spotify, musicbrainz)
+
+    async def run():
+        start = time.monotonic()
+        results = await asyncio.gather(*[lookup.get_artist_data_for_game("Drake") for _ in range(10)])
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(run())
+
+    assert all(result["spotify popularity"] == 85 for result in results)
+    assert spotify.calls == 1 and musicbrainz.calls == 1
+    assert elapsed < 0.18
+
+
+# test that the MusicBrainz JSON response is converted to the musicbrainzngs shape
+def test_async_musicbrainz_client_shape():
+    """Test that tags from the JSON API become a tag-list like musicbrainzngs."""
+    def handler(request):
+        if request.url.path == "/ws/2/artist/":
+            return httpx.Response(200, json={"artists": [{"id": "pitbull-id"}]})
+        return httpx.Response(200, json={
+            "id": "pitbull-id",
+            "name": "Pitbull",
+            "gender": "Male",
+            "tags": [{"name": "pop", "count": 2}, {"name": "dance-pop", "count": 7}],
+        })
+
+    async def run():
+        musicbrainz = AsyncMusicBrainzClient()
+        musicbrainz.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await musicbrainz.get_full_artist_by_query("Pitbull")
+        finally:
+            await musicbrainz.aclose()
+
+    full_artist = asyncio.run(run())
+
+    assert full_artist["artist"]["name"] == "Pitbull"
+    assert {"name": "dance-pop", "count": "7"} in full_artist["artist"]["tag-list"]
+
+
+# test that a long Retry-After is not slept through
+def test_async_client_long_retry_after_not_retried():
+    """Test that a 429 with Retry-After above MAX_RETRY_AFTER raises without retrying."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(429, headers={"Retry-After": "60"})
+
+    async def run():
+        musicbrainz = AsyncMusicBrainzClient()
+        musicbrainz.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await musicbrainz.get_full_artist_by_query("Pitbull")
+        finally:
+            await musicbrainz.aclose()
+
+    start = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+
+    assert len(requests) == 1
+    assert time.monotonic() - start < 1
+
+
+# test that the async client uses the token shared by SpotifyTokenManager
+def test_async_spotify_uses_shared_token():
+    """Test that a valid token in the database is used without calling the token endpoint."""
+    database = AsyncInMemoryDatabase()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"access_token": "inline-token", "expires_in": 3600})
+
+    async def run():
+        spotify = AsyncSpotifyClient(database=database)
+        spotify.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await database.set_value("spotify:token", {
+                "access_token": "shared-token", "fetched_at": time.time(), "expires_at": time.time() + 600,
+            })
+            shared = await spotify.request_access_token()
+            await database.delete_value("spotify:token")
+            spotify._token = None
+            inline = await spotify.request_access_token()
+            return shared, inline, await database.get_value("spotify:token")
+        finally:
+            await spotify.aclose()
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+        monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+        shared, inline, stored = asyncio.run(run())
+
+    assert shared == "shared-token"
+    assert inline == "inline-token"
+    assert len(requests) == 1
+    assert stored["expires_at"] - stored["fetched_at"] == 3600
@@ -0,0 +1,89 @@
+import json
+import pytest
+import sys
+from pathlib import Path
+
+import musicbrainzngs
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import spotify
+from artist_cache import ArtistCache
+from artist_index import ArtistIndex, build_index, load_seed
+from batch_resolver import BatchResolver, spotify_id_from_relations
+from bench import benchmark
+from bench.stubs import MusicBrainzStub, SpotifyStub, spotify_id
+from database.in_memory_storage import InMemoryDatabase
+
+
+NAMES = ["Drake", "Adele", "Bench Artist 1", "Bench Artist 2", "Bench Artist 3"]
+
+
+@pytest.fixture
+def stubs():
+    """Starts both stub upstreams and points the real clients at them."""
+    spotify_stub = SpotifyStub().start()
+    musicbrainz_stub = MusicBrainzStub().start()
+    benchmark.configure_upstreams(spotify_stub, musicbrainz_stub)
+    musicbrainzngs.set_rate_limit(False)
+    yield spotify_stub, musicbrainz_stub
+    spotify_stub.stop()
+    musicbrainz_stub.stop()
+    spotify._default_client = None
+    musicbrainzngs.set_hostname("musicbrainz.org", use_https=True)
+    musicbrainzngs.set_rate_limit(True)
+
+
+# test that the Spotify id is read from the url-rels
+def test_spotify_id_from_relations():
+    """Test that only open.spotify.com artist links are used."""
+    full_artist = {"artist": {"url-relation-list": [
+        {"type": "official homepage", "target": "https://drakeofficial.com"},
+        {"type": "free streaming", "target": "https://open.spotify.com/artist/3TVXtAsR1Inumwj472S9r4"},
+    ]}}
+
+    assert spotify_id_from_relations(full_artist) == "3TVXtAsR1Inumwj472S9r4"
+    assert spotify_id_from_relations({"artist": {}}) is None
+
+
+# test a batch run uses one Spotify call per chunk
+def test_batch_resolves_with_one_spotify_call_per_chunk(stubs, tmp_path):
+    """Test that popularity for a chunk comes from a single multi-id call."""
+    spotify_stub, musicbrainz_stub = stubs
+    output = tmp_path / "artists.jsonl"
+    cache = ArtistCache(InMemoryDatabase())
+    resolver = BatchResolver(cache=cache, chunk_size=3)
+
+    failed = resolver.resolve(NAMES, output)
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+
+    assert failed == []
+    assert [line["query"] for line in lines] == NAMES
+    assert lines[0]["spotify_id"] == spotify_id("Drake")
+    assert lines[0]["popularity"] == 95
+    assert spotify_stub.calls["artists"] == 2
+    assert "search" not in spotify_stub.calls
+    assert musicbrainz_stub.calls["lookup"] == len(NAMES)
+    assert cache.get("adele")[0]["spotify popularity"] == 83
+
+
+# test that a second run resumes from the output file
+def test_batch_resumes_from_checkpoint(stubs, tmp_path):
+    """Test that names already in the output are skipped and the seed builds an index."""
+    _, musicbrainz_stub = stubs
+    output = tmp_path / "artists.jsonl"
+    BatchResolver().resolve(NAMES[:2], output)
+    musicbrainz_stub.reset()
+
+    resolver = BatchResolver()
+    resolver.resolve(NAMES, output)
+
+    assert resolver.counters["skipped"] == 2
+    assert musicbrainz_stub.calls["search"] == 3
+
+    build_index(load_seed(output), tmp_path / "artists.idx")
+    index = ArtistIndex(tmp_path / "artists.idx")
+    assert index.lookup("drake")["area"] == {"name": "Canada"}
+    index.close()
@@ -0,0 +1,89 @@
+import json
+import pytest
+import sys
+from pathlib import Path
+
+import musicbrainzngs
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+import spotify
+from bench import benchmark
+from bench.stubs import MusicBrainzStub, SpotifyStub
+from single_flight import SingleFlight
+
+
+@pytest.fixture
+def stubs():
+    """Starts both stub upstreams and points the real clients at them."""
+    spotify_stub = SpotifyStub().start()
+    musicbrainz_stub = MusicBrainzStub().start()
+    benchmark.configure_upstreams(spotify_stub, musicbrainz_stub)
+    musicbrainzngs.set_rate_limit(False)
+    yield spotify_stub, musicbrainz_stub
+    spotify_stub.stop()
+    musicbrainz_stub.stop()
+    spotify._default_client = None
+    musicbrainzngs.set_hostname("musicbrainz.org", use_https=True)
+    musicbrain.set_musicbrainz_limiter(None)
+    musicbrain.set_artist_cache(None)
+    musicbrain.set_artist_aliases(None)
+    musicbrain.set_single_flight(SingleFlight())
+
+
+# test that the real clients can talk to the stubs
+def test_stubs_serve_artist_lookup(stubs):
+    """Test that a full artist lookup resolves against the stub servers."""
+    spotify_stub, musicbrainz_stub = stubs
+
+    result = musicbrain._fetch_artist_data("Drake")
+
+    assert result["name"] == "Drake"
+    assert result["gender"] == "male"
+    assert result["area"] == {"name": "Canada"}
+    assert result["tag"] == "hip hop"
+    assert result["spotify popularity"] == 95
+    assert spotify_stub.calls == {"token": 1, "search": 1}
+    assert musicbrainz_stub.calls == {"search": 1, "lookup": 1}
+
+
+# test a short benchmark run end to end
+def test_benchmark_run_and_baseline(stubs, tmp_path):
+    """Test that a run reports every endpoint and passes against its own baseline."""
+    baseline_path = tmp_path / "baseline.json"
+
+    code = benchmark.main([
+        "--sessions", "4", "--concurrency", "2",
+        "--latency-ms", "0", "--jitter-ms", "0",
+        "--save-baseline", str(baseline_path),
+    ])
+    report = json.loads(baseline_path.read_text())
+
+    assert code == 0
+    assert set(report["endpoints"]) == {"all", "/new-game", "/guess", "/suggest"}
+    assert report["endpoints"]["/new-game"]["count"] == 4
+    assert report["upstream_calls_per_request"] > 0
+
+
+# test that the regression check flags slower or chattier runs
+def test_compare_flags_regressions():
+    """Test that compare() reports latency, RPS and upstream call regressions."""
+    baseline = {
+        "rps": 100.0,
+        "upstream_calls_per_request": 0.5,
+        "endpoints": {"/guess": {"p50": 0.010, "p95": 0.020, "p99": 0.030}},
+    }
+    same = dict(baseline)
+    worse = {
+        "rps": 50.0,
+        "upstream_calls_per_request": 1.0,
+        "endpoints": {"/guess": {"p50": 0.010, "p95": 0.020, "p99": 0.090}},
+    }
+
+    assert benchmark.compare(same, baseline, 0.25) == []
+    regressions = benchmark.compare(worse, baseline, 0.25)
+    assert len(regressions) == 3
+    assert regressions[0].startswith("/guess p99")
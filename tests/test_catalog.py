@@ -0,0 +1,125 @@
+import json
+import os
+import random
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from app import create_app
+from catalog import (
+    AliasTable,
+    Catalog,
+    CatalogManager,
+    DatabaseCatalogSource,
+    FileCatalogSource,
+    RecentAnswers,
+    publish_catalog,
+)
+from database.in_memory_storage import InMemoryDatabase
+from games import Games
+
+
+ENTRIES = [
+    {"name": "Drake", "gender": "male", "area": "Canada", "tag": "hip hop", "popularity": 95},
+    {"name": "Adele", "gender": "female", "area": "United Kingdom", "tag": "soul", "popularity": 83},
+    {"name": "Tame Impala", "popularity": 70},
+    {"name": "Khruangbin", "popularity": 60, "tier": "hard"},
+    {"name": "Excluded Artist", "popularity": 99, "exclude": True},
+]
+
+
+def write_catalog(path, entries):
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+
+# test that the alias table samples in proportion to the weights
+def test_alias_table_matches_weights():
+    """Test that sampled frequencies follow the weights."""
+    table = AliasTable([1, 2, 7])
+    rng = random.Random(0)
+    counts = [0, 0, 0]
+    for _ in range(20000):
+        counts[table.sample(rng)] += 1
+
+    assert counts[0] / 20000 == pytest.approx(0.1, abs=0.02)
+    assert counts[2] / 20000 == pytest.approx(0.7, abs=0.02)
+
+
+# test tiers, exclusions and profiles
+def test_catalog_tiers_and_exclusions():
+    """Test that tiers come from popularity unless given and excluded names never appear."""
+    catalog = Catalog(ENTRIES, excluded=["adele"])
+
+    assert catalog.names() == ["Drake", "Tame Impala", "Khruangbin"]
+    assert catalog.tiers() == ["easy", "hard", "medium"]
+    assert catalog.pick(tier="hard")["name"] == "Khruangbin"
+    assert catalog.pick(tier="easy")["profile"]["area"] == {"name": "Canada"}
+    assert catalog.pick(tier="medium")["profile"] is None
+    with pytest.raises(KeyError):
+        catalog.pick(tier="impossible")
+
+
+# test that recent answers are avoided
+def test_recent_answers_are_avoided():
+    """Test that a name in the session filter is skipped when others exist."""
+    catalog = Catalog(ENTRIES[:2])
+    recent = RecentAnswers.from_token(RecentAnswers().token())
+    recent.add("Drake")
+    recent = RecentAnswers.from_token(recent.token())
+
+    assert "drake" in recent
+    assert "Adele" not in recent
+    assert all(catalog.pick(recent=recent, rng=random.Random(n))["name"] == "Adele" for n in range(20))
+
+
+# test hot reload from a file and from the database
+def test_catalog_manager_hot_reload(tmp_path):
+    """Test that a changed source is swapped in and a broken one is ignored."""
+    path = tmp_path / "catalog.jsonl"
+    write_catalog(path, ENTRIES[:1])
+    manager = CatalogManager(FileCatalogSource(path))
+    assert manager.check() is False
+
+    write_catalog(path, ENTRIES[:2])
+    os.utime(path, ns=(1, 1))
+    assert manager.check() is True
+    assert len(manager.catalog) == 2
+
+    write_catalog(path, [])
+    os.utime(path, ns=(2, 2))
+    assert manager.check() is False
+    assert len(manager.catalog) == 2
+
+    database = InMemoryDatabase()
+    publish_catalog(database, ENTRIES[:1])
+    manager = CatalogManager(DatabaseCatalogSource(database))
+    publish_catalog(database, ENTRIES[:3])
+    assert manager.check() is True
+    assert len(manager.catalog) == 3
+
+
+# test /new-game with a catalog
+@patch("app.get_artist_data_for_game")
+def test_new_game_uses_catalog(mock_get_artist_data, tmp_path):
+    """Test that /new-game serves catalog profiles and honours ?tier=."""
+    path = tmp_path / "catalog.jsonl"
+    write_catalog(path, ENTRIES)
+    games_service = Games(InMemoryDatabase())
+    client = create_app(
+        "test_secret_key", games_service, catalog=CatalogManager(FileCatalogSource(path))
+    ).test_client()
+
+    response = client.get("/new-game?tier=easy")
+
+    assert response.status_code == 200
+    mock_get_artist_data.assert_not_called()
+    assert client.get("/new-game?tier=impossible").status_code == 400
+
+    mock_get_artist_data.return_value = {"name": "Tame Impala", "spotify popularity": 70}
+    assert client.get("/new-game?tier=medium").status_code == 200
+    mock_get_artist_data.assert_called_once_with("Tame Impala")
@@ -0,0 +1,175 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+from artist_cache import ArtistCache
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from database.in_memory_storage import InMemoryDatabase
+
+
+PITBULL_ARTIST = {
+    "artist": {
+        "name": "Pitbull",
+        "gender": "male",
+        "area": {"name": "United States"},
+        "tag-list": [{"name": "dance-pop", "count": "7"}],
+    }
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ConnectionError("upstream down")
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_threshold=2, reset_timeout=30, slow_call_threshold=5, clock=clock)
+
+
+@pytest.fixture
+def breakers(clock):
+    """Installs open-able breakers and a cache into musicbrain for a test."""
+    musicbrainz = CircuitBreaker("musicbrainz", failure_threshold=1, reset_timeout=30, clock=clock)
+    spotify = CircuitBreaker("spotify", failure_threshold=1, reset_timeout=30, clock=clock)
+    cache = ArtistCache(InMemoryDatabase(), field_ttls={"spotify popularity": 60}, clock=clock)
+    musicbrain.set_circuit_breakers(musicbrainz=musicbrainz, spotify=spotify)
+    musicbrain.set_artist_cache(cache)
+    yield musicbrainz, spotify
+    musicbrain.set_circuit_breakers()
+    musicbrain.set_artist_cache(None)
+
+
+# test that consecutive failures open the breaker
+def test_breaker_opens_after_threshold(breaker):
+    """Test that the breaker fails fast once the threshold is reached."""
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never called")
+    assert breaker.stats()["rejected"] == 1
+
+
+# test the half-open trial call
+def test_breaker_half_open_trial(breaker, clock):
+    """Test that one trial call after the cool-down closes or reopens the breaker."""
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    clock.now += 30
+
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+
+    clock.now += 30
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+# test that slow successes count as failures
+def test_breaker_counts_slow_calls(breaker, clock):
+    """Test that calls slower than slow_call_threshold trip the breaker."""
+    def slow():
+        clock.now += 6
+        return "late"
+
+    assert breaker.call(slow) == "late"
+    assert breaker.call(slow) == "late"
+    assert breaker.state == OPEN
+
+
+# test the degraded profile while Spotify is down
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrain._get_full_artist_by_query")
+def test_degraded_profile_when_spotify_open(mock_musicbrainz, mock_popularity, breakers, clock):
+    """Test that an open Spotify breaker yields popularity None, then recovers."""
+    mock_musicbrainz.side_effect = lambda query: {"artist": dict(PITBULL_ARTIST["artist"])}
+    mock_popularity.side_effect = ConnectionError("spotify down")
+    with pytest.raises(ConnectionError):
+        musicbrain.get_artist_data_for_game("Pitbull")
+
+    result = musicbrain.get_artist_data_for_game("Pitbull")
+
+    assert result["name"] == "Pitbull"
+    assert result["spotify popularity"] is None
+
+    # The degraded profile is cached with popularity stale, so once Spotify
+    # is back only Spotify is asked again
+    clock.now += 30
+    mock_popularity.side_effect = None
+    mock_popularity.return_value = 85
+
+    result = musicbrain.get_artist_data_for_game("Pitbull")
+
+    assert result["spotify popularity"] == 85
+    assert mock_musicbrainz.call_count == 2
+
+
+# test that a stale cached profile is served while MusicBrainz is down
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrainzngs.get_artist_by_id")
+@patch("musicbrainzngs.search_artists")
+def test_stale_profile_when_musicbrainz_open(mock_search, mock_get_by_id, mock_popularity, breakers, clock):
+    """Test that an expired cache entry is served when the refresh fails fast."""
+    musicbrainz, _ = breakers
+    mock_search.return_value = {"artist-list": [{"id": "pitbull-mbid", "name": "Pitbull"}]}
+    mock_get_by_id.side_effect = lambda *args, **kwargs: {"artist": dict(PITBULL_ARTIST["artist"])}
+    mock_popularity.return_value = 85
+    musicbrain.get_artist_data_for_game("Pitbull")
+    # Every cached field is past its TTL now
+    clock.now += 31 * 24 * 60 * 60
+    with pytest.raises(ConnectionError):
+        musicbrainz.call(fail)
+
+    result = musicbrain.get_artist_data_for_game("Pitbull")
+
+    assert result["name"] == "Pitbull"
+    assert result["spotify popularity"] == 85
+    assert mock_search.call_count == 1
+    assert musicbrainz.stats()["rejected"] == 1
+
+
+# test that time queued in the rate limiter is not a slow MusicBrainz call
+@patch("musicbrainzngs.get_artist_by_id")
+@patch("musicbrainzngs.search_artists")
+def test_breaker_ignores_rate_limiter_wait(mock_search, mock_get_by_id, clock):
+    """Test that only the HTTP call is timed against slow_call_threshold."""
+    breaker = CircuitBreaker("musicbrainz", failure_threshold=1, slow_call_threshold=5, clock=clock)
+    limiter = MagicMock()
+    limiter.acquire.side_effect = lambda: setattr(clock, "now", clock.now + 10)
+    mock_search.return_value = {"artist-list": [{"id": "pitbull-mbid", "name": "Pitbull"}]}
+    mock_get_by_id.return_value = PITBULL_ARTIST
+    musicbrain.set_circuit_breakers(musicbrainz=breaker)
+    musicbrain.set_musicbrainz_limiter(limiter)
+    try:
+        musicbrain._get_full_artist_by_query("Pitbull")
+    finally:
+        musicbrain.set_circuit_breakers()
+        musicbrain.set_musicbrainz_limiter(None)
+
+    assert limiter.acquire.call_count == 2
+    assert breaker.state == CLOSED
+    assert breaker.stats()["failures"] == 0
@@ -0,0 +1,83 @@
+import json
+import pytest
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from database.codec import CompactCodec, JsonCodec
+from games import project_answer
+
+
+PITBULL = {
+    "name": "Pitbull",
+    "type": "Person",
+    "gender": "Male",
+    "life-span": {"begin": "1981-01-15", "ended": "false"},
+    "area": {"name": "United States"},
+    "tag": "dance-pop",
+    "spotify popularity": 85
+}
+
+STORED_PITBULL = {
+    "name": "Pitbull",
+    "gender": "Male",
+    "area": {"name": "United States"},
+    "tag": "dance-pop",
+    "spotify popularity": 85
+}
+
+
+@pytest.fixture
+def codec():
+    return CompactCodec()
+
+
+# test that a profile survives a round trip with only the game fields
+def test_compact_round_trip(codec):
+    """Test that encode/decode keeps the compared fields and drops the rest."""
+    assert codec.decode(codec.encode(PITBULL)) == STORED_PITBULL
+
+
+# test that missing values and uncommon genders round trip
+def test_compact_round_trip_unknown_values(codec):
+    """Test that None values and non-interned genders are preserved."""
+    profile = {"name": "Björk", "gender": "Agender", "area": None, "tag": None, "spotify popularity": None}
+
+    assert codec.decode(codec.encode(profile)) == profile
+
+
+# test that the compact encoding is smaller than JSON
+def test_compact_is_smaller_than_json(codec):
+    """Test that the compact encoding uses fewer bytes than the JSON blob."""
+    assert len(codec.encode(PITBULL)) < len(json.dumps(PITBULL)) / 2
+    assert len(codec.encode(PITBULL)) < len(JsonCodec().encode(PITBULL))
+
+
+# test that JSON written before the codec existed can still be read
+def test_compact_reads_legacy_json(codec):
+    """Test that values stored as JSON are decoded by the migration reader."""
+    assert codec.decode(json.dumps(PITBULL).encode("utf-8")) == PITBULL
+    assert codec.decode(json.dumps(PITBULL)) == PITBULL
+
+
+# test that unknown versions are rejected
+def test_compact_rejects_unknown_version(codec):
+    """Test that decoding a newer version raises instead of returning garbage."""
+    data = bytearray(codec.encode(PITBULL))
+    data[0] = 99
+    with pytest.raises(ValueError):
+        codec.decode(bytes(data))
+
+
+# test that a projected answer record survives both codecs
+@pytest.mark.parametrize("record_codec", [CompactCodec(), JsonCodec()])
+def test_projected_answer_round_trip(record_codec):
+    """Test that the snapshot and comparison key of an answer are stored as is."""
+    record = project_answer(PITBULL)
+    assert record_codec.decode(record_codec.encode(record)) == record
+
+    record["matrix_id"] = 42
+    assert record_codec.decode(record_codec.encode(record)) == record
@@ -0,0 +1,101 @@
+import pytest
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from comparison_matrix import ComparisonMatrix, build_matrix
+from database.in_memory_storage import InMemoryDatabase
+from games import Games, artist_key, compare_keys
+
+
+CATALOG = [
+    {"name": "Pitbull", "gender": "male", "area": "United States", "tag": "dance-pop", "popularity": 85},
+    {"name": "Adele", "gender": "female", "area": "United Kingdom", "tag": "soul", "popularity": 80},
+    {"name": "Drake", "gender": "male", "area": "Canada", "tag": "hip hop", "popularity": 95},
+    {"name": "Harry Styles", "gender": "male", "area": "United Kingdom", "tag": "pop", "popularity": None},
+    {"name": "Unresolved Artist"},
+]
+
+
+def profile(entry, **changes):
+    artist = {
+        "name": entry["name"],
+        "gender": entry["gender"],
+        "area": {"name": entry["area"]},
+        "tag": entry["tag"],
+        "spotify popularity": entry["popularity"],
+    }
+    artist.update(changes)
+    return artist
+
+
+@pytest.fixture
+def matrix(tmp_path):
+    """Provides a comparison matrix built from the catalog."""
+    path = tmp_path / "catalog.cmx"
+    assert build_matrix(CATALOG, path) == (4, 1)
+    comparison_matrix = ComparisonMatrix(path)
+    yield comparison_matrix
+    comparison_matrix.close()
+
+
+# test that every pair matches a direct comparison
+def test_matrix_matches_direct_comparison(matrix):
+    """Test that each (answer, guess) cell decodes to compare_keys()."""
+    keys = [artist_key(profile(entry)) for entry in CATALOG[:4]]
+    for answer_key in keys:
+        answer_id = matrix.id_for_key(answer_key)
+        for guess_key in keys:
+            assert matrix.lookup(answer_id, answer_key, guess_key) == compare_keys(answer_key, guess_key)
+
+
+# test that changed or unknown profiles are not answered from the table
+def test_matrix_misses_changed_profiles(matrix):
+    """Test that a changed profile, an unknown artist or a stale answer id falls back to None."""
+    pitbull = artist_key(profile(CATALOG[0]))
+    pitbull_id = matrix.id_for_key(pitbull)
+    assert matrix.lookup(pitbull_id, pitbull, artist_key(profile(CATALOG[1], tag="pop"))) is None
+    assert matrix.lookup(pitbull_id, pitbull, artist_key({"name": "Taylor Swift"})) is None
+    assert matrix.lookup(matrix.id_of("adele"), pitbull, pitbull) is None
+    assert matrix.lookup(None, pitbull, pitbull) is None
+    assert matrix.id_of("unresolved artist") is None
+
+
+# test the guess information analytics
+def test_matrix_information(matrix):
+    """Test that a guess splitting every answer apart carries the most information."""
+    ranked = matrix.most_informative()
+
+    # With 4 answers, telling every one apart is log2(4) = 2 bits
+    assert len(ranked) == 4
+    assert ranked[0][1] == pytest.approx(2.0)
+    assert [bits for _, bits in ranked] == sorted((bits for _, bits in ranked), reverse=True)
+    assert matrix.information(matrix.id_of("drake")) == pytest.approx(2.0)
+
+
+# test that Games uses the matrix
+def test_games_uses_matrix(matrix):
+    """Test that a known pair is answered from the matrix with the same result."""
+    database = InMemoryDatabase()
+    games_service = Games(database, comparison_matrix=matrix)
+    games_service.new_game("test_game", profile(CATALOG[0]))
+
+    assert database.get_answer("test_game")["matrix_id"] == matrix.id_of("pitbull")
+    comparison = games_service.guess("test_game", profile(CATALOG[2]))
+
+    assert comparison["is_correct"] == False
+    assert comparison["fields"] == {"gender": "match", "genre": "no_match", "area": "no_match", "popularity": "higher"}
+
+
+# test that popularity is compared live
+def test_games_compares_live_popularity(matrix):
+    """Test that a popularity changed since the build still uses the matrix for the other fields."""
+    games_service = Games(InMemoryDatabase(), comparison_matrix=matrix)
+    games_service.new_game("test_game", profile(CATALOG[0], **{"spotify popularity": 99}))
+
+    comparison = games_service.guess("test_game", profile(CATALOG[2]))
+
+    assert comparison["fields"] == {"gender": "match", "genre": "no_match", "area": "no_match", "popularity": "lower"}
@@ -0,0 +1,121 @@
+import datetime
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from app import create_app
+from daily import DailyPuzzle, seconds_until_tomorrow
+from database.in_memory_storage import InMemoryDatabase
+from games import Games, POSSIBLE_ANSWERS
+
+
+DAY = datetime.date(2025, 3, 14)
+
+PITBULL = {
+    "name": "Pitbull",
+    "gender": "male",
+    "area": {"name": "United States"},
+    "tag": "dance-pop",
+    "spotify popularity": 85
+}
+
+
+@pytest.fixture
+def database():
+    return InMemoryDatabase()
+
+
+@pytest.fixture
+def resolve():
+    return MagicMock(side_effect=lambda name: dict(PITBULL, name=name))
+
+
+# test that the day's answer is deterministic
+def test_choose_is_deterministic(database, resolve):
+    """Test that every worker picks the same artist for a day, whatever the list order."""
+    first = DailyPuzzle(database, resolve, POSSIBLE_ANSWERS, salt="s")
+    second = DailyPuzzle(database, resolve, list(reversed(POSSIBLE_ANSWERS)), salt="s")
+
+    assert first.choose(DAY) == second.choose(DAY)
+    assert first.choose(DAY) in POSSIBLE_ANSWERS
+    assert DailyPuzzle.number(datetime.date(2025, 1, 1)) == 1
+
+
+# test that the blob is resolved once and shared
+def test_prepare_stores_one_blob(database, resolve):
+    """Test that the first stored blob wins and later reads skip the lookup."""
+    first = DailyPuzzle(database, resolve, POSSIBLE_ANSWERS, salt="s", today=lambda: DAY)
+    blob = first.get()
+
+    second = DailyPuzzle(database, resolve, ["Somebody Else"], salt="s", today=lambda: DAY)
+
+    assert second.get() == blob
+    assert blob["date"] == "2025-03-14"
+    assert resolve.call_count == 1
+    assert seconds_until_tomorrow(
+        datetime.datetime(2025, 3, 14, 23, 0, tzinfo=datetime.timezone.utc)
+    ) == 3600
+
+
+# test that old blobs are dropped whichever thread prepares them
+def test_blobs_stay_bounded(database, resolve):
+    """Test that only yesterday, today and tomorrow are kept in memory."""
+    today = {"day": DAY}
+    daily = DailyPuzzle(database, resolve, POSSIBLE_ANSWERS, salt="s", today=lambda: today["day"])
+    for offset in range(10):
+        today["day"] = DAY + datetime.timedelta(days=offset)
+        daily.refresh()
+        daily.get()
+
+    assert sorted(daily._blobs) == [today["day"] + datetime.timedelta(days=d) for d in (-1, 0, 1)]
+
+
+# test the daily endpoints
+def test_daily_endpoints(database, resolve):
+    """Test that /daily is cacheable and /new-game?mode=daily plays the day's answer."""
+    daily = DailyPuzzle(database, resolve, ["Pitbull"], today=lambda: DAY)
+    client = create_app("test_secret_key", Games(database), daily=daily).test_client()
+
+    response = client.get("/daily")
+
+    assert response.get_json() == {"date": "2025-03-14", "number": 73}
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+    assert "Set-Cookie" not in response.headers
+    etag = response.headers["ETag"]
+    assert client.get("/daily", headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.get("/new-game?mode=daily")
+    assert response.get_json()["number"] == 73
+
+    with patch("app.get_artist_data_for_game", return_value=dict(PITBULL)):
+        data = client.post("/guess", json={"guess": "Pitbull"}).get_json()
+    assert data["status"] == "WON"
+
+
+# test that daily mode is optional
+def test_daily_disabled(database):
+    """Test that daily requests fail cleanly without a DailyPuzzle."""
+    client = create_app("test_secret_key", Games(database)).test_client()
+
+    assert client.get("/daily").status_code == 404
+    assert client.get("/new-game?mode=daily").status_code == 400
+
+
+# test that a failed lookup of the day's answer is a JSON error
+def test_daily_lookup_failure(database):
+    """Test that /daily and /new-game?mode=daily answer 500 when the answer cannot be resolved."""
+    resolve = MagicMock(side_effect=ConnectionError("musicbrainz down"))
+    daily = DailyPuzzle(database, resolve, ["Pitbull"], today=lambda: DAY)
+    client = create_app("test_secret_key", Games(database), daily=daily).test_client()
+
+    response = client.get("/daily")
+
+    assert response.status_code == 500
+    assert response.get_json() == {"error": "ERROR", "message": "Could not load the daily puzzle"}
+    assert response.headers["Cache-Control"] == "no-store"
+    assert client.get("/new-game?mode=daily").status_code == 500
@@ -0,0 +1,266 @@
+import json
+import pytest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import redis
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from database.codec import CompactCodec
+from database.database import Database
+from database.in_memory_storage import InMemoryDatabase
+from games import Games
+
+
+@pytest.fixture
+def in_memory_db():
+    """Provides an in-memory database for testing."""
+    return InMemoryDatabase()
+
+
+@pytest.fixture
+def redis_db():
+    """Provides a Redis Database over a mocked client, plus that client."""
+    with patch("database.database.redis.Redis") as redis_class:
+        client = redis_class.return_value
+        client.register_script.side_effect = lambda script: MagicMock(name="script")
+        database = Database("localhost", 6379, game_ttl=60)
+    return database, client
+
+
+# test that add_guess returns the running guess count
+def test_add_guess_returns_count(in_memory_db):
+    """Test that each appended guess returns the new number of guesses."""
+    in_memory_db.create_game("game:1", {"name": "Pitbull"})
+
+    assert in_memory_db.add_guess("game:1", {"name": "Drake"}) == 1
+    assert in_memory_db.add_guess("game:1", {"name": "Adele"}) == 2
+    assert in_memory_db.get_guesses("game:1") == [{"name": "Drake"}, {"name": "Adele"}]
+
+
+# test that guesses for a missing game are rejected
+def test_add_guess_missing_game(in_memory_db):
+    """Test that add_guess returns None and stores nothing for unknown games."""
+    assert in_memory_db.add_guess("game:missing", {"name": "Drake"}) is None
+    assert in_memory_db.get_guesses("game:missing") is None
+    assert in_memory_db.get_answer("game:missing") is None
+
+
+# test that create_game resets previous guesses
+def test_create_game_resets_guesses(in_memory_db):
+    """Test that starting a new game under the same id clears old guesses."""
+    in_memory_db.create_game("game:1", {"name": "Pitbull"})
+    in_memory_db.add_guess("game:1", {"name": "Drake"})
+
+    in_memory_db.create_game("game:1", {"name": "Adele"})
+
+    assert in_memory_db.get_answer("game:1") == {"name": "Adele"}
+    assert in_memory_db.get_guesses("game:1") == []
+
+
+# test that concurrent guesses are never lost
+def test_add_guess_concurrent(in_memory_db):
+    """Test that concurrent appends each get a distinct guess number."""
+    in_memory_db.create_game("game:1", {"name": "Pitbull"})
+    numbers = []
+    threads = [
+        threading.Thread(target=lambda: numbers.append(in_memory_db.add_guess("game:1", {})))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(numbers) == list(range(1, 21))
+
+
+# test that record_guess appends and hands the answer to compute_fn
+def test_record_guess(in_memory_db):
+    """Test that record_guess stores the guess and computes from the answer and count."""
+    in_memory_db.create_game("game:1", {"name": "Pitbull"})
+
+    result = in_memory_db.record_guess(
+        "game:1",
+        {"name": "Drake"},
+        lambda answer, guess_number: (answer["name"], guess_number),
+    )
+
+    assert result == ("Pitbull", 1)
+    assert in_memory_db.get_guesses("game:1") == [{"name": "Drake"}]
+
+
+# test that record_guess does nothing for a missing game
+def test_record_guess_missing_game(in_memory_db):
+    """Test that record_guess returns None without calling compute_fn."""
+    def compute_fn(answer, guess_number):
+        raise AssertionError("compute_fn should not be called")
+
+    assert in_memory_db.record_guess("game:missing", {"name": "Drake"}, compute_fn) is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# test that games expire after the sliding TTL
+def test_game_ttl_slides_on_activity():
+    """Test that each guess pushes back expiry and idle games disappear."""
+    clock = FakeClock()
+    database = InMemoryDatabase(game_ttl=60, clock=clock)
+    database.create_game("game:1", {"name": "Pitbull"})
+
+    clock.now += 50
+    database.add_guess("game:1", {"name": "Drake"})
+    clock.now += 50
+    assert database.exists("game:1")
+
+    clock.now += 61
+    assert not database.exists("game:1")
+    assert database.record_guess("game:1", {}, lambda answer, number: number) is None
+
+
+# test that values expire on the database clock
+def test_value_ttl_uses_clock():
+    """Test that set_value/get_value expire by the injected clock, not wall time."""
+    clock = FakeClock()
+    database = InMemoryDatabase(clock=clock)
+    database.set_value("key", {"a": 1}, ttl=30)
+
+    clock.now += 29
+    assert database.get_value("key") == {"a": 1}
+    clock.now += 1
+    assert database.get_value("key") is None
+
+
+# test that the least recently used game is evicted past max_games
+def test_max_games_evicts_least_recently_used():
+    """Test that the store stays bounded and keeps recently active games."""
+    database = InMemoryDatabase(max_games=2)
+    database.create_game("game:1", {"name": "Pitbull"})
+    database.create_game("game:2", {"name": "Drake"})
+    database.add_guess("game:1", {"name": "Adele"})
+
+    database.create_game("game:3", {"name": "Adele"})
+
+    assert database.exists("game:1")
+    assert not database.exists("game:2")
+    assert database.exists("game:3")
+
+
+# test that stats reports live games and bytes
+def test_stats(in_memory_db):
+    """Test that stats counts live games and a non-zero byte size."""
+    assert in_memory_db.stats() == {"games": 0, "bytes": 0}
+
+    in_memory_db.create_game("game:1", {"name": "Pitbull"})
+    stats = in_memory_db.stats()
+
+    assert stats["games"] == 1
+    assert stats["bytes"] > 0
+
+
+# test that a game stored as one JSON blob is migrated on first access
+def test_redis_migrates_legacy_game(redis_db):
+    """Test that a WRONGTYPE error converts the blob to the hash + list layout and retries."""
+    database, client = redis_db
+    codec = CompactCodec()
+    client.get.return_value = json.dumps({
+        "answer": {"name": "Pitbull", "gender": "male"},
+        "guesses": [{"guess_artist": {"name": "Drake"}, "is_correct": False}],
+    })
+    client.hget.side_effect = [
+        redis.ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value"),
+        codec.encode({"name": "Pitbull", "gender": "male"}),
+    ]
+
+    answer = database.get_answer("game:1")
+
+    assert answer["name"] == "Pitbull"
+    assert client.hget.call_count == 2
+    pipeline = client.pipeline.return_value
+    pipeline.delete.assert_called_once_with("game:1", "game:1:guesses")
+    pipeline.hset.assert_called_once_with("game:1", "answer", codec.encode({"name": "Pitbull", "gender": "male"}))
+    pipeline.rpush.assert_called_once_with("game:1:guesses", codec.encode({"name": "Drake"}))
+    pipeline.execute.assert_called_once()
+
+
+# test that record_guess decodes the answer returned by the script
+def test_redis_record_guess(redis_db):
+    """Test that record_guess runs one script call and hands compute_fn the decoded answer."""
+    database, client = redis_db
+    codec = CompactCodec()
+    database._record_guess_script.return_value = [codec.encode({"name": "Pitbull"}), 2]
+
+    result = database.record_guess(
+        "game:1",
+        {"name": "Drake"},
+        lambda answer, guess_number: (answer["name"], guess_number),
+    )
+
+    assert result == ("Pitbull", 2)
+    kwargs = database._record_guess_script.call_args.kwargs
+    assert kwargs["keys"] == ["game:1", "game:1:guesses", "games:active"]
+    assert kwargs["args"][:2] == [codec.encode({"name": "Drake"}), 60000]
+
+
+# test that the Redis database rejects guesses for missing games
+def test_redis_add_guess_missing_game(redis_db):
+    """Test that add_guess returns None when the script reports no game."""
+    database, _ = redis_db
+    database._add_guess_script.return_value = 0
+    database._record_guess_script.return_value = None
+
+    assert database.add_guess("game:missing", {"name": "Drake"}) is None
+    assert database.record_guess("game:missing", {}, lambda answer, number: number) is None
+
+
+# test that new games get the sliding TTL
+def test_redis_create_game_sets_ttl(redis_db):
+    """Test that create_game resets old guesses and expires the game after game_ttl."""
+    database, client = redis_db
+
+    database.create_game("game:1", {"name": "Pitbull"})
+
+    pipeline = client.pipeline.return_value
+    pipeline.delete.assert_called_once_with("game:1", "game:1:guesses")
+    pipeline.expire.assert_called_once_with("game:1", 60)
+
+
+# test that the activity index is trimmed on every new game
+@patch("database.database.time.time", return_value=1000.0)
+def test_redis_create_game_prunes_active_games(mock_time, redis_db):
+    """Test that create_game drops index members idle for longer than game_ttl."""
+    database, client = redis_db
+
+    database.create_game("game:1", {"name": "Pitbull"})
+
+    pipeline = client.pipeline.return_value
+    pipeline.zadd.assert_called_once_with("games:active", {"game:1": 1000.0})
+    pipeline.zremrangebyscore.assert_called_once_with("games:active", "-inf", "(940.0")
+
+
+# test a whole game through the Redis codec
+def test_redis_game_round_trip(redis_db):
+    """Test that the answer stored by new_game is compared correctly after a round trip."""
+    database, client = redis_db
+    games_service = Games(database)
+    drake = {"name": "Drake", "gender": "male", "area": {"name": "Canada"}, "tag": "hip hop", "spotify popularity": 95}
+
+    games_service.new_game("game:1", drake)
+    stored = client.pipeline.return_value.hset.call_args.args[2]
+    database._record_guess_script.return_value = [stored, 1]
+    comparison = games_service.guess("game:1", dict(drake))
+
+    assert comparison["is_correct"] == True
+    assert comparison["fields"] == {"gender": "match", "genre": "match", "area": "match", "popularity": "match"}
+    assert comparison["answer_snapshot"]["name"] == "Drake"
@@ -7,7 +7,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "src"))
 
-from games import Games
+from games import Games, project_answer
 from database.in_memory_storage import InMemoryDatabase
 
 @pytest.fixture
@@ -398,4 +398,41 @@ def test_game_guesses_increment(games_service):
     for i, guess_data in enumerate[dict[str, Any]](guesses_data, start=1):
         comparison = games_service.guess(game_id, guess_data)
         assert comparison is not None
-        assert comparison["guess_number"] == i
\ No newline at end of file
+        assert comparison["guess_number"] == i
+
+# test that the answer is stored as a compact projection
+def test_game_stores_projected_answer(games_service, in_memory_db):
+    """Test that new_game stores the snapshot and comparison key, not the full profile."""
+    answer_data = {
+        "name": "Pitbull",
+        "type": "Person",
+        "gender": "male",
+        "area": {"name": "United States"},
+        "tag": "Dance-Pop",
+        "spotify popularity": "85"
+    }
+    games_service.new_game("test_game", answer_data)
+
+    assert in_memory_db.get_answer("test_game") == {
+        "snapshot": {"name": "Pitbull", "gender": "male", "area": "United States", "genre": "Dance-Pop", "popularity": "85"},
+        "key": ["pitbull", "male", "dance-pop", "united states", 85],
+        "matrix_id": None,
+    }
+
+    comparison = games_service.guess("test_game", {
+        "name": "PITBULL", "gender": "Male", "area": None, "tag": "dance-pop", "spotify popularity": 90
+    })
+    assert comparison["is_correct"] == True
+    assert comparison["fields"] == {"gender": "match", "genre": "match", "area": "unknown", "popularity": "higher"}
+
+
+# test that games stored with a full answer profile still compare
+def test_game_legacy_answer_profile(games_service, in_memory_db):
+    """Test that an answer stored before projection is projected when read."""
+    answer_data = {"name": "Adele", "gender": "female", "area": {"name": "United Kingdom"}, "tag": "soul", "spotify popularity": 80}
+    in_memory_db.create_game("test_game", answer_data)
+
+    comparison = games_service.guess("test_game", dict(answer_data, **{"spotify popularity": 70}))
+
+    assert comparison["answer_snapshot"] == project_answer(answer_data)["snapshot"]
+    assert comparison["fields"]["popularity"] == "lower"
@@ -0,0 +1,114 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import metrics
+from app import create_app
+from database.in_memory_storage import InMemoryDatabase
+from games import Games
+from metrics import Histogram, Metrics
+
+
+PITBULL = {
+    "name": "Pitbull",
+    "gender": "male",
+    "area": {"name": "United States"},
+    "tag": "dance-pop",
+    "spotify popularity": 85
+}
+
+
+@pytest.fixture
+def collector():
+    """Installs a fresh Metrics for the test and disables it afterwards."""
+    collector = Metrics()
+    metrics.set_metrics(collector)
+    yield collector
+    metrics.set_metrics(None)
+
+
+@pytest.fixture
+def client():
+    """Provides a Flask test client over the in-memory database."""
+    return create_app("test_secret_key", Games(InMemoryDatabase())).test_client()
+
+
+# test the histogram buckets
+def test_histogram_cumulative_buckets():
+    """Test that buckets are cumulative and +Inf counts everything."""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 5.0):
+        histogram.observe(seconds)
+
+    lines = histogram.render("x", 'stage="s"')
+
+    assert lines[0] == 'x_bucket{stage="s",le="0.1"} 1'
+    assert lines[1] == 'x_bucket{stage="s",le="1.0"} 2'
+    assert lines[2] == 'x_bucket{stage="s",le="+Inf"} 3'
+    assert lines[-1] == 'x_count{stage="s"} 3'
+
+
+# test that disabled metrics cost nothing but a shared no-op
+def test_stage_is_noop_when_disabled():
+    """Test that stage() hands out the shared null context when disabled."""
+    metrics.set_metrics(None)
+
+    assert metrics.stage("redis") is metrics.stage("spotify_search")
+
+    @metrics.timed("games_compare")
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+
+
+# test the Server-Timing header and /metrics endpoint
+@patch("app.get_artist_data_for_game")
+def test_guess_reports_stages(mock_get_artist_data, collector, client):
+    """Test that a guess sends Server-Timing and shows up in /metrics."""
+    mock_get_artist_data.return_value = dict(PITBULL)
+    client.get("/new-game")
+
+    response = client.post("/guess", json={"guess": "Pitbull"})
+    server_timing = response.headers["Server-Timing"]
+
+    assert "games_compare;dur=" in server_timing
+    assert "total;dur=" in server_timing
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert 'artist_guesser_stage_seconds_count{stage="games_compare"} 1' in body
+    assert 'artist_guesser_request_seconds_count{endpoint="/guess"} 1' in body
+
+
+# test that /metrics is off when metrics are disabled
+def test_metrics_endpoint_disabled(client):
+    """Test that /metrics returns 404 and no Server-Timing is sent when disabled."""
+    metrics.set_metrics(None)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 404
+    assert "Server-Timing" not in response.headers
+
+
+# test that gauges sharing a function call it once and survive its errors
+def test_gauges_share_one_call_and_report_errors_as_nan():
+    """Test that database gauges read stats() once per scrape and a failing callback renders NaN."""
+    collector = Metrics()
+    stats = MagicMock(return_value={"games": 3, "bytes": 1024})
+    collector.add_gauge("active_games", "Games.", stats, key="games")
+    collector.add_gauge("database_bytes", "Bytes.", stats, key="bytes")
+    collector.add_gauge("broken", "Fails.", MagicMock(side_effect=ConnectionError("redis down")))
+
+    text = collector.render()
+
+    assert "active_games 3\n" in text
+    assert "database_bytes 1024\n" in text
+    assert "broken NaN\n" in text
+    stats.assert_called_once_with()
@@ -0,0 +1,124 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+from artist_cache import ArtistCache
+from app import create_app
+from circuit_breaker import CLOSED, CircuitBreaker
+from database.in_memory_storage import InMemoryDatabase
+from games import Games
+from negative_cache import ArtistNotFoundError, NegativeCache
+
+
+PITBULL = {
+    "name": "Pitbull",
+    "gender": "male",
+    "area": {"name": "United States"},
+    "tag": "dance-pop",
+    "spotify popularity": 85,
+}
+
+
+@pytest.fixture
+def negative_cache():
+    """Installs a NegativeCache into musicbrain for a test."""
+    cache = NegativeCache(InMemoryDatabase())
+    musicbrain.set_negative_cache(cache)
+    yield cache
+    musicbrain.set_negative_cache(None)
+
+
+# test that a miss is remembered by normalized query
+def test_negative_cache_normalizes_queries(negative_cache):
+    """Test that case and spacing do not defeat the cache."""
+    assert not negative_cache.contains("Taylr Swift")
+
+    negative_cache.remember("Taylr Swift")
+
+    assert negative_cache.contains("  taylr   SWIFT ")
+    assert negative_cache.stats() == {"hits": 1, "stores": 1, "avoided_upstream_calls": 2}
+
+
+# test that a known miss never reaches the upstream APIs
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrain._get_full_artist_by_query")
+def test_known_miss_skips_upstream(mock_musicbrainz, mock_popularity, negative_cache):
+    """Test that the second lookup of an unknown artist makes no upstream call."""
+    mock_musicbrainz.side_effect = ArtistNotFoundError("no match")
+    mock_popularity.return_value = 10
+
+    for _ in range(3):
+        with pytest.raises(ArtistNotFoundError):
+            musicbrain.get_artist_data_for_game("Taylr Swift")
+
+    assert mock_musicbrainz.call_count == 1
+    assert negative_cache.stats()["hits"] == 2
+
+
+# test that cached artists skip the negative cache
+def test_cache_hit_skips_negative_cache():
+    """Test that a guess answered by the artist cache makes no negative cache lookup."""
+    negative_cache = MagicMock()
+    artist_cache = ArtistCache(InMemoryDatabase())
+    artist_cache.put("Pitbull", dict(PITBULL))
+    musicbrain.set_negative_cache(negative_cache)
+    musicbrain.set_artist_cache(artist_cache)
+    try:
+        result = musicbrain.get_artist_data_for_game("Pitbull")
+    finally:
+        musicbrain.set_negative_cache(None)
+        musicbrain.set_artist_cache(None)
+
+    assert result == PITBULL
+    negative_cache.contains.assert_not_called()
+
+
+# test that upstream errors are not cached as misses
+@patch("musicbrain.get_artist_popularity")
+@patch("musicbrain._get_full_artist_by_query")
+def test_upstream_error_is_not_cached(mock_musicbrainz, mock_popularity, negative_cache):
+    """Test that only "not found" answers are remembered."""
+    mock_musicbrainz.side_effect = ConnectionError("musicbrainz down")
+    mock_popularity.return_value = 10
+
+    with pytest.raises(ConnectionError):
+        musicbrain.get_artist_data_for_game("Pitbull")
+
+    assert not negative_cache.contains("Pitbull")
+
+
+# test that "not found" does not trip a breaker
+def test_breaker_ignores_not_found():
+    """Test that ignored exceptions count as successes."""
+    breaker = CircuitBreaker("test", failure_threshold=1, ignored=(ArtistNotFoundError,))
+
+    def not_found():
+        raise ArtistNotFoundError("no match")
+
+    with pytest.raises(ArtistNotFoundError):
+        breaker.call(not_found)
+
+    assert breaker.state == CLOSED
+
+
+# test the 404 response for an unknown artist
+@patch("app.get_artist_data_for_game")
+def test_guess_unknown_artist_returns_404(mock_get_artist_data):
+    """Test that /guess answers 404 NOT_FOUND when no artist matches."""
+    app = create_app("test-secret", Games(InMemoryDatabase()))
+    app.config["TESTING"] = True
+    client = app.test_client()
+    mock_get_artist_data.return_value = dict(PITBULL)
+    client.get("/new-game")
+
+    mock_get_artist_data.side_effect = ArtistNotFoundError("no match")
+    response = client.post("/guess", json={"guess": "Taylr Swift"})
+
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "NOT_FOUND", "message": "Could not find that artist"}
@@ -0,0 +1,108 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from redis.exceptions import RedisError
+
+import musicbrain
+from rate_limiter import LocalTokenBucket, RateLimiter, RateLimitExceeded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+# test that the bucket hands out its capacity then asks callers to wait
+def test_local_bucket_reserve():
+    """Test that reservations past capacity queue up behind each other."""
+    clock = FakeClock()
+    bucket = LocalTokenBucket(rate=1.0, capacity=2, clock=clock)
+
+    assert bucket.reserve(max_wait=5) == 0
+    assert bucket.reserve(max_wait=5) == 0
+    assert bucket.reserve(max_wait=5) == pytest.approx(1.0)
+    assert bucket.reserve(max_wait=5) == pytest.approx(2.0)
+
+    clock.now += 10
+    assert bucket.reserve(max_wait=5) == 0
+
+
+# test that the bucket refuses reservations past the maximum wait
+def test_local_bucket_max_wait():
+    """Test that a reservation exceeding max_wait is refused without taking a token."""
+    clock = FakeClock()
+    bucket = LocalTokenBucket(rate=1.0, capacity=1, clock=clock)
+    bucket.reserve(max_wait=0)
+
+    assert bucket.reserve(max_wait=0.5) is None
+    assert bucket.reserve(max_wait=2) == pytest.approx(1.0)
+
+
+# test that callers queue and the wait is recorded
+def test_rate_limiter_queues_callers():
+    """Test that acquire sleeps until a token is due and records wait metrics."""
+    limiter = RateLimiter(rate=20.0, capacity=1, max_wait=1.0)
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    stats = limiter.stats()
+    assert elapsed >= 0.09
+    assert stats["acquired"] == 3
+    assert stats["max_wait_seconds"] > 0
+    assert stats["queue_depth"] == 0
+
+
+# test that callers over the queue limit are rejected
+def test_rate_limiter_rejects_when_queue_full():
+    """Test that acquire raises RateLimitExceeded instead of waiting too long."""
+    limiter = RateLimiter(rate=1.0, capacity=1, max_wait=0.1)
+    limiter.acquire()
+
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+    assert limiter.stats()["rejected"] == 1
+
+
+# test that Redis errors fall back to the local bucket
+def test_rate_limiter_falls_back_to_local():
+    """Test that the limiter keeps working when Redis is unavailable."""
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = MagicMock(side_effect=RedisError("down"))
+    limiter = RateLimiter(rate=10.0, capacity=1, redis_client=redis_client)
+
+    limiter.acquire()
+
+    assert limiter.stats()["fallbacks"] == 1
+    assert limiter.stats()["acquired"] == 1
+
+
+# test that MusicBrainz calls go through the installed limiter
+@patch("musicbrain.musicbrainzngs.get_artist_by_id")
+@patch("musicbrain.musicbrainzngs.search_artists")
+@patch("musicbrain._initialize_musicbrainz")
+def test_musicbrainz_calls_are_rate_limited(mock_init, mock_search, mock_get_by_id):
+    """Test that both MusicBrainz calls acquire a token from the limiter."""
+    mock_search.return_value = {"artist-list": [{"id": "test-artist-id"}]}
+    mock_get_by_id.return_value = {"artist": {"name": "Pitbull"}}
+    limiter = MagicMock()
+
+    musicbrain.set_musicbrainz_limiter(limiter)
+    try:
+        musicbrain._get_full_artist_by_query("Pitbull")
+    finally:
+        musicbrain.set_musicbrainz_limiter(None)
+
+    assert limiter.acquire.call_count == 2
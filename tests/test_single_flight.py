@@ -0,0 +1,121 @@
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import musicbrain
+from database.in_memory_storage import InMemoryDatabase
+from single_flight import SingleFlight
+
+
+def run_concurrently(function, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(function())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+# test that concurrent calls for one key share a single execution
+def test_single_flight_shares_in_flight_call():
+    """Test that concurrent callers with the same key run the function once."""
+    flight = SingleFlight()
+    function = MagicMock(side_effect=lambda: time.sleep(0.1) or {"name": "Drake"})
+
+    results = run_concurrently(lambda: flight.do("drake", function), 5)
+
+    assert results == [{"name": "Drake"}] * 5
+    assert function.call_count == 1
+    assert flight.stats()["shared"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+# test that errors are raised to every waiting caller
+def test_single_flight_shares_errors():
+    """Test that followers get the leader's exception."""
+    flight = SingleFlight()
+    errors = []
+
+    def failing():
+        time.sleep(0.1)
+        raise IndexError("no artist")
+
+    def call():
+        try:
+            flight.do("nobody", failing)
+        except IndexError as e:
+            errors.append(e)
+
+    run_concurrently(call, 3)
+
+    assert len(errors) == 3
+
+
+# test that a process waiting on another's lock uses the recheck result
+def test_single_flight_waits_on_remote_lock():
+    """Test that a held lock makes the caller wait for the other process's result."""
+    database = InMemoryDatabase()
+    database.add_value("lock:drake", "other-process", ttl=5)
+    flight = SingleFlight(database, poll_interval=0.01)
+    function = MagicMock()
+    recheck = MagicMock(side_effect=[None, {"name": "Drake"}])
+
+    result = flight.do("drake", function, recheck=recheck)
+
+    assert result == {"name": "Drake"}
+    function.assert_not_called()
+    assert flight.stats()["remote_shared"] == 1
+
+
+# test that a lock released between two polls is not followed by a second fetch
+def test_single_flight_rechecks_after_taking_lock():
+    """Test that the caller rechecks once more when the lock frees up while it waits."""
+    database = InMemoryDatabase()
+    database.add_value("lock:drake", "other-process", ttl=5)
+    flight = SingleFlight(database, poll_interval=0.01)
+    function = MagicMock()
+
+    def recheck():
+        # The other process stores its result and releases the lock right after this poll
+        if recheck.calls == 0:
+            database.delete_value("lock:drake")
+            recheck.calls += 1
+            return None
+        return {"name": "Drake"}
+
+    recheck.calls = 0
+
+    assert flight.do("drake", function, recheck=recheck) == {"name": "Drake"}
+    function.assert_not_called()
+    assert database.get_value("lock:drake") is None
+
+
+# test that the lock is released after the call
+def test_single_flight_releases_lock():
+    """Test that the leader removes its lock once the call is done."""
+    database = InMemoryDatabase()
+    flight = SingleFlight(database)
+
+    flight.do("drake", lambda: {"name": "Drake"}, recheck=lambda: None)
+
+    assert database.get_value("lock:drake") is None
+
+
+# test that concurrent identical guesses make one upstream fetch
+@patch("musicbrain._fetch_artist_data")
+def test_get_artist_data_for_game_coalesces(mock_fetch):
+    """Test that concurrent lookups for the same artist share one fetch."""
+    mock_fetch.side_effect = lambda query: time.sleep(0.1) or {"name": "Drake"}
+
+    results = run_concurrently(lambda: musicbrain.get_artist_data_for_game("Drake"), 4)
+
+    assert all(result["name"] == "Drake" for result in results)
+    assert mock_fetch.call_count == 1
@@ -0,0 +1,102 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from database.in_memory_storage import InMemoryDatabase
+from metrics import Metrics
+from spotify import SpotifyClient
+from spotify_token import TOKEN_KEY, SpotifyTokenManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def database(clock):
+    return InMemoryDatabase(clock=clock)
+
+
+def token_fetcher():
+    tokens = iter(f"token-{n}" for n in range(100))
+    return MagicMock(side_effect=lambda: {"access_token": next(tokens), "expires_in": 600})
+
+
+# test that workers share one token
+def test_workers_share_one_token(database, clock):
+    """Test that a second worker reads the stored token instead of fetching."""
+    first_fetch, second_fetch = token_fetcher(), token_fetcher()
+    first = SpotifyTokenManager(first_fetch, database, refresh_margin=120, clock=clock)
+    second = SpotifyTokenManager(second_fetch, database, refresh_margin=120, clock=clock)
+
+    assert first.refresh_if_needed() is True
+    assert second.refresh_if_needed() is False
+
+    assert first.get_token() == second.get_token() == "token-0"
+    second_fetch.assert_not_called()
+    assert database.get_value(TOKEN_KEY)["expires_at"] == 1600
+
+
+# test proactive refresh before expiry
+def test_refreshes_before_expiry(database, clock):
+    """Test that the token is renewed within the margin, using expires_in."""
+    fetch = token_fetcher()
+    manager = SpotifyTokenManager(fetch, database, refresh_margin=120, clock=clock)
+    manager.refresh_if_needed()
+
+    clock.now += 400
+    assert manager.refresh_if_needed() is False
+    clock.now += 100
+    assert manager.refresh_if_needed() is True
+
+    assert manager.get_token() == "token-1"
+    stats = manager.stats()
+    assert stats["refreshes"] == 2
+    assert stats["inline_refreshes"] == 0
+    assert stats["age_seconds"] == 0
+    assert stats["expires_in_seconds"] == 600
+
+
+# test that concurrent inline refreshes call the endpoint once
+def test_concurrent_inline_refresh_fetches_once(database, clock):
+    """Test that threads needing a token at the same time share one fetch."""
+    fetch = token_fetcher()
+    manager = SpotifyTokenManager(fetch, database, clock=clock)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get_token())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["token-0"] * 8
+    assert fetch.call_count == 1
+
+
+# test that the client uses the manager and the gauges render
+def test_client_uses_token_manager(database, clock):
+    """Test that SpotifyClient takes its token from the manager and gauges are exported."""
+    client = SpotifyClient()
+    manager = SpotifyTokenManager(token_fetcher(), database, clock=clock)
+    client.token_manager = manager
+    metrics = Metrics()
+    metrics.add_gauge("token_age_seconds", "Token age.", lambda: manager.stats()["age_seconds"])
+
+    assert "token_age_seconds NaN" in metrics.render()
+    assert client.request_access_token() == "token-0"
+    assert "token_age_seconds 0.0" in metrics.render()
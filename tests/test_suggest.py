@@ -0,0 +1,66 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+from app import create_app
+from database.in_memory_storage import InMemoryDatabase
+from games import Games
+from suggest import SuggestIndex
+
+
+@pytest.fixture
+def suggest_index():
+    """Provides a suggest index of a few artist names."""
+    return SuggestIndex(["Taylor Swift", "Tame Impala", "The Weeknd", "Drake"])
+
+
+# test that suggestions match the normalized prefix
+def test_suggest_prefix(suggest_index):
+    """Test that suggestions are case-insensitive prefix matches."""
+    assert suggest_index.suggest("TA") == ["Tame Impala", "Taylor Swift"]
+    assert suggest_index.suggest("dr") == ["Drake"]
+    assert suggest_index.suggest("x") == []
+    assert suggest_index.suggest("   ") == []
+
+
+# test that the number of suggestions is limited
+def test_suggest_limit(suggest_index):
+    """Test that suggest returns at most limit names."""
+    assert suggest_index.suggest("t", limit=2) == ["Tame Impala", "Taylor Swift"]
+
+
+# test that added names show up once
+def test_suggest_add(suggest_index):
+    """Test that added names become suggestions and duplicates are ignored."""
+    suggest_index.add("Tate McRae")
+    suggest_index.add("TATE MCRAE")
+
+    assert suggest_index.suggest("tat") == ["Tate McRae"]
+    assert len(suggest_index) == 5
+
+
+# test that suggestions are fast on a large index
+def test_suggest_is_fast():
+    """Test that a prefix query on 50k names answers well under a millisecond."""
+    index = SuggestIndex(f"Artist {i}" for i in range(50000))
+
+    start = time.perf_counter()
+    for _ in range(100):
+        index.suggest("artist 123")
+    assert (time.perf_counter() - start) / 100 < 0.001
+
+
+# test the /suggest endpoint
+def test_suggest_route(suggest_index):
+    """Test that /suggest returns suggestions as JSON."""
+    client = create_app("test_secret_key", Games(InMemoryDatabase()), suggest_index=suggest_index).test_client()
+
+    response = client.get("/suggest?q=the")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"suggestions": ["The Weeknd"]}